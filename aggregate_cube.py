@@ -0,0 +1,156 @@
+# aggregate_cube.py
+# Agregat count/sum yang dihitung sekali per versi dataset untuk dashboard Streamlit
+
+import argparse
+import hashlib
+import os
+
+import joblib
+import pandas as pd
+
+from dataset_cache import DEFAULT_CACHE_DIR, load_dataset
+
+# Low-cardinality columns the dashboard can slice by
+DIMENSIONS = [
+    'Status', 'Gender', 'Course', 'Marital_status', 'Daytime_evening_attendance',
+    'Scholarship_holder', 'Debtor', 'Tuition_fees_up_to_date', 'International'
+]
+# Summed per cell so averages can be computed for any cut
+MEASURES = [
+    'Age_at_enrollment', 'Admission_grade',
+    'Curricular_units_1st_sem_grade', 'Curricular_units_2nd_sem_grade'
+]
+
+
+class AggregateCube:
+    """Tabel sel (kombinasi dimensi yang muncul) dengan count dan jumlah measure
+
+    Ukurannya dibatasi jumlah kombinasi dimensi, bukan jumlah baris, jadi
+    KPI dan chart dashboard dihitung dari beberapa ribu sel berapapun besar
+    datanya. `update` menambahkan baris baru tanpa scan ulang data lama.
+    """
+
+    def __init__(self, cells, dimensions, measures, dataset_version=None, n_rows=0):
+        self.cells = cells
+        self.dimensions = dimensions
+        self.measures = measures
+        self.dataset_version = dataset_version
+        self.n_rows = n_rows
+
+    @classmethod
+    def build(cls, df, dimensions=None, measures=None, dataset_version=None):
+        dimensions = [col for col in (dimensions or DIMENSIONS) if col in df.columns]
+        measures = [col for col in (measures or MEASURES) if col in df.columns]
+        cube = cls(None, dimensions, measures,
+                   dataset_version or df.attrs.get('dataset_version') or _content_version(df), len(df))
+        cube.cells = cube._aggregate(df)
+        return cube
+
+    def _aggregate(self, df):
+        # Rows with a missing dimension value keep their own cell, so counts add up to len(df)
+        grouped = df.groupby(self.dimensions, observed=True, sort=False, dropna=False)
+        cells = grouped[self.measures].sum()
+        cells.insert(0, 'count', grouped.size())
+        return cells.reset_index()
+
+    def update(self, new_rows, dataset_version=None):
+        """Tambahkan baris baru; hanya sel (bukan data lama) yang digabung ulang"""
+        cells = pd.concat([self.cells, self._aggregate(new_rows)], ignore_index=True)
+        self.cells = cells.groupby(self.dimensions, observed=True, sort=False, dropna=False).sum().reset_index()
+        self.n_rows += len(new_rows)
+        self.dataset_version = dataset_version or f'{self.dataset_version}+{_content_version(new_rows)}'
+        return self
+
+    def filter(self, **conditions):
+        """Sub-cube: nilai tunggal atau list per dimensi; None/list kosong = semua"""
+        mask = pd.Series(True, index=self.cells.index)
+        for dimension, value in conditions.items():
+            if value is None or (isinstance(value, (list, tuple, set)) and not value):
+                continue
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            mask &= self.cells[dimension].isin(values)
+        cells = self.cells[mask]
+        return AggregateCube(cells, self.dimensions, self.measures, self.dataset_version,
+                             int(cells['count'].sum()))
+
+    def values(self, dimension):
+        return sorted(self.cells[dimension].dropna().unique().tolist())
+
+    def total(self):
+        return int(self.cells['count'].sum())
+
+    def counts(self, by):
+        """Jumlah mahasiswa per nilai dimensi `by` (str atau list)"""
+        return self.cells.groupby(by, observed=True, dropna=False)['count'].sum()
+
+    def crosstab(self, index, columns):
+        """Setara pd.crosstab(df[index], df[columns]) dari sel"""
+        return self.cells.pivot_table(index=index, columns=columns, values='count',
+                                      aggfunc='sum', fill_value=0)
+
+    def mean(self, measure, by=None):
+        if by is None:
+            return self.cells[measure].sum() / self.cells['count'].sum()
+        grouped = self.cells.groupby(by, observed=True, dropna=False)[[measure, 'count']].sum()
+        return grouped[measure] / grouped['count']
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f'{path}.tmp-{os.getpid()}'
+        joblib.dump(self.__dict__, tmp_path)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        return cls(**joblib.load(path))
+
+
+def _content_version(df):
+    """Checksum isi DataFrame bila versi dari dataset_cache tidak tersedia"""
+    hashed = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    return hashlib.sha256(hashed.tobytes()).hexdigest()[:16]
+
+
+def cube_path(dataset_version, dimensions=None, measures=None, cache_dir=None):
+    cache_dir = cache_dir or os.environ.get('DROPOUT_DATA_CACHE') or DEFAULT_CACHE_DIR
+    layout = hashlib.sha256('|'.join((dimensions or DIMENSIONS) + ['#'] + (measures or MEASURES)).encode())
+    return os.path.join(cache_dir, 'aggregates', f'{dataset_version}-{layout.hexdigest()[:8]}.joblib')
+
+
+def load_or_build(df, dimensions=None, measures=None, cache_dir=None):
+    """Cube untuk versi dataset `df`: dibaca dari disk, atau dibangun sekali lalu disimpan"""
+    version = df.attrs.get('dataset_version') or _content_version(df)
+    path = cube_path(version, dimensions, measures, cache_dir)
+    if os.path.exists(path):
+        return AggregateCube.load(path)
+    cube = AggregateCube.build(df, dimensions, measures, dataset_version=version)
+    cube.save(path)
+    return cube
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bangun atau perbarui aggregate cube dashboard")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help="Bangun cube untuk dataset")
+    build_parser.add_argument('--data', default=None, help="URL, file CSV, atau direktori (default: dataset Dicoding)")
+    build_parser.add_argument('--output', default=None, help="Default: cache dataset/aggregates/<versi>")
+
+    update_parser = subparsers.add_parser('update', help="Tambahkan baris baru ke cube yang ada")
+    update_parser.add_argument('cube', help="File cube hasil build")
+    update_parser.add_argument('data', help="CSV baris baru (delimiter ';')")
+    update_parser.add_argument('--output', default=None, help="Default: timpa cube")
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        df = load_dataset(args.data)
+        cube = AggregateCube.build(df)
+        path = args.output or cube_path(cube.dataset_version)
+        cube.save(path)
+    else:
+        cube = AggregateCube.load(args.cube)
+        cube.update(pd.read_csv(args.data, delimiter=';'))
+        path = args.output or args.cube
+        cube.save(path)
+    print(f"✅ Cube {cube.dataset_version}: {cube.n_rows:,} baris → {len(cube.cells):,} sel, disimpan ke {path}")
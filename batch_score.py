@@ -0,0 +1,150 @@
+# batch_score.py
+# CLI scoring massal: baca file mahasiswa per chunk, prediksi, tulis hasil bertahap
+
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from model_inference import DropoutPredictor
+
+# Per-process predictor used by pool workers
+_worker_predictor = None
+
+
+def _init_worker(model_path):
+    """Load artifact sekali per worker; array pohon di-mmap dan dibagi antar worker"""
+    global _worker_predictor
+    _worker_predictor = DropoutPredictor()
+    _worker_predictor.load_model(model_path, mmap_mode='r', keep_model=False)
+
+
+def _score_chunk(chunk):
+    return _worker_predictor.predict_batch(chunk)
+
+
+class CsvResultWriter:
+    """Tulis hasil ke CSV secara append, header hanya di chunk pertama"""
+
+    def __init__(self, path, delimiter=';'):
+        self.path = path
+        self.delimiter = delimiter
+        self.header_written = False
+
+    def write(self, results):
+        results.to_csv(self.path, sep=self.delimiter, index=False,
+                       mode='a' if self.header_written else 'w', header=not self.header_written)
+        self.header_written = True
+
+    def close(self):
+        pass
+
+
+class ParquetResultWriter:
+    """Tulis hasil ke Parquet satu row group per chunk (butuh pyarrow)"""
+
+    def __init__(self, path):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Output Parquet membutuhkan pyarrow: pip install pyarrow") from e
+        self.pa = pa
+        self.pq = pq
+        self.path = path
+        self.schema = None
+        self.writer = None
+
+    def write(self, results):
+        if self.writer is None:
+            # The error column is all-null in clean chunks; pin it to string up front
+            schema = self.pa.Schema.from_pandas(results, preserve_index=False)
+            self.schema = schema.set(schema.get_field_index('error'), self.pa.field('error', self.pa.string()))
+            self.writer = self.pq.ParquetWriter(self.path, self.schema)
+        table = self.pa.Table.from_pandas(results, schema=self.schema, preserve_index=False)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def _make_writer(path, output_format, delimiter):
+    if output_format is None:
+        output_format = 'parquet' if path.endswith(('.parquet', '.pq')) else 'csv'
+    if output_format == 'parquet':
+        return ParquetResultWriter(path)
+    return CsvResultWriter(path, delimiter)
+
+
+def score_file(model_path, input_path, output_path, chunksize=50_000, workers=1,
+               output_format=None, delimiter=';', id_column=None):
+    """Score file besar per chunk dengan memori puncak terbatas
+
+    Dengan workers > 1, chunk dibagikan ke process pool. Paling banyak
+    2 x workers chunk yang sedang diproses sekaligus, dan hasil ditulis
+    sesuai urutan input.
+    """
+    reader = pd.read_csv(input_path, delimiter=delimiter, chunksize=chunksize,
+                         index_col=id_column)
+    writer = _make_writer(output_path, output_format, delimiter)
+    n_rows = n_errors = 0
+    start = time.perf_counter()
+
+    def write(results):
+        nonlocal n_rows, n_errors
+        writer.write(results)
+        n_rows += len(results)
+        n_errors += int(results['error'].notna().sum())
+
+    try:
+        if workers <= 1:
+            predictor = DropoutPredictor()
+            predictor.load_model(model_path, mmap_mode='r', keep_model=False)
+            for chunk in reader:
+                write(predictor.predict_batch(chunk))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(model_path,)) as pool:
+                pending = deque()
+                for chunk in reader:
+                    pending.append(pool.submit(_score_chunk, chunk))
+                    # Bound memory: wait for the oldest chunk before reading further
+                    if len(pending) >= 2 * workers:
+                        write(pending.popleft().result())
+                while pending:
+                    write(pending.popleft().result())
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - start
+    return {
+        'rows': n_rows,
+        'errors': n_errors,
+        'seconds': elapsed,
+        'rows_per_second': n_rows / elapsed if elapsed > 0 else float('inf')
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prediksi dropout massal untuk file mahasiswa berukuran besar")
+    parser.add_argument('input', help="File mahasiswa (CSV dengan delimiter ';')")
+    parser.add_argument('output', help="File hasil (.csv atau .parquet)")
+    parser.add_argument('--model', default='dropout_model.pkl', help="Artifact dari DropoutPredictor.save_model")
+    parser.add_argument('--chunksize', type=int, default=50_000, help="Baris per chunk")
+    parser.add_argument('--workers', type=int, default=1, help="Jumlah proses; 0 = semua core")
+    parser.add_argument('--format', choices=['csv', 'parquet'], default=None, help="Default: dari ekstensi output")
+    parser.add_argument('--delimiter', default=';')
+    parser.add_argument('--id-column', default=None, help="Kolom ID mahasiswa (default: nomor baris)")
+    args = parser.parse_args()
+
+    workers = args.workers or os.cpu_count()
+    print(f"📥 Scoring {args.input} → {args.output} (chunk {args.chunksize:,}, {workers} worker)")
+    stats = score_file(args.model, args.input, args.output, chunksize=args.chunksize, workers=workers,
+                       output_format=args.format, delimiter=args.delimiter, id_column=args.id_column)
+
+    print(f"✅ {stats['rows']:,} baris dalam {stats['seconds']:.1f} s "
+          f"({stats['rows_per_second']:,.0f} rows/s), {stats['errors']:,} error")
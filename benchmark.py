@@ -0,0 +1,316 @@
+# benchmark.py
+# Benchmark performa jalur inferensi, training, dan helper aplikasi (hasil JSON)
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import sklearn
+
+from aggregate_cube import AggregateCube
+from model_inference import DropoutPredictor
+from synthetic_data import StudentProfile
+
+# Rentang nilai per kolom (min, max, desimal?) mengikuti data.csv Dicoding;
+# dipakai agar benchmark tetap bisa berjalan offline tanpa dataset asli
+SCHEMA = {
+    'Marital_status': (1, 6, False),
+    'Application_mode': (1, 57, False),
+    'Application_order': (0, 9, False),
+    'Course': (33, 9991, False),
+    'Daytime_evening_attendance': (0, 1, False),
+    'Previous_qualification': (1, 43, False),
+    'Previous_qualification_grade': (95.0, 190.0, True),
+    'Nacionality': (1, 109, False),
+    'Mothers_qualification': (1, 44, False),
+    'Fathers_qualification': (1, 44, False),
+    'Mothers_occupation': (0, 194, False),
+    'Fathers_occupation': (0, 195, False),
+    'Admission_grade': (95.0, 190.0, True),
+    'Displaced': (0, 1, False),
+    'Educational_special_needs': (0, 1, False),
+    'Debtor': (0, 1, False),
+    'Tuition_fees_up_to_date': (0, 1, False),
+    'Gender': (0, 1, False),
+    'Scholarship_holder': (0, 1, False),
+    'Age_at_enrollment': (17, 70, False),
+    'International': (0, 1, False),
+    'Curricular_units_1st_sem_credited': (0, 20, False),
+    'Curricular_units_1st_sem_enrolled': (0, 26, False),
+    'Curricular_units_1st_sem_evaluations': (0, 45, False),
+    'Curricular_units_1st_sem_approved': (0, 26, False),
+    'Curricular_units_1st_sem_grade': (0.0, 18.9, True),
+    'Curricular_units_1st_sem_without_evaluations': (0, 12, False),
+    'Curricular_units_2nd_sem_credited': (0, 19, False),
+    'Curricular_units_2nd_sem_enrolled': (0, 23, False),
+    'Curricular_units_2nd_sem_evaluations': (0, 33, False),
+    'Curricular_units_2nd_sem_approved': (0, 20, False),
+    'Curricular_units_2nd_sem_grade': (0.0, 18.6, True),
+    'Curricular_units_2nd_sem_without_evaluations': (0, 12, False),
+    'Unemployment_rate': (7.6, 16.2, True),
+    'Inflation_rate': (-0.8, 3.7, True),
+    'GDP': (-4.06, 3.51, True)
+}
+STATUSES = np.array(['Dropout', 'Enrolled', 'Graduate'])
+
+
+def synthetic_students(n_rows, seed=0):
+    """DataFrame mahasiswa sintetis (deterministik per seed) dengan kolom Status"""
+    rng = np.random.default_rng(seed)
+    data = {}
+    for col, (low, high, is_float) in SCHEMA.items():
+        if is_float:
+            data[col] = np.round(rng.uniform(low, high, n_rows), 2)
+        else:
+            data[col] = rng.integers(low, high + 1, n_rows)
+
+    # Make Status depend on a few strong features so the forest has structure to learn
+    signal = (data['Curricular_units_2nd_sem_approved'] / 20 + data['Tuition_fees_up_to_date']
+              + rng.normal(0, 0.3, n_rows))
+    data['Status'] = STATUSES[np.digitize(signal, [0.6, 1.0])]
+    return pd.DataFrame(data)
+
+
+def _student_sampler(profile_path=None):
+    """Fungsi (n_rows, seed) -> DataFrame: profil data asli bila ada, selain itu SCHEMA"""
+    if profile_path is None:
+        return synthetic_students
+    profile = StudentProfile.from_json(profile_path)
+    return lambda n_rows, seed=0: pd.concat(profile.generate(n_rows, seed=seed), ignore_index=True)
+
+
+def _timeit(func, repeat):
+    """Jalankan func `repeat` kali; kembalikan daftar durasi (detik)"""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def _peak_memory(func):
+    """Peak alokasi Python + NumPy (byte) selama satu eksekusi func"""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def measure(name, func, size=None, repeat=5, warmup=1, rows=None, measure_memory=True):
+    """Ukur latency percentile, throughput, dan peak memory satu kasus"""
+    for _ in range(warmup):
+        func()
+    durations = np.array(_timeit(func, repeat))
+    result = {
+        'name': name,
+        'size': size,
+        'repeat': repeat,
+        'mean_s': float(durations.mean()),
+        'p50_s': float(np.percentile(durations, 50)),
+        'p90_s': float(np.percentile(durations, 90)),
+        'p99_s': float(np.percentile(durations, 99)),
+        'throughput_rows_s': float(rows / np.median(durations)) if rows else None,
+        # Measured in a separate run: tracemalloc slows the timed runs down
+        'peak_memory_mb': _peak_memory(func) / 2**20 if measure_memory else None
+    }
+    throughput = f", {result['throughput_rows_s']:,.0f} rows/s" if rows else ''
+    print(f"   {name:<28} size={str(size):<8} p50={result['p50_s'] * 1000:9.3f} ms "
+          f"p99={result['p99_s'] * 1000:9.3f} ms{throughput}")
+    return result
+
+
+def run_suite(sizes=(1_000, 10_000, 100_000), train_sizes=(1_000, 5_000), single_calls=2_000, seed=0,
+              profile_path=None):
+    """Jalankan seluruh benchmark dan kembalikan list hasil
+
+    profile_path: profil dari `synthetic_data.py fit`; tanpa profil data
+    dibangkitkan dari rentang SCHEMA.
+    """
+    results = []
+    workdir = tempfile.mkdtemp(prefix='dropout-bench-')
+    previous_cache = os.environ.get('DROPOUT_DATA_CACHE')
+    students = _student_sampler(profile_path)
+    try:
+        return _run_suite(results, workdir, students, sizes, train_sizes, single_calls, seed)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+        if previous_cache is None:
+            os.environ.pop('DROPOUT_DATA_CACHE', None)
+        else:
+            os.environ['DROPOUT_DATA_CACHE'] = previous_cache
+
+
+def _run_suite(results, workdir, students, sizes, train_sizes, single_calls, seed):
+    # Keep the dataset cache inside the scratch directory, never in the user's cache
+    os.environ['DROPOUT_DATA_CACHE'] = os.path.join(workdir, 'cache')
+
+    # Model under test, trained on synthetic data
+    train_df = students(max(train_sizes), seed=seed)
+    train_path = os.path.join(workdir, 'train.csv')
+    train_df.to_csv(train_path, sep=';', index=False)
+    predictor = DropoutPredictor()
+    X, y, _ = predictor.load_and_prepare_data(train_path, offline=True)
+    predictor.train_model(X, y)
+
+    print("\n⏱️ Inference")
+    record = X.iloc[0].to_dict()
+    result = measure('predict_single', lambda: predictor.predict_single(record),
+                     size=1, repeat=single_calls, warmup=50, measure_memory=False)
+    results.append(result)
+
+    for size in sizes:
+        batch = students(size, seed=seed + 1).drop(columns='Status')
+        results.append(measure('predict_batch', lambda: predictor.predict_batch(batch),
+                               size=size, repeat=3, rows=size))
+        results.append(measure('predict_batch_explain', lambda: predictor.predict_batch(batch, explain=True),
+                               size=size, repeat=3, rows=size))
+        scores = predictor.predict_batch(batch)
+        results.append(measure('rank_cohort', lambda: predictor.rank_cohort(batch, k=50, offset=100, scores=scores),
+                               size=size, repeat=5, rows=size))
+        if size <= 10_000:
+            # 20 grid points per student, scored as one stacked call
+            grid = {'Curricular_units_2nd_sem_grade': np.linspace(0, 20, 20).tolist()}
+            results.append(measure('what_if', lambda: predictor.what_if(batch, grid),
+                                   size=size, repeat=3, rows=size * 20))
+
+    print("\n⏱️ Artifact")
+    model_path = os.path.join(workdir, 'model.pkl')
+    results.append(measure('save_model', lambda: predictor.save_model(model_path), repeat=5))
+    loaded = DropoutPredictor()
+    results.append(measure('load_model', lambda: loaded.load_model(model_path), repeat=10))
+    results.append(measure('load_model_mmap', lambda: loaded.load_model(model_path, mmap_mode='r'), repeat=10))
+    results[-1]['artifact_mb'] = os.path.getsize(model_path) / 2**20
+    compact_path = os.path.join(workdir, 'model.compact.pkl')
+    predictor.save_model(compact_path, compact=True)
+    results.append(measure('load_model_compact', lambda: loaded.load_model(compact_path), repeat=10))
+    results[-1]['artifact_mb'] = os.path.getsize(compact_path) / 2**20
+
+    print("\n⏱️ Training & data")
+    def train(X_train, y_train):
+        # Fresh predictor sharing the fitted preprocessing of the one above
+        trainee = DropoutPredictor()
+        trainee.feature_names = predictor.feature_names
+        trainee.target_encoder = predictor.target_encoder
+        trainee.train_model(X_train, y_train)
+
+    for size in train_sizes:
+        X_train, y_train = X.iloc[:size], y.iloc[:size]
+        results.append(measure('train_model', lambda: train(X_train, y_train),
+                               size=size, repeat=1, warmup=0, rows=size))
+
+    for size in sizes:
+        path = os.path.join(workdir, f'data_{size}.csv')
+        students(size, seed=seed + 2).to_csv(path, sep=';', index=False)
+        # The warmup run fills the cache; timed runs measure the cached path
+        results.append(measure('load_and_prepare_data', lambda: DropoutPredictor().load_and_prepare_data(path, offline=True),
+                               size=size, repeat=3, rows=size))
+
+    try:
+        import streamlit_app
+    except ImportError as e:
+        print(f"\n⚠️ Lewati helper Streamlit: {e}")
+    else:
+        print("\n⏱️ Streamlit helpers")
+        for size in sizes:
+            df = students(size, seed=seed + 3)
+            results.append(measure('aggregate_cube_build', lambda: AggregateCube.build(df),
+                                   size=size, repeat=3, rows=size))
+            cube = AggregateCube.build(df)
+            results.append(measure('dashboard_stats', lambda: streamlit_app.dashboard_stats(cube),
+                                   size=size, repeat=5, rows=size))
+            results.append(measure('histogram_by_status',
+                                   lambda: streamlit_app.histogram_by_status(df, 'Admission_grade', 20),
+                                   size=size, repeat=5, rows=size))
+
+    return results
+
+
+def _environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        commit = None
+    return {
+        'commit': commit or None,
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'sklearn': sklearn.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count()
+    }
+
+
+def compare(baseline, current, threshold=0.10, metric='p50_s'):
+    """Bandingkan dua file hasil; kembalikan list regresi di atas threshold"""
+    base = {(r['name'], r['size']): r for r in baseline['results']}
+    regressions = []
+    for result in current['results']:
+        key = (result['name'], result['size'])
+        if key not in base or not base[key][metric]:
+            continue
+        change = result[metric] / base[key][metric] - 1
+        marker = '🔴' if change > threshold else ('🟢' if change < -threshold else '⚪')
+        print(f"{marker} {result['name']:<28} size={str(result['size']):<8} "
+              f"{base[key][metric] * 1000:9.3f} ms -> {result[metric] * 1000:9.3f} ms ({change:+.1%})")
+        if change > threshold:
+            regressions.append({'name': result['name'], 'size': result['size'], 'change': change})
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark performa prediksi dropout")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help="Jalankan benchmark dan simpan JSON")
+    run_parser.add_argument('--output', default='benchmark_results.json')
+    run_parser.add_argument('--sizes', default='1000,10000,100000', help="Ukuran batch/data, dipisah koma")
+    run_parser.add_argument('--train-sizes', default='1000,5000')
+    run_parser.add_argument('--single-calls', type=int, default=2000)
+    run_parser.add_argument('--seed', type=int, default=0)
+    run_parser.add_argument('--profile', default=None, help="Profil dari `synthetic_data.py fit` (default: SCHEMA)")
+
+    compare_parser = subparsers.add_parser('compare', help="Bandingkan dua hasil benchmark")
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.10, help="Regresi relatif yang ditoleransi")
+    compare_parser.add_argument('--metric', default='p50_s')
+
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        results = run_suite(
+            sizes=[int(size) for size in args.sizes.split(',')],
+            train_sizes=[int(size) for size in args.train_sizes.split(',')],
+            single_calls=args.single_calls,
+            seed=args.seed,
+            profile_path=args.profile
+        )
+        with open(args.output, 'w') as f:
+            json.dump({'environment': _environment(), 'results': results}, f, indent=2)
+        print(f"\n✅ Hasil benchmark disimpan ke {args.output}")
+    else:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.current) as f:
+            current = json.load(f)
+        regressions = compare(baseline, current, args.threshold, args.metric)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regresi di atas {args.threshold:.0%}")
+            sys.exit(1)
+        print("\n✅ Tidak ada regresi")
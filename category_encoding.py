@@ -0,0 +1,81 @@
+# category_encoding.py
+# Tabel lookup kategori pengganti LabelEncoder.transform per panggilan
+
+import numpy as np
+import pandas as pd
+
+
+class CategoryTable:
+    """Tabel hash kategori -> kode yang meng-encode satu kolom sekaligus
+
+    Kode identik dengan LabelEncoder (kategori terurut). Kategori yang tidak
+    dikenal dipetakan per baris ke `fallback_code`; jika `fallback_code`
+    bernilai None, baris tersebut di-encode sebagai NaN (dianggap tidak valid).
+    `counts` (frekuensi training per kategori) disimpan agar fallback dapat
+    dipilih ulang setelah artifact dimuat (lihat `with_fallback`).
+    """
+
+    def __init__(self, categories, fallback_code=None, counts=None):
+        self.categories = np.asarray(categories)
+        self.fallback_code = fallback_code
+        self.counts = counts
+        self._index = pd.Index(self.categories)
+        self._lookup = {value: code for code, value in enumerate(self.categories.tolist())}
+
+    @classmethod
+    def from_label_encoder(cls, encoder, codes=None, fallback='most_frequent'):
+        """Kompilasi LabelEncoder yang sudah di-fit menjadi tabel lookup
+
+        `codes` adalah kolom training yang sudah di-encode; tanpa itu frekuensi
+        tidak diketahui dan fallback 'most_frequent' jatuh ke kode 0.
+        """
+        categories = encoder.classes_
+        if codes is None:
+            counts = np.zeros(len(categories), dtype=np.int64)
+        else:
+            counts = np.bincount(np.asarray(codes, dtype=np.intp), minlength=len(categories))
+        return cls(categories, cls._resolve_fallback(categories, counts, fallback), counts)
+
+    def with_fallback(self, fallback):
+        """Tabel dengan kategori yang sama dan strategi fallback lain
+
+        Tabel dari artifact lama tanpa `counts` mempertahankan fallback
+        tersimpan untuk 'most_frequent' (frekuensinya tidak diketahui).
+        """
+        if fallback == 'most_frequent' and self.counts is None:
+            return self
+        return CategoryTable(self.categories, self._resolve_fallback(self.categories, self.counts, fallback),
+                             self.counts)
+
+    @staticmethod
+    def _resolve_fallback(categories, counts, fallback):
+        """Terjemahkan strategi fallback menjadi kode integer (atau None)"""
+        if fallback is None:
+            return None
+        if fallback == 'most_frequent':
+            return int(np.argmax(counts)) if len(counts) else None
+        if fallback == 'first':
+            return 0
+        matches = np.flatnonzero(np.asarray(categories) == fallback)
+        if len(matches) == 0:
+            raise ValueError(f"Fallback category {fallback!r} tidak ada di data training")
+        return int(matches[0])
+
+    def encode(self, values):
+        """Encode satu kolom secara vektor; kategori baru -> fallback per baris"""
+        codes = self._index.get_indexer(pd.Series(values)).astype(np.float64)
+        unseen = codes < 0
+        if unseen.any():
+            codes[unseen] = np.nan if self.fallback_code is None else self.fallback_code
+        return codes
+
+    def encode_value(self, value):
+        """Encode satu nilai lewat lookup dictionary"""
+        code = self._lookup.get(value, self.fallback_code)
+        return np.nan if code is None else code
+
+    def __getstate__(self):
+        return {'categories': self.categories, 'fallback_code': self.fallback_code, 'counts': self.counts}
+
+    def __setstate__(self, state):
+        self.__init__(state['categories'], state['fallback_code'], state.get('counts'))
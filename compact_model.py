@@ -0,0 +1,102 @@
+# compact_model.py
+# Artifact ringkas (engine terkuantisasi tanpa pohon sklearn) dan laporan validasi terhadap artifact penuh
+
+import argparse
+import contextlib
+import io
+import os
+import time
+
+import numpy as np
+
+from dataset_cache import load_dataset
+from model_inference import DropoutPredictor
+
+
+def _load_quietly(filepath, repeat=1):
+    """Load artifact `repeat` kali; kembalikan predictor dan median waktu load (detik)"""
+    durations = []
+    for _ in range(repeat):
+        predictor = DropoutPredictor()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            predictor.load_model(filepath)
+        durations.append(time.perf_counter() - start)
+    return predictor, float(np.median(durations))
+
+
+def validate(full_path, compact_path, X, repeat=5):
+    """Laporan perbandingan artifact compact terhadap artifact penuh
+
+    X adalah matriks fitur ter-encode (urutan feature_names). Berisi
+    kesepakatan prediksi dan level risiko, galat probabilitas (dengan batas
+    teoretisnya), apakah setiap baris menempuh jalur pohon yang sama, serta
+    ukuran file, memori engine, dan waktu load.
+    """
+    full, full_load = _load_quietly(full_path, repeat)
+    compact, compact_load = _load_quietly(compact_path, repeat)
+    X = np.asarray(X, dtype=np.float64)
+
+    proba_full = full.engine.predict_proba(X)
+    proba_compact = compact.engine.predict_proba(X)
+    error = np.abs(proba_full - proba_compact)
+
+    class_names = list(full.target_encoder.classes_)
+    dropout = class_names.index('Dropout') if 'Dropout' in class_names else None
+    risk_agreement = None
+    if dropout is not None:
+        risk_agreement = float(np.mean(full._get_risk_levels(proba_full[:, dropout])
+                                       == compact._get_risk_levels(proba_compact[:, dropout])))
+
+    return {
+        'rows': len(X),
+        'prediction_agreement': float(np.mean(proba_full.argmax(axis=1) == proba_compact.argmax(axis=1))),
+        'risk_level_agreement': risk_agreement,
+        'routing_identical': bool(np.array_equal(full.engine.apply(X), compact.engine.apply(X))),
+        'max_abs_error': float(error.max()),
+        'mean_abs_error': float(error.mean()),
+        'error_bound': 0.5 / compact.engine.value_scale,
+        'file_mb': (os.path.getsize(full_path) / 2**20, os.path.getsize(compact_path) / 2**20),
+        'engine_mb': (full.engine.nbytes / 2**20, compact.engine.nbytes / 2**20),
+        'load_ms': (full_load * 1000, compact_load * 1000)
+    }
+
+
+def format_report(report):
+    lines = [
+        f"📋 Validasi pada {report['rows']:,} baris",
+        f"   {'kesepakatan prediksi':<25}: {report['prediction_agreement']:.4%}",
+    ]
+    if report['risk_level_agreement'] is not None:
+        lines.append(f"   {'kesepakatan level risiko':<25}: {report['risk_level_agreement']:.4%}")
+    lines += [
+        f"   {'jalur pohon identik':<25}: {'ya' if report['routing_identical'] else 'TIDAK'}",
+        f"   {'galat probabilitas':<25}: max {report['max_abs_error']:.2e}, rata-rata {report['mean_abs_error']:.2e} "
+        f"(batas {report['error_bound']:.2e})",
+    ]
+    for label, key, unit in (('ukuran file', 'file_mb', 'MB'), ('memori engine', 'engine_mb', 'MB'),
+                             ('waktu load', 'load_ms', 'ms')):
+        full, compact = report[key]
+        lines.append(f"   {label:<25}: {full:8.2f} → {compact:8.2f} {unit} ({full / compact:.1f}x lebih kecil)")
+    return '\n'.join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tulis artifact compact dan validasi terhadap artifact penuh")
+    parser.add_argument('model', help="Artifact penuh dari save_model")
+    parser.add_argument('--output', default=None, help="Default: <model>.compact.pkl")
+    parser.add_argument('--bits', type=int, choices=[8, 16], default=16, help="Lebar nilai distribusi kelas")
+    parser.add_argument('--data', default=None, help="Data validasi (CSV/URL/direktori); default: dataset Dicoding")
+    parser.add_argument('--repeat', type=int, default=5, help="Pengulangan pengukuran waktu load")
+    args = parser.parse_args()
+
+    output = args.output or f"{os.path.splitext(args.model)[0]}.compact.pkl"
+    predictor = DropoutPredictor()
+    predictor.load_model(args.model)
+    predictor.save_model(output, compact=True, value_bits=args.bits)
+
+    df = load_dataset(args.data)
+    X, invalid = predictor._prepare_features(df.drop(columns='Status', errors='ignore'))
+    X = X[~invalid.any(axis=1)]
+
+    print(format_report(validate(args.model, output, X, repeat=args.repeat)))
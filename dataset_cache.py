@@ -0,0 +1,276 @@
+# dataset_cache.py
+# Cache dataset lokal berformat kolumnar (.npy per kolom) dengan mode offline
+
+import hashlib
+import io
+import json
+import os
+import shutil
+import time
+import urllib.error
+import urllib.request
+from email.utils import formatdate
+
+import numpy as np
+import pandas as pd
+
+DATASET_URL = "https://raw.githubusercontent.com/dicodingacademy/dicoding_dataset/main/students_performance/data.csv"
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'jji_dropout')
+
+# Remote sources are revalidated (conditional GET) at most this often
+DEFAULT_MAX_AGE = 24 * 3600
+
+
+def _is_url(source):
+    return source.startswith(('http://', 'https://'))
+
+
+def _env_flag(name):
+    return os.environ.get(name, '').lower() in ('1', 'true', 'yes')
+
+
+def _sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class DatasetCache:
+    """Cache satu sumber CSV sebagai kolom biner dengan dtype yang benar
+
+    Setiap sumber (URL atau file lokal) punya direktori sendiri berisi satu
+    versi per checksum dan pointer `current.json`. Versi baru ditulis lengkap
+    dulu lalu pointer diganti secara atomik, sehingga pembaca tidak pernah
+    melihat cache setengah jadi.
+    """
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir or os.environ.get('DROPOUT_DATA_CACHE', DEFAULT_CACHE_DIR)
+
+    def _source_dir(self, source):
+        return os.path.join(self.cache_dir, hashlib.sha1(source.encode()).hexdigest()[:16])
+
+    def read_manifest(self, source):
+        """Manifest versi aktif untuk sumber ini, atau None"""
+        return self._read_manifest(self._source_dir(source))
+
+    @staticmethod
+    def _read_manifest(source_dir):
+        try:
+            with open(os.path.join(source_dir, 'current.json')) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _write_pointer(self, source_dir, manifest):
+        tmp_path = os.path.join(source_dir, f'current.json.tmp-{os.getpid()}')
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, os.path.join(source_dir, 'current.json'))
+
+    def store(self, source, data, delimiter=';', **source_info):
+        """Parse CSV mentah, simpan kolom biner, dan kembalikan DataFrame"""
+        df = pd.read_csv(io.BytesIO(data), delimiter=delimiter)
+        sha256 = _sha256(data)
+
+        source_dir = self._source_dir(source)
+        version_dir = os.path.join(source_dir, sha256[:16])
+        tmp_dir = f'{version_dir}.tmp-{os.getpid()}'
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+
+        columns = []
+        for i, col in enumerate(df.columns):
+            values = df[col].to_numpy()
+            entry = {'name': col, 'file': f'{i:03d}.npy'}
+            if values.dtype.kind in 'biuf':
+                np.save(os.path.join(tmp_dir, entry['file']), values, allow_pickle=False)
+            else:
+                # Text columns are stored as integer codes plus their categories; missing text is -1
+                codes, categories = pd.factorize(df[col], use_na_sentinel=True)
+                np.save(os.path.join(tmp_dir, entry['file']), codes.astype(np.int32), allow_pickle=False)
+                entry['categories'] = categories.tolist()
+            columns.append(entry)
+
+        manifest = {
+            'source': source,
+            'sha256': sha256,
+            'n_rows': len(df),
+            'version_dir': os.path.basename(version_dir),
+            'columns': columns,
+            'cached_at': time.time(),
+            **source_info
+        }
+        with open(os.path.join(tmp_dir, 'manifest.json'), 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+        shutil.rmtree(version_dir, ignore_errors=True)
+        os.replace(tmp_dir, version_dir)
+        previous = self._read_manifest(source_dir)
+        self._write_pointer(source_dir, manifest)
+
+        # Drop the superseded version once nothing points at it anymore
+        if previous and previous['version_dir'] != manifest['version_dir']:
+            shutil.rmtree(os.path.join(source_dir, previous['version_dir']), ignore_errors=True)
+
+        df.attrs['dataset_version'] = sha256[:16]
+        return df
+
+    def load(self, source, manifest=None):
+        """Baca versi cache aktif menjadi DataFrame"""
+        source_dir = self._source_dir(source)
+        manifest = manifest or self._read_manifest(source_dir)
+        return self._load_version(os.path.join(source_dir, manifest['version_dir']), manifest)
+
+    @staticmethod
+    def _load_version(version_dir, manifest):
+        data = {}
+        for entry in manifest['columns']:
+            values = np.load(os.path.join(version_dir, entry['file']), allow_pickle=False)
+            if 'categories' in entry:
+                # Code -1 is missing text; plain indexing would turn it into the last category
+                categories = np.asarray(entry['categories'], dtype=object)
+                values = np.where(values >= 0, categories.take(values, mode='clip'), np.nan)
+            data[entry['name']] = values
+        # Keep each loaded column as its own block instead of consolidating into a copy
+        df = pd.DataFrame(data, copy=False)
+        # Content checksum of the source, used to key derived caches (e.g. aggregate_cube)
+        df.attrs['dataset_version'] = manifest['sha256'][:16]
+        return df
+
+    def touch(self, source, manifest, **source_info):
+        """Perbarui metadata validasi tanpa menulis ulang kolom"""
+        manifest = {**manifest, **source_info}
+        self._write_pointer(self._source_dir(source), manifest)
+        return manifest
+
+
+def _fetch(url, manifest, timeout=30):
+    """Conditional GET; mengembalikan (data atau None jika 304, info validator)"""
+    request = urllib.request.Request(url)
+    if manifest:
+        if manifest.get('etag'):
+            request.add_header('If-None-Match', manifest['etag'])
+        if manifest.get('last_modified'):
+            request.add_header('If-Modified-Since', manifest['last_modified'])
+
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            data = response.read()
+            info = {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified') or formatdate(usegmt=True)
+            }
+            return data, info
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return None, {}
+        raise
+
+
+def _resolve_local(source):
+    """File CSV, direktori berisi data.csv, atau direktori cache hasil ekspor"""
+    if os.path.isdir(source):
+        candidate = os.path.join(source, 'data.csv')
+        if os.path.isfile(candidate):
+            return candidate, None
+        manifest = DatasetCache._read_manifest(source)
+        if manifest:
+            return None, manifest
+        raise FileNotFoundError(f"Direktori {source} tidak berisi data.csv maupun cache dataset")
+    if not os.path.isfile(source):
+        raise FileNotFoundError(f"Dataset {source} tidak ditemukan")
+    return source, None
+
+
+def load_dataset(source=None, cache_dir=None, offline=None, max_age=DEFAULT_MAX_AGE,
+                 refresh=False, expected_sha256=None, delimiter=';'):
+    """Load data.csv lewat cache kolumnar lokal
+
+    - source: URL, path file CSV, atau direktori (berisi data.csv atau cache).
+      Default: env DROPOUT_DATA_SOURCE, lalu URL dataset Dicoding.
+    - offline: jangan pernah mengakses jaringan (default: env DROPOUT_DATA_OFFLINE).
+    - max_age: detik sebelum sumber remote divalidasi ulang; refresh=True memaksa.
+    - expected_sha256: tolak data yang checksum-nya berbeda.
+    """
+    source = source or os.environ.get('DROPOUT_DATA_SOURCE') or DATASET_URL
+    offline = _env_flag('DROPOUT_DATA_OFFLINE') if offline is None else offline
+    cache = DatasetCache(cache_dir)
+
+    if _is_url(source):
+        manifest = cache.read_manifest(source)
+        fresh = manifest and time.time() - manifest.get('validated_at', 0) < max_age
+
+        if offline or (fresh and not refresh):
+            if manifest is None:
+                raise FileNotFoundError(
+                    f"Mode offline: belum ada cache untuk {source}. "
+                    "Set DROPOUT_DATA_SOURCE ke file atau direktori lokal."
+                )
+            df = cache.load(source, manifest)
+        else:
+            try:
+                data, info = _fetch(source, manifest)
+            except (urllib.error.URLError, OSError) as e:
+                if manifest is None:
+                    raise
+                print(f"⚠️ Gagal menghubungi {source} ({e}); memakai cache lokal")
+                return _verified(cache.load(source, manifest), manifest, expected_sha256)
+
+            if data is None:
+                # 304 Not Modified
+                manifest = cache.touch(source, manifest, validated_at=time.time())
+                df = cache.load(source, manifest)
+            elif manifest and manifest['sha256'] == _sha256(data):
+                manifest = cache.touch(source, manifest, validated_at=time.time(), **info)
+                df = cache.load(source, manifest)
+            else:
+                _check_sha256(data, expected_sha256)
+                df = cache.store(source, data, delimiter, validated_at=time.time(), **info)
+                manifest = cache.read_manifest(source)
+        return _verified(df, manifest, expected_sha256)
+
+    csv_path, exported_manifest = _resolve_local(source)
+    if exported_manifest:
+        # A cache directory copied onto an offline machine
+        version_dir = os.path.join(source, exported_manifest['version_dir'])
+        df = DatasetCache._load_version(version_dir, exported_manifest)
+        return _verified(df, exported_manifest, expected_sha256)
+
+    csv_path = os.path.abspath(csv_path)
+    stat = os.stat(csv_path)
+    manifest = cache.read_manifest(csv_path)
+    if manifest and not refresh and (manifest.get('size'), manifest.get('mtime_ns')) == (stat.st_size, stat.st_mtime_ns):
+        return _verified(cache.load(csv_path, manifest), manifest, expected_sha256)
+
+    with open(csv_path, 'rb') as f:
+        data = f.read()
+    _check_sha256(data, expected_sha256)
+    if manifest and manifest['sha256'] == _sha256(data):
+        # Touched but unchanged file: keep the parsed columns
+        manifest = cache.touch(csv_path, manifest, size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+        return cache.load(csv_path, manifest)
+    return cache.store(csv_path, data, delimiter, size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+
+
+def _check_sha256(data, expected_sha256):
+    if expected_sha256 and _sha256(data) != expected_sha256:
+        raise ValueError(f"Checksum dataset tidak cocok: {_sha256(data)} != {expected_sha256}")
+
+
+def _verified(df, manifest, expected_sha256):
+    if expected_sha256 and manifest['sha256'] != expected_sha256:
+        raise ValueError(f"Checksum dataset tidak cocok: {manifest['sha256']} != {expected_sha256}")
+    return df
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Isi atau perbarui cache dataset lokal")
+    parser.add_argument('source', nargs='?', default=None, help="URL, file CSV, atau direktori")
+    parser.add_argument('--cache-dir', default=None)
+    parser.add_argument('--refresh', action='store_true')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    df = load_dataset(args.source, cache_dir=args.cache_dir, refresh=args.refresh)
+    print(f"✅ {len(df)} baris x {df.shape[1]} kolom dalam {(time.perf_counter() - start) * 1000:.1f} ms")
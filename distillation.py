@@ -0,0 +1,280 @@
+# distillation.py
+# Surrogate ringan (satu pohon dangkal) hasil distillation dari forest, dengan fallback di dekat cutoff risiko
+
+import argparse
+import os
+import time
+
+import joblib
+import numpy as np
+from sklearn.model_selection import train_test_split
+from sklearn.tree import DecisionTreeClassifier
+
+from dataset_cache import load_dataset
+from forest_engine import CompiledForest
+from model_inference import DropoutPredictor
+
+
+class Surrogate:
+    """Satu pohon dangkal yang meniru probabilitas teacher (DropoutPredictor)
+
+    Baris yang probabilitas Dropout-nya berjarak < risk_margin dari cutoff
+    risiko, atau yang selisih dua kelas teratasnya < status_margin, di-score
+    ulang oleh model penuh. Margin dikalibrasi dari galat pada data validasi
+    (lihat distill), sehingga hanya baris yang benar-benar jelas memakai
+    surrogate.
+    """
+
+    def __init__(self, engine, teacher_version, dropout_index, thresholds, risk_margin=0.0,
+                 status_margin=0.0, report=None):
+        self.engine = engine
+        self.teacher_version = teacher_version
+        self.dropout_index = dropout_index
+        self.thresholds = thresholds
+        self.risk_margin = risk_margin
+        self.status_margin = status_margin
+        self.report = report or {}
+        self._nodes = None
+
+    def predict_proba(self, X):
+        """Probabilitas surrogate saja (tanpa fallback)"""
+        X = np.atleast_2d(X)
+        if len(X) == 1:
+            return self._predict_row(X[0])[np.newaxis]
+        return self.engine.predict_proba(X)
+
+    def _predict_row(self, x):
+        """Satu baris dengan int/float Python: tanpa overhead NumPy di setiap level pohon"""
+        if self._nodes is None:
+            engine = self.engine
+            self._nodes = (engine.feature.tolist(), engine.threshold.tolist(), engine.children_left.tolist(),
+                           engine.children_right.tolist(), engine.missing_go_to_left.tolist())
+        feature, threshold, left, right, missing_left = self._nodes
+
+        # Compare float32 inputs against float64 thresholds, like the vectorized engine
+        x = np.asarray(x, dtype=np.float32).tolist()
+        node = int(self.engine.roots[0])
+        while left[node] != node:
+            value = x[feature[node]]
+            go_left = missing_left[node] if value != value else value <= threshold[node]
+            node = left[node] if go_left else right[node]
+        return self.engine._float_value()[node].copy()
+
+    def needs_fallback(self, proba):
+        """Mask baris borderline yang harus di-score model penuh"""
+        if len(proba) == 1:
+            return np.array([self._row_needs_fallback(proba[0].tolist())])
+        fallback = np.zeros(len(proba), dtype=bool)
+        if self.dropout_index is not None and self.risk_margin > 0:
+            dropout = proba[:, self.dropout_index]
+            for threshold in self.thresholds:
+                fallback |= np.abs(dropout - threshold) < self.risk_margin
+        if self.status_margin > 0:
+            top_two = np.partition(proba, -2, axis=1)[:, -2:]
+            fallback |= top_two[:, 1] - top_two[:, 0] < self.status_margin
+        return fallback
+
+    def _row_needs_fallback(self, proba):
+        if self.dropout_index is not None:
+            dropout = proba[self.dropout_index]
+            if any(abs(dropout - threshold) < self.risk_margin for threshold in self.thresholds):
+                return True
+        second, first = sorted(proba)[-2:]
+        return first - second < self.status_margin
+
+    def score(self, X, teacher_engine):
+        """Probabilitas fast mode dan mask baris yang memakai teacher"""
+        proba = self.predict_proba(X)
+        fallback = self.needs_fallback(proba)
+        if fallback.any():
+            proba[fallback] = teacher_engine.predict_proba(X[fallback])
+        return proba, fallback
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        joblib.dump({key: value for key, value in self.__dict__.items() if not key.startswith('_')}, path)
+
+    @classmethod
+    def load(cls, path):
+        return cls(**joblib.load(path))
+
+
+def _calibrate_margin(distance, disagree, target):
+    """Margin terkecil sehingga baris dengan distance >= margin mencapai kesepakatan `target`
+
+    distance: jarak baris ke batas keputusan menurut surrogate; disagree:
+    surrogate berbeda dengan teacher. Baris di bawah margin di-fallback.
+    """
+    allowed = int(np.floor((1 - target) * len(distance)))
+    wrong = np.sort(distance[disagree])[::-1]
+    if len(wrong) <= allowed:
+        return 0.0
+    # Keep at most `allowed` disagreements above the margin: just beyond the next-largest one
+    return float(np.nextafter(wrong[allowed], np.inf))
+
+
+def augment_rows(X, n_rows, n_swaps=3, random_state=0):
+    """Baris tambahan: salinan baris nyata dengan n_swaps kolom diambil dari baris acak lain
+
+    Tetap dekat dengan distribusi gabungan data nyata, tetapi mengisi sel
+    ruang fitur di sekitar batas keputusan teacher yang jarang terisi.
+    """
+    rng = np.random.default_rng(random_state)
+    rows = X[rng.integers(0, len(X), n_rows)]
+    for _ in range(n_swaps):
+        columns = rng.integers(0, X.shape[1], n_rows)
+        rows[np.arange(n_rows), columns] = X[rng.integers(0, len(X), n_rows), columns]
+    return rows
+
+
+def distill(predictor, X, n_augmented=0, max_depth=8, min_samples_leaf=10, target_fidelity=0.999,
+            guard_status=True, calibration_size=0.25, random_state=42):
+    """Latih surrogate pada soft label teacher dan kalibrasi margin fallback
+
+    - X: fitur ter-encode mahasiswa nyata (tanpa label). n_augmented baris
+      augment_rows dari bagian training ikut dilatih (teacher memberi labelnya).
+    - Soft label: setiap baris diulang per kelas dengan bobot probabilitas
+      teacher, sehingga daun pohon berisi rata-rata probabilitas teacher.
+    - Sebagian X disisihkan untuk kalibrasi: margin risiko (jarak Dropout ke
+      cutoff 0.4/0.7) dan margin status (selisih dua kelas teratas) dipilih
+      sekecil mungkin sehingga baris di luar margin sepakat dengan teacher
+      untuk setidaknya `target_fidelity` baris kalibrasi. Dengan
+      guard_status=False hanya level risiko yang dijaga (fallback lebih sedikit).
+    """
+    X = np.asarray(X, dtype=np.float64)
+    X_train, X_calibration = train_test_split(X, test_size=calibration_size, random_state=random_state)
+    if n_augmented:
+        # Augment only from the training part so calibration rows stay unseen
+        X_train = np.vstack([X_train, augment_rows(X_train, n_augmented, random_state=random_state)])
+
+    teacher_train = predictor.engine.predict_proba(X_train)
+    n_classes = teacher_train.shape[1]
+    weights = teacher_train.T.ravel()
+    keep = weights > 0
+    student = DecisionTreeClassifier(max_depth=max_depth, min_samples_leaf=min_samples_leaf,
+                                     random_state=random_state)
+    student.fit(np.tile(X_train, (n_classes, 1))[keep], np.repeat(np.arange(n_classes), len(X_train))[keep],
+                sample_weight=weights[keep])
+    if not np.array_equal(student.classes_, np.arange(n_classes)):
+        raise ValueError("Data distillation tidak mencakup semua kelas teacher")
+
+    # Student classes are positions in the teacher's probability vector
+    engine = CompiledForest.from_sklearn(student)
+    engine.classes = predictor.engine.classes
+
+    class_names = list(predictor.target_encoder.classes_)
+    surrogate = Surrogate(
+        engine,
+        teacher_version=predictor.model_version,
+        dropout_index=class_names.index('Dropout') if 'Dropout' in class_names else None,
+        thresholds=(predictor.MEDIUM_RISK_THRESHOLD, predictor.HIGH_RISK_THRESHOLD)
+    )
+
+    student_proba = surrogate.predict_proba(X_calibration)
+    teacher_proba = predictor.engine.predict_proba(X_calibration)
+    if surrogate.dropout_index is not None:
+        student_dropout = student_proba[:, surrogate.dropout_index]
+        teacher_dropout = teacher_proba[:, surrogate.dropout_index]
+        distance = np.min([np.abs(student_dropout - t) for t in surrogate.thresholds], axis=0)
+        disagree = predictor._get_risk_levels(student_dropout) != predictor._get_risk_levels(teacher_dropout)
+        surrogate.risk_margin = _calibrate_margin(distance, disagree, target_fidelity)
+    if guard_status:
+        top_two = np.partition(student_proba, -2, axis=1)[:, -2:]
+        surrogate.status_margin = _calibrate_margin(top_two[:, 1] - top_two[:, 0],
+                                                    student_proba.argmax(axis=1) != teacher_proba.argmax(axis=1),
+                                                    target_fidelity)
+    return surrogate
+
+
+def _best_seconds(func, repeat=5):
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+def fidelity_report(predictor, surrogate, X, single_rows=500):
+    """Kesepakatan dengan teacher (risk_level, predicted_status) dan speedup, surrogate saja vs fast mode"""
+    X = np.asarray(X, dtype=np.float64)
+    teacher = predictor.engine.predict_proba(X)
+    student = surrogate.predict_proba(X)
+    fast, fallback = surrogate.score(X, predictor.engine)
+
+    def agreement(proba):
+        result = {'predicted_status_agreement': float(np.mean(proba.argmax(axis=1) == teacher.argmax(axis=1)))}
+        if surrogate.dropout_index is not None:
+            column = surrogate.dropout_index
+            result['risk_level_agreement'] = float(np.mean(
+                predictor._get_risk_levels(proba[:, column]) == predictor._get_risk_levels(teacher[:, column])))
+            result['dropout_mae'] = float(np.mean(np.abs(proba[:, column] - teacher[:, column])))
+        return result
+
+    rows = X[:single_rows]
+    teacher_batch = _best_seconds(lambda: predictor.engine.predict_proba(X))
+    teacher_single = _best_seconds(lambda: [predictor.engine.predict_proba(row[np.newaxis]) for row in rows], 3)
+    fast_batch = _best_seconds(lambda: surrogate.score(X, predictor.engine))
+    fast_single = _best_seconds(lambda: [surrogate.score(row[np.newaxis], predictor.engine) for row in rows], 3)
+
+    return {
+        'rows': len(X),
+        'tree_depth': surrogate.engine.max_depth,
+        'tree_nodes': surrogate.engine.n_nodes,
+        'risk_margin': surrogate.risk_margin,
+        'status_margin': surrogate.status_margin,
+        'surrogate_only': agreement(student),
+        'fast_mode': {**agreement(fast), 'fallback_rate': float(fallback.mean())},
+        'batch_speedup': teacher_batch / fast_batch,
+        'single_speedup': teacher_single / fast_single
+    }
+
+
+def format_report(report):
+    lines = [f"📋 Surrogate depth {report['tree_depth']} ({report['tree_nodes']} node), "
+             f"margin risiko ±{report['risk_margin']:.3f}, margin status {report['status_margin']:.3f}, "
+             f"{report['rows']:,} baris uji"]
+    for label, key in (('surrogate saja', 'surrogate_only'), ('fast mode', 'fast_mode')):
+        result = report[key]
+        line = f"   {label:<15}: predicted_status {result['predicted_status_agreement']:.2%}"
+        if 'risk_level_agreement' in result:
+            line += f", risk_level {result['risk_level_agreement']:.2%}, MAE Dropout {result['dropout_mae']:.4f}"
+        if 'fallback_rate' in result:
+            line += f", fallback {result['fallback_rate']:.1%}"
+        lines.append(line)
+    lines.append(f"   {'speedup':<15}: batch {report['batch_speedup']:.1f}x, single {report['single_speedup']:.1f}x "
+                 f"(fast mode vs forest)")
+    return '\n'.join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Distillation forest menjadi surrogate ringan untuk fast mode")
+    parser.add_argument('--model', default='dropout_model.pkl')
+    parser.add_argument('--data', default=None, help="CSV/URL/direktori (default: dataset Dicoding)")
+    parser.add_argument('--augment', type=int, default=0,
+                        help="Jumlah baris augmentasi (kolom ditukar antar baris) yang diberi label teacher")
+    parser.add_argument('--max-depth', type=int, default=8)
+    parser.add_argument('--min-samples-leaf', type=int, default=10)
+    parser.add_argument('--target-fidelity', type=float, default=0.999,
+                        help="Kesepakatan minimum baris non-fallback dengan teacher (data kalibrasi)")
+    parser.add_argument('--no-status-guard', action='store_true',
+                        help="Fallback hanya di sekitar cutoff risiko, bukan saat predicted_status ragu")
+    parser.add_argument('--output', default='dropout_surrogate.joblib')
+    args = parser.parse_args()
+
+    predictor = DropoutPredictor()
+    predictor.load_model(args.model)
+
+    df = load_dataset(args.data)
+    X, invalid = predictor._prepare_features(df.drop(columns='Status', errors='ignore'))
+    X = X[~invalid.any(axis=1)]
+
+    # The report uses rows that neither trained nor calibrated the surrogate
+    X_fit, X_test = train_test_split(X, test_size=0.2, random_state=42)
+    surrogate = distill(predictor, X_fit, n_augmented=args.augment, max_depth=args.max_depth,
+                        min_samples_leaf=args.min_samples_leaf, target_fidelity=args.target_fidelity,
+                        guard_status=not args.no_status_guard)
+    surrogate.report = fidelity_report(predictor, surrogate, X_test)
+    surrogate.save(args.output)
+    print(format_report(surrogate.report))
+    print(f"✅ Surrogate disimpan ke {args.output} (teacher {surrogate.teacher_version})")
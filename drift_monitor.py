@@ -0,0 +1,217 @@
+# drift_monitor.py
+# Histogram referensi per fitur di artifact dan monitor drift streaming (PSI/KS) dengan memori konstan
+
+import argparse
+import threading
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from dataset_cache import load_dataset
+
+# Proportions are clipped before the PSI log-ratio so empty bins stay finite
+PSI_EPSILON = 1e-4
+# Up to this many rows are binned with one broadcast comparison (rows x features x edges);
+# larger batches use one searchsorted per feature
+BROADCAST_ROWS = 256
+
+
+def build_reference(X, feature_names, max_bins=20):
+    """Histogram referensi per fitur dari matriks fitur ter-encode (data training)
+
+    Fitur dengan ≤ max_bins nilai unik (flag, kode kategori) mendapat satu bin
+    per nilai; fitur lain dibagi pada quantile sehingga tiap bin berisi porsi
+    data yang kira-kira sama. Edge disimpan sebagai array padded (+inf), jadi
+    ukurannya tetap fitur x max_bins berapapun jumlah baris.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    edges = np.full((X.shape[1], max_bins - 1), np.inf)
+    for i, column in enumerate(X.T):
+        distinct = np.unique(column[~np.isnan(column)])
+        if len(distinct) <= max_bins:
+            upper = np.arange(1, len(distinct))
+        else:
+            quantiles = np.quantile(column, np.linspace(0, 1, max_bins + 1)[1:-1])
+            upper = np.unique(np.clip(np.searchsorted(distinct, quantiles, side='right'), 1, len(distinct) - 1))
+        # Cuts sit halfway between observed values, so float32 training data and float64 traffic bin alike
+        cuts = (distinct[upper - 1] + distinct[upper]) / 2
+        edges[i, :len(cuts)] = cuts
+
+    return {
+        'features': list(feature_names),
+        'edges': edges,
+        'counts': _bin_counts(X, edges),
+        'rows': len(X),
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds')
+    }
+
+
+def _bin_counts(X, edges):
+    """Jumlah baris per (fitur, bin); bin = banyaknya edge ≤ nilai"""
+    n_features, n_bins = edges.shape[0], edges.shape[1] + 1
+    if len(X) <= BROADCAST_ROWS:
+        bins = (X[:, :, np.newaxis] >= edges).sum(axis=2) + np.arange(n_features) * n_bins
+        return np.bincount(bins.ravel(), minlength=n_features * n_bins).reshape(n_features, n_bins).astype(np.float64)
+    counts = np.empty((n_features, n_bins))
+    for i, column in enumerate(X.T):
+        counts[i] = np.bincount(np.searchsorted(edges[i], column, side='right'), minlength=n_bins)
+    return counts
+
+
+def drift_scores(reference_counts, current_counts):
+    """PSI dan KS per fitur antara dua histogram dengan bin yang sama
+
+    KS dihitung dari CDF per bin: eksak untuk fitur diskrit, batas bawah
+    statistik KS kontinu untuk fitur yang dibagi pada quantile.
+    """
+    reference = reference_counts / np.maximum(reference_counts.sum(axis=1, keepdims=True), 1)
+    current = current_counts / np.maximum(current_counts.sum(axis=1, keepdims=True), 1)
+    ks = np.abs(np.cumsum(reference, axis=1) - np.cumsum(current, axis=1)).max(axis=1)
+    reference, current = np.clip(reference, PSI_EPSILON, None), np.clip(current, PSI_EPSILON, None)
+    psi = ((current - reference) * np.log(current / reference)).sum(axis=1)
+    return psi, ks
+
+
+class DriftMonitor:
+    """Histogram streaming per fitur terhadap histogram referensi artifact
+
+    - `update(X)`: tambahkan baris ter-encode (predict_single/predict_batch);
+      memori tetap fitur x bin berapapun jumlah baris yang lewat.
+    - Batch lebih besar dari sample_rows diwakili sampel acak sebesar itu
+      (bobot len(X)/sample_rows), jadi biaya update juga terbatas.
+    - half_life_rows: bobot baris lama meluruh setengah setiap N baris baru,
+      sehingga skor mengikuti traffic terbaru; None = kumulatif sejak reset.
+    - `check()`: skor PSI/KS per fitur; fitur yang melewati psi_threshold atau
+      ks_threshold (setelah min_rows baris) berstatus 'alert'. Fitur yang baru
+      masuk status alert dilaporkan lewat `on_alert(report_alert)` (default:
+      print) satu kali sampai kembali normal. Dipanggil otomatis setiap
+      check_every baris.
+    Aman dipakai dari beberapa thread.
+    """
+
+    def __init__(self, reference, psi_threshold=0.25, ks_threshold=0.15, min_rows=500, check_every=1000,
+                 half_life_rows=None, sample_rows=20_000, on_alert=None, metrics=None, random_state=0):
+        self.reference = reference
+        self.psi_threshold = psi_threshold
+        self.ks_threshold = ks_threshold
+        self.min_rows = min_rows
+        self.check_every = check_every
+        self.half_life_rows = half_life_rows
+        self.sample_rows = sample_rows
+        self.on_alert = on_alert if on_alert is not None else self._print_alert
+        self.metrics = metrics
+        self.counts = np.zeros_like(reference['counts'], dtype=np.float64)
+        self.rows = 0.0
+        self.rows_seen = 0
+        self.alerting = set()
+        self._since_check = 0
+        self._rng = np.random.default_rng(random_state)
+        self._lock = threading.Lock()
+
+    def update(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        if not len(X):
+            return
+        if self.sample_rows and len(X) > self.sample_rows:
+            sample = X[self._rng.integers(len(X), size=self.sample_rows)]
+            counts = _bin_counts(sample, self.reference['edges']) * (len(X) / self.sample_rows)
+        else:
+            counts = _bin_counts(X, self.reference['edges'])
+        with self._lock:
+            if self.half_life_rows:
+                decay = 0.5 ** (len(X) / self.half_life_rows)
+                self.counts *= decay
+                self.rows *= decay
+            self.counts += counts
+            self.rows += len(X)
+            self.rows_seen += len(X)
+            self._since_check += len(X)
+            due = self.check_every and self._since_check >= self.check_every
+            if due:
+                self._since_check = 0
+        if self.metrics is not None:
+            self.metrics.inc('drift_rows_total', len(X))
+        if due:
+            self.check()
+
+    def check(self):
+        """Laporan drift per fitur (diurutkan PSI menurun) dan picu alert baru"""
+        with self._lock:
+            counts, rows = self.counts.copy(), self.rows
+        psi, ks = drift_scores(self.reference['counts'], counts)
+        alert = (rows >= self.min_rows) & ((psi >= self.psi_threshold) | (ks >= self.ks_threshold))
+        report = pd.DataFrame({
+            'feature': self.reference['features'],
+            'psi': psi,
+            'ks': ks,
+            'status': np.where(alert, 'alert', 'ok' if rows >= self.min_rows else 'warming_up')
+        }).sort_values('psi', ascending=False).reset_index(drop=True)
+        report.attrs['rows'] = rows
+
+        alerting = set(report.loc[report['status'] == 'alert', 'feature'])
+        with self._lock:
+            new_alerts = alerting - self.alerting
+            self.alerting = alerting
+        if self.metrics is not None:
+            for feature, feature_psi, feature_ks in zip(self.reference['features'], psi, ks):
+                self.metrics.set('drift_psi', feature_psi, feature=feature)
+                self.metrics.set('drift_ks', feature_ks, feature=feature)
+            for feature in new_alerts:
+                self.metrics.inc('drift_alerts_total', feature=feature)
+        if new_alerts:
+            self.on_alert(report[report['feature'].isin(new_alerts)])
+        return report
+
+    def reset(self, reference=None):
+        """Kosongkan histogram streaming; `reference` menggantikan referensi (mis. model baru)"""
+        with self._lock:
+            if reference is not None:
+                self.reference = reference
+                self.counts = np.zeros_like(reference['counts'], dtype=np.float64)
+            self.counts[:] = 0
+            self.rows = 0.0
+            self._since_check = 0
+            self.alerting = set()
+
+    def _print_alert(self, alerts):
+        details = ', '.join(f"{row.feature} (PSI {row.psi:.3f}, KS {row.ks:.3f})" for row in alerts.itertuples())
+        print(f"⚠️ Drift terdeteksi pada {len(alerts)} fitur: {details}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Histogram referensi drift dan pemeriksaan drift data baru")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    reference_parser = subparsers.add_parser('reference', help="Simpan histogram referensi ke artifact lama")
+    reference_parser.add_argument('--model', default='dropout_model.pkl')
+    reference_parser.add_argument('--data', default=None, help="Data training (CSV/URL/direktori); default: dataset Dicoding")
+    reference_parser.add_argument('--output', default=None, help="Default: timpa --model")
+
+    check_parser = subparsers.add_parser('check', help="Bandingkan CSV (dibaca per chunk) dengan referensi")
+    check_parser.add_argument('data', help="CSV mahasiswa (delimiter ';'), mis. log scoring")
+    check_parser.add_argument('--model', default='dropout_model.pkl')
+    check_parser.add_argument('--chunksize', type=int, default=50_000)
+    check_parser.add_argument('--psi-threshold', type=float, default=0.25)
+    check_parser.add_argument('--ks-threshold', type=float, default=0.15)
+    args = parser.parse_args()
+
+    # model_inference imports this module, so the predictor is only imported when run as a script
+    from model_inference import DropoutPredictor
+    predictor = DropoutPredictor()
+    predictor.load_model(args.model)
+
+    if args.command == 'reference':
+        X, invalid = predictor._prepare_features(load_dataset(args.data).drop(columns='Status', errors='ignore'))
+        predictor.metadata['drift_reference'] = build_reference(X[~invalid.any(axis=1)], predictor.feature_names)
+        predictor.save_model(args.output or args.model)
+    else:
+        monitor = predictor.enable_drift_monitor(psi_threshold=args.psi_threshold, ks_threshold=args.ks_threshold,
+                                                 check_every=0)
+        for chunk in pd.read_csv(args.data, delimiter=';', chunksize=args.chunksize):
+            X, invalid = predictor._prepare_features(chunk.drop(columns='Status', errors='ignore'))
+            monitor.update(X[~invalid.any(axis=1)])
+        report = monitor.check()
+        print(f"📋 Drift {int(report.attrs['rows']):,} baris terhadap {predictor.metadata['drift_reference']['rows']:,} "
+              f"baris referensi")
+        print(report.head(15).to_string(index=False))
@@ -29,14 +29,18 @@ import warnings
 warnings.filterwarnings('ignore')
 
 # Machine Learning Libraries
-from sklearn.model_selection import train_test_split, cross_val_score, GridSearchCV
+from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import LabelEncoder, StandardScaler
 from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
 from sklearn.linear_model import LogisticRegression
 from sklearn.svm import SVC
-from sklearn.metrics import classification_report, confusion_matrix, accuracy_score, roc_auc_score, roc_curve
+from sklearn.metrics import classification_report, confusion_matrix
 from sklearn.tree import DecisionTreeClassifier
 
+# Cache dataset lokal dan runner eksperimen paralel
+from dataset_cache import load_dataset
+from experiment_runner import run_experiments
+
 # Untuk visualisasi yang lebih baik
 plt.style.use('default')
 sns.set_palette("husl")
@@ -53,8 +57,9 @@ print("✅ Library berhasil diimport!")
 # =====================================
 
 # Load dataset
-url = "https://raw.githubusercontent.com/dicodingacademy/dicoding_dataset/main/students_performance/data.csv"
-df = pd.read_csv(url, delimiter=';')
+# Dibaca lewat cache kolumnar lokal; set DROPOUT_DATA_OFFLINE=1 dan
+# DROPOUT_DATA_SOURCE=<file/direktori> untuk menjalankan tanpa jaringan
+df = load_dataset()  # default: https://raw.githubusercontent.com/dicodingacademy/dicoding_dataset/main/students_performance/data.csv
 
 print("📊 INFORMASI DATASET")
 print("="*50)
@@ -220,40 +225,18 @@ models = {
 }
 
 # Training dan evaluasi models
-model_results = {}
-
-for name, model in models.items():
-    print(f"\n🔄 Training {name}...")
-
-    # Training
-    if name == 'SVM':
-        model.fit(X_train_scaled, y_train)
-        y_pred = model.predict(X_test_scaled)
-        y_pred_proba = model.predict_proba(X_test_scaled)[:, 1]
-    else:
-        model.fit(X_train, y_train)
-        y_pred = model.predict(X_test)
-        y_pred_proba = model.predict_proba(X_test)[:, 1]
-
-    # Evaluasi
-    accuracy = accuracy_score(y_test, y_pred)
-
-    # Cross validation
-    if name == 'SVM':
-        cv_scores = cross_val_score(model, X_train_scaled, y_train, cv=5)
-    else:
-        cv_scores = cross_val_score(model, X_train, y_train, cv=5)
-
-    model_results[name] = {
-        'model': model,
-        'accuracy': accuracy,
-        'cv_mean': cv_scores.mean(),
-        'cv_std': cv_scores.std(),
-        'y_pred': y_pred,
-        'y_pred_proba': y_pred_proba
-    }
-
-    print(f"✅ {name} - Accuracy: {accuracy:.4f}, CV: {cv_scores.mean():.4f} (±{cv_scores.std():.4f})")
+# Setiap (model, fold) dijalankan sebagai task paralel; SVM memakai data yang di-scale
+model_results = run_experiments(
+    models,
+    inputs={'raw': (X_train, X_test), 'scaled': (X_train_scaled, X_test_scaled)},
+    y_train=y_train,
+    y_test=y_test,
+    model_inputs={'SVM': 'scaled'},
+    cv=5
+)
+
+for name, results in model_results.items():
+    print(f"✅ {name} - Accuracy: {results['accuracy']:.4f}, CV: {results['cv_mean']:.4f} (±{results['cv_std']:.4f})")
 
 """## Evaluation"""
 
@@ -0,0 +1,140 @@
+# experiment_runner.py
+# Menjalankan perbandingan model: setiap (model, fold) adalah task terpisah di process pool
+
+import os
+import shutil
+import tempfile
+import time
+
+import joblib
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import clone, is_classifier
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import check_cv
+
+
+def _share_arrays(arrays, folder):
+    """Dump array ke disk lalu buka sebagai memmap read-only
+
+    Memmap dikirim ke worker sebagai referensi file, jadi X_train tidak
+    disalin ke setiap proses.
+    """
+    shared = {}
+    for name, array in arrays.items():
+        path = os.path.join(folder, f'{name}.joblib')
+        joblib.dump(np.ascontiguousarray(array), path)
+        shared[name] = joblib.load(path, mmap_mode='r')
+    return shared
+
+
+def _fold_estimator(estimator):
+    """Estimator untuk fold CV yang hanya dinilai dengan accuracy
+
+    SVC(probability=True) menjalankan CV internal tambahan untuk kalibrasi
+    Platt, padahal `predict` tidak memakai probabilitas. Untuk fold CV opsi
+    itu dimatikan; skor accuracy tetap identik.
+    """
+    estimator = clone(estimator)
+    if estimator.get_params().get('probability'):
+        estimator.set_params(probability=False)
+    return estimator
+
+
+def _run_task(name, task, estimator, X_train, y_train, X_test, y_test, train_idx, test_idx):
+    """Satu fit: fold CV (train_idx/test_idx) atau holdout (X_test/y_test)"""
+    start = time.perf_counter()
+
+    if task == 'holdout':
+        estimator = clone(estimator)
+        estimator.fit(X_train, y_train)
+        y_pred = estimator.predict(X_test)
+        y_pred_proba = estimator.predict_proba(X_test)[:, 1]
+        result = {
+            'model': estimator,
+            'accuracy': accuracy_score(y_test, y_pred),
+            'y_pred': y_pred,
+            'y_pred_proba': y_pred_proba
+        }
+    else:
+        estimator = _fold_estimator(estimator)
+        estimator.fit(X_train[train_idx], y_train[train_idx])
+        result = {'score': estimator.score(X_train[test_idx], y_train[test_idx])}
+
+    return name, task, result, time.perf_counter() - start
+
+
+def run_experiments(models, inputs, y_train, y_test, model_inputs=None, cv=5, n_jobs=-1, verbose=True):
+    """Latih dan evaluasi semua model secara paralel
+
+    - models: {nama: estimator}
+    - inputs: {kunci: (X_train, X_test)}, mis. {'raw': ..., 'scaled': ...}
+    - model_inputs: {nama: kunci input}; model lain memakai input pertama.
+    - cv: sama seperti `cross_val_score` (int -> StratifiedKFold untuk klasifikasi).
+
+    Setiap model dijadwalkan sebagai 1 task holdout + `cv` task fold. Hasil fold
+    langsung dipakai untuk cv_mean/cv_std, sehingga tidak ada fit ulang.
+    Mengembalikan {nama: {'model', 'accuracy', 'cv_mean', 'cv_std', 'cv_scores',
+    'y_pred', 'y_pred_proba', 'task_seconds'}}.
+    """
+    model_inputs = model_inputs or {}
+    default_input = next(iter(inputs))
+    y_train = np.asarray(y_train)
+    y_test = np.asarray(y_test)
+
+    # Same splits cross_val_score would use, computed once for every model
+    splitter = check_cv(cv, y_train, classifier=all(is_classifier(m) for m in models.values()))
+    folds = list(splitter.split(np.zeros((len(y_train), 1)), y_train))
+
+    folder = tempfile.mkdtemp(prefix='experiments-')
+    try:
+        arrays = {}
+        for key, (X_train, X_test) in inputs.items():
+            arrays[f'{key}_train'] = np.asarray(X_train, dtype=np.float64)
+            arrays[f'{key}_test'] = np.asarray(X_test, dtype=np.float64)
+        arrays['y_train'] = y_train
+        shared = _share_arrays(arrays, folder)
+
+        # Holdout fits go first: they are the longest tasks (SVC also calibrates there)
+        holdout_tasks, fold_tasks = [], []
+        for name, estimator in models.items():
+            key = model_inputs.get(name, default_input)
+            X_train, X_test = shared[f'{key}_train'], shared[f'{key}_test']
+            holdout_tasks.append((name, 'holdout', estimator, X_train, shared['y_train'], X_test, y_test, None, None))
+            for k, (train_idx, test_idx) in enumerate(folds):
+                fold_tasks.append((name, f'fold {k + 1}', estimator, X_train, shared['y_train'], None, None,
+                                   train_idx, test_idx))
+        tasks = holdout_tasks + fold_tasks
+
+        if verbose:
+            print(f"🚀 {len(tasks)} task ({len(models)} model x (1 holdout + {len(folds)} fold)) "
+                  f"pada {joblib.effective_n_jobs(n_jobs)} proses")
+
+        start = time.perf_counter()
+        results = {name: {'cv_scores': [None] * len(folds), 'task_seconds': {}} for name in models}
+        parallel = Parallel(n_jobs=n_jobs, return_as='generator_unordered')
+        for name, task, result, seconds in parallel(delayed(_run_task)(*task) for task in tasks):
+            if task == 'holdout':
+                results[name].update(result)
+            else:
+                results[name]['cv_scores'][int(task.split()[1]) - 1] = result['score']
+            results[name]['task_seconds'][task] = seconds
+            if verbose:
+                print(f"   ⏱️ {name:<20} {task:<8} {seconds:7.2f} s")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+    for name, result in results.items():
+        cv_scores = np.array(result['cv_scores'])
+        result['cv_scores'] = cv_scores
+        result['cv_mean'] = cv_scores.mean()
+        result['cv_std'] = cv_scores.std()
+
+    if verbose:
+        total_task_seconds = sum(sum(r['task_seconds'].values()) for r in results.values())
+        elapsed = time.perf_counter() - start
+        print(f"✅ Selesai dalam {elapsed:.1f} s (total waktu task {total_task_seconds:.1f} s, "
+              f"speedup {total_task_seconds / elapsed:.1f}x)")
+
+    # Keep the caller's model order
+    return {name: results[name] for name in models}
@@ -0,0 +1,299 @@
+# forest_engine.py
+# Engine inferensi RandomForest berbasis array NumPy datar (flat node arrays)
+
+import numpy as np
+from scipy import sparse
+
+
+class CompiledForest:
+    """RandomForestClassifier yang dikompilasi menjadi array node kontigu
+
+    Semua pohon digabung ke satu set array (feature, threshold, children,
+    value) dengan indeks node global, sehingga satu baris atau batch kecil
+    bisa di-score tanpa overhead validasi sklearn, pandas, dan joblib.
+    Probabilitas identik bit-per-bit dengan `predict_proba` sklearn, kecuali
+    untuk versi ringkas hasil `quantize` (value_scale diisi).
+    """
+
+    # Up to this many rows all trees are walked at once; larger batches go tree by tree
+    SMALL_BATCH_ROWS = 512
+    BLOCK_ROWS = 8192
+
+    def __init__(self, feature, threshold, children_left, children_right,
+                 missing_go_to_left, value, roots, max_depth, classes, value_scale=None, children=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.children_left = children_left
+        self.children_right = children_right
+        self.missing_go_to_left = missing_go_to_left
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+        self.classes = classes
+        self.value_scale = value_scale  # None: value holds fractions; else integers / value_scale
+        # Stored (not derived on load) so memory-mapped artifacts share it like the other arrays
+        self.children = children if children is not None else self._interleave(children_left, children_right)
+        self._paths = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_paths'] = None  # derived, rebuilt on first explanation
+        return state
+
+    def __setstate__(self, state):
+        # Memory-mapped arrays (joblib mmap_mode) become plain ndarray views of the mapping
+        self.__dict__.update({
+            key: np.asarray(value) if isinstance(value, np.ndarray) else value
+            for key, value in state.items()
+        })
+        self.__dict__.pop('_children', None)
+        if 'children' not in self.__dict__:
+            # Artifacts saved before `children` was stored get a private copy; re-save to share it
+            self.children = self._interleave(self.children_left, self.children_right)
+        self.__dict__.setdefault('value_scale', None)
+        self.__dict__.setdefault('_paths', None)
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def n_nodes(self):
+        return len(self.feature)
+
+    @property
+    def nbytes(self):
+        return sum(array.nbytes for array in (self.feature, self.threshold, self.children_left,
+                                              self.children_right, self.children, self.missing_go_to_left,
+                                              self.value, self.roots))
+
+    @staticmethod
+    def _interleave(children_left, children_right):
+        """Pasangan (kiri, kanan) berselang: anak = children[2 * node + ke_kanan]
+
+        Dtype-nya cukup lebar untuk 2 * node + 1, jadi indeks tersebut tidak
+        overflow meskipun node disimpan sebagai unsigned integer sempit.
+        """
+        dtype = np.min_scalar_type(2 * len(children_left))
+        return np.stack([children_left, children_right], axis=1).ravel().astype(dtype)
+
+    def _float_value(self):
+        """value sebagai fraksi float64 (di-dekuantisasi bila perlu)"""
+        if self.value_scale is None:
+            return self.value
+        return self.value / self.value_scale
+
+    @classmethod
+    def from_sklearn(cls, model):
+        """Ekspor RandomForestClassifier atau DecisionTreeClassifier (single output) yang sudah di-fit"""
+        trees = [estimator.tree_ for estimator in getattr(model, 'estimators_', [model])]
+        sizes = np.array([tree.node_count for tree in trees])
+        offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+
+        feature, threshold, left, right, missing_left, value = [], [], [], [], [], []
+        for tree, offset in zip(trees, offsets):
+            node_ids = np.arange(tree.node_count, dtype=np.intp) + offset
+            is_leaf = tree.children_left < 0
+
+            # Leaves point to themselves so traversal can run a fixed number of steps
+            feature.append(np.where(is_leaf, 0, tree.feature).astype(np.intp))
+            threshold.append(np.where(is_leaf, np.inf, tree.threshold))
+            left.append(np.where(is_leaf, node_ids, tree.children_left + offset))
+            right.append(np.where(is_leaf, node_ids, tree.children_right + offset))
+            missing_left.append(tree.missing_go_to_left.astype(bool))
+
+            # scikit-learn >= 1.4 stores class fractions and returns them as-is;
+            # older versions store counts and normalise inside predict_proba
+            node_value = tree.value[:, 0, :model.n_classes_]
+            if not np.allclose(node_value.sum(axis=1), 1.0):
+                normalizer = node_value.sum(axis=1)[:, np.newaxis]
+                normalizer[normalizer == 0.0] = 1.0
+                node_value = node_value / normalizer
+            value.append(node_value)
+
+        return cls(
+            feature=np.ascontiguousarray(np.concatenate(feature)),
+            threshold=np.ascontiguousarray(np.concatenate(threshold)),
+            children_left=np.ascontiguousarray(np.concatenate(left)),
+            children_right=np.ascontiguousarray(np.concatenate(right)),
+            missing_go_to_left=np.ascontiguousarray(np.concatenate(missing_left)),
+            value=np.ascontiguousarray(np.concatenate(value)),
+            roots=offsets,
+            max_depth=max(tree.max_depth for tree in trees),
+            classes=np.asarray(model.classes_)
+        )
+
+    def quantize(self, value_bits=16):
+        """Salinan ringkas untuk artifact kecil dan cache footprint rendah
+
+        - threshold float32, dibulatkan ke bawah (nextafter) bila perlu: input
+          selalu di-cast ke float32, jadi x <= t32 persis sama dengan x <= t64
+          dan setiap baris tetap menempuh jalur yang sama.
+        - indeks fitur dan node memakai unsigned integer tersempit yang cukup.
+        - distribusi kelas node disimpan sebagai uint8/uint16; galat per
+          probabilitas paling besar 0.5 / (2**value_bits - 1).
+        """
+        if value_bits not in (8, 16):
+            raise ValueError("value_bits harus 8 atau 16")
+        scale = 2 ** value_bits - 1
+
+        threshold = self.threshold.astype(np.float32)
+        rounded_up = threshold.astype(np.float64) > self.threshold
+        threshold[rounded_up] = np.nextafter(threshold[rounded_up], np.float32(-np.inf))
+
+        node_dtype = np.min_scalar_type(self.n_nodes - 1)
+        value = np.rint(self._float_value() * scale).astype(np.uint8 if value_bits == 8 else np.uint16)
+
+        return CompiledForest(
+            feature=self.feature.astype(np.min_scalar_type(int(self.feature.max()))),
+            threshold=threshold,
+            children_left=self.children_left.astype(node_dtype),
+            children_right=self.children_right.astype(node_dtype),
+            missing_go_to_left=self.missing_go_to_left.copy(),
+            value=value,
+            roots=self.roots.copy(),
+            max_depth=self.max_depth,
+            classes=self.classes,
+            value_scale=scale
+        )
+
+    def apply(self, X):
+        """Indeks node daun global untuk setiap (baris, pohon)"""
+        # sklearn casts inputs to float32 before comparing against float64 thresholds
+        X = np.atleast_2d(np.asarray(X, dtype=np.float32))
+        rows = np.arange(X.shape[0])[:, np.newaxis]
+        nodes = np.broadcast_to(self.roots, (X.shape[0], self.n_trees))
+        has_missing = np.isnan(X).any()
+
+        for _ in range(self.max_depth):
+            x = X[rows, self.feature[nodes]]
+            go_left = x <= self.threshold[nodes]
+            if has_missing:
+                go_left = np.where(np.isnan(x), self.missing_go_to_left[nodes], go_left)
+            nodes = np.where(go_left, self.children_left[nodes], self.children_right[nodes])
+
+        return nodes
+
+    def predict_proba(self, X):
+        """Rata-rata probabilitas daun dari semua pohon"""
+        X = np.atleast_2d(np.asarray(X, dtype=np.float32))
+        if X.shape[0] > self.SMALL_BATCH_ROWS:
+            return self._predict_proba_blocked(X)
+
+        leaf_values = self.value[self.apply(X)]
+
+        # Accumulate tree by tree, in estimator order, exactly like sklearn
+        proba = leaf_values[:, 0].astype(np.float64)
+        for tree in range(1, self.n_trees):
+            proba += leaf_values[:, tree]
+        proba /= self.n_trees
+        if self.value_scale is not None:
+            proba /= self.value_scale
+
+        return proba
+
+    def _blocks(self, X):
+        """Blok baris (flat) dan offset awal setiap baris di dalam blok"""
+        n_rows, n_features = X.shape
+        flat = X.ravel()
+        for start in range(0, n_rows, self.BLOCK_ROWS):
+            block = flat[start * n_features:(start + self.BLOCK_ROWS) * n_features]
+            yield start, block, np.arange(len(block) // n_features) * n_features
+
+    def _descend(self, block, offsets, root, has_missing):
+        """Daun satu pohon untuk semua baris dalam blok"""
+        nodes = np.full(len(offsets), root)
+        for _ in range(self.max_depth):
+            x = block.take(offsets + self.feature.take(nodes))
+            go_right = ~(x <= self.threshold.take(nodes))
+            if has_missing:
+                go_right = np.where(np.isnan(x), ~self.missing_go_to_left.take(nodes), go_right)
+            nodes = self.children.take(2 * nodes + go_right)
+        return nodes
+
+    def _predict_proba_blocked(self, X):
+        """Jalur batch besar: satu pohon per langkah atas blok baris yang muat di cache"""
+        has_missing = np.isnan(X).any()
+        proba = np.zeros((X.shape[0], self.value.shape[1]))
+
+        for start, block, offsets in self._blocks(X):
+            block_proba = proba[start:start + len(offsets)]
+            for root in self.roots:
+                block_proba += self.value.take(self._descend(block, offsets, root, has_missing), axis=0)
+
+        proba /= self.n_trees
+        if self.value_scale is not None:
+            proba /= self.value_scale
+        return proba
+
+    def _path_contributions(self):
+        """Matriks sparse (node daun x fitur*kelas): jumlah perubahan value sepanjang jalur root→daun
+
+        Setiap split menyumbang value[anak] - value[induk] ke fitur induknya
+        (atribusi Saabas). Dibangun sekali per forest: semua daun naik ke root
+        bersamaan, paling banyak max_depth langkah.
+        """
+        if self._paths is None:
+            n_classes = self.value.shape[1]
+            value = self._float_value()
+            node_ids = np.arange(self.n_nodes)
+            internal = self.children_left != node_ids
+            parent = np.full(self.n_nodes, -1)
+            parent[self.children_left[internal]] = node_ids[internal]
+            parent[self.children_right[internal]] = node_ids[internal]
+
+            rows, features, deltas = [], [], []
+            leaves = node_ids[~internal]
+            current = leaves
+            while len(current):
+                above = parent[current]
+                step = above >= 0
+                leaves, current, above = leaves[step], current[step], above[step]
+                rows.append(leaves)
+                features.append(self.feature[above].astype(np.intp))
+                deltas.append(value[current] - value[above])
+                current = above
+
+            rows = np.repeat(np.concatenate(rows), n_classes)
+            features = np.concatenate(features)
+            cols = (features[:, np.newaxis] * n_classes + np.arange(n_classes)).ravel()
+            # Duplicate (leaf, feature) entries from repeated splits are summed by the CSR conversion
+            self._paths = sparse.csr_matrix(
+                (np.concatenate(deltas).ravel(), (rows, cols)),
+                shape=(self.n_nodes, (int(self.feature.max()) + 1) * n_classes)
+            )
+        return self._paths
+
+    def contributions(self, X):
+        """Dekomposisi predict_proba per fitur: bias + contributions.sum(axis=1) == proba
+
+        Mengembalikan (bias, contributions) dengan bias berbentuk (n_kelas,)
+        (rata-rata value root) dan contributions (n_baris, n_fitur, n_kelas).
+        Daun setiap baris dijumlahkan lewat satu perkalian sparse
+        (indikator daun x jalur daun) per blok baris.
+        """
+        X = np.atleast_2d(np.asarray(X, dtype=np.float32))
+        n_rows, n_features = X.shape
+        n_classes = self.value.shape[1]
+        paths = self._path_contributions()
+
+        has_missing = np.isnan(X).any()
+        contributions = np.zeros((n_rows, n_features * n_classes))
+        used = paths.shape[1]  # features the forest never splits on stay zero
+        for start, block, offsets in self._blocks(X):
+            leaves = np.empty((len(offsets), self.n_trees), dtype=np.intp)
+            for tree, root in enumerate(self.roots):
+                leaves[:, tree] = self._descend(block, offsets, root, has_missing)
+            indicator = sparse.csr_matrix(
+                (np.ones(leaves.size), leaves.ravel(), np.arange(0, leaves.size + 1, self.n_trees)),
+                shape=(len(leaves), self.n_nodes)
+            )
+            contributions[start:start + len(leaves), :used] = (indicator @ paths).toarray()
+
+        contributions /= self.n_trees
+        bias = self._float_value()[self.roots].mean(axis=0)
+        return bias, contributions.reshape(n_rows, n_features, n_classes)
+
+    def predict(self, X):
+        """Kelas dengan probabilitas tertinggi"""
+        return self.classes.take(self.predict_proba(X).argmax(axis=1))
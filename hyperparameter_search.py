@@ -0,0 +1,173 @@
+# hyperparameter_search.py
+# Tuning RandomForest dengan successive halving dan fold matrix yang di-cache
+
+import argparse
+import hashlib
+import os
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import ParameterSampler, StratifiedKFold
+
+from model_inference import DropoutPredictor
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'jji_dropout', 'folds')
+
+# Ruang pencarian default; n_estimators adalah budget yang dinaikkan per rung
+PARAM_SPACE = {
+    'max_depth': [6, 8, 10, 12, 16, None],
+    'min_samples_split': [2, 5, 10, 20],
+    'min_samples_leaf': [1, 2, 4, 8],
+    'max_features': ['sqrt', 'log2', 0.5],
+    'class_weight': [None, 'balanced']
+}
+
+
+class FoldCache:
+    """Fold matrix (float32, kontigu) yang dihitung sekali lalu dipakai semua kandidat
+
+    Matriks disimpan di disk dengan joblib dan dibuka sebagai memmap, sehingga
+    worker berbagi satu salinan dan run berikutnya dengan data yang sama tidak
+    menghitung ulang split.
+    """
+
+    def __init__(self, X, y, cv=5, random_state=42, cache_dir=None):
+        # Trees train on float32; converting once avoids a copy in every fit
+        self.X = np.ascontiguousarray(np.asarray(X, dtype=np.float32))
+        self.y = np.asarray(y)
+        digest = hashlib.sha256()
+        digest.update(self.X.tobytes())
+        digest.update(self.y.tobytes())
+        digest.update(f'{cv}-{random_state}'.encode())
+        self.key = digest.hexdigest()[:16]
+        self.folder = os.path.join(cache_dir or DEFAULT_CACHE_DIR, self.key)
+        self.cv = cv
+        self.random_state = random_state
+
+    def load(self):
+        """List (X_train, y_train, X_val, y_val) per fold sebagai memmap"""
+        paths = [os.path.join(self.folder, f'fold{k}.joblib') for k in range(self.cv)]
+        if not all(os.path.exists(path) for path in paths):
+            os.makedirs(self.folder, exist_ok=True)
+            splitter = StratifiedKFold(n_splits=self.cv, shuffle=True, random_state=self.random_state)
+            for path, (train_idx, val_idx) in zip(paths, splitter.split(self.X, self.y)):
+                fold = (self.X[train_idx], self.y[train_idx], self.X[val_idx], self.y[val_idx])
+                tmp_path = f'{path}.tmp-{os.getpid()}'
+                joblib.dump(fold, tmp_path)
+                os.replace(tmp_path, path)
+        return [joblib.load(path, mmap_mode='r') for path in paths]
+
+
+def _evaluate(candidate_id, params, n_estimators, fold_id, fold, scoring, random_state):
+    """Fit satu kandidat pada satu fold dengan budget n_estimators"""
+    X_train, y_train, X_val, y_val = fold
+    start = time.perf_counter()
+    model = RandomForestClassifier(n_estimators=n_estimators, random_state=random_state, **params)
+    model.fit(X_train, y_train)
+    score = get_scorer(scoring)(model, X_val, y_val)
+    return candidate_id, fold_id, score, time.perf_counter() - start
+
+
+def successive_halving(X, y, param_space=None, n_candidates=27, min_resource=12, max_resource=100,
+                       eta=3, cv=5, scoring='accuracy', n_jobs=-1, random_state=42,
+                       cache_dir=None, verbose=True):
+    """Successive halving atas n_estimators
+
+    Semua kandidat dievaluasi dengan budget kecil, lalu hanya 1/eta terbaik
+    yang lanjut ke rung berikutnya dengan budget eta kali lebih besar, sampai
+    max_resource. Setiap (kandidat, fold) adalah task paralel.
+    Mengembalikan (best_params, history DataFrame).
+    """
+    param_space = param_space or PARAM_SPACE
+    candidates = list(ParameterSampler(param_space, n_iter=n_candidates, random_state=random_state))
+    folds = FoldCache(X, y, cv=cv, random_state=random_state, cache_dir=cache_dir).load()
+
+    # Budgets grow by eta per rung and always end at max_resource
+    budgets = []
+    resource = min_resource
+    while resource < max_resource and len(candidates) // eta ** len(budgets) > 1:
+        budgets.append(resource)
+        resource *= eta
+    budgets.append(max_resource)
+
+    survivors = list(range(len(candidates)))
+    history = []
+    parallel = Parallel(n_jobs=n_jobs)
+
+    for rung, n_estimators in enumerate(budgets):
+        start = time.perf_counter()
+        results = parallel(
+            delayed(_evaluate)(i, candidates[i], n_estimators, k, fold, scoring, random_state)
+            for i in survivors for k, fold in enumerate(folds)
+        )
+
+        scores = {}
+        for candidate_id, _, score, seconds in results:
+            scores.setdefault(candidate_id, []).append(score)
+        for candidate_id, fold_scores in scores.items():
+            history.append({
+                'rung': rung,
+                'n_estimators': n_estimators,
+                'candidate': candidate_id,
+                **candidates[candidate_id],
+                'mean_score': np.mean(fold_scores),
+                'std_score': np.std(fold_scores)
+            })
+
+        ranked = sorted(survivors, key=lambda i: np.mean(scores[i]), reverse=True)
+        if verbose:
+            best = ranked[0]
+            print(f"🔎 Rung {rung}: {len(survivors)} kandidat x {len(folds)} fold, "
+                  f"{n_estimators} pohon, {time.perf_counter() - start:.1f} s "
+                  f"(terbaik {np.mean(scores[best]):.4f})")
+
+        if rung < len(budgets) - 1:
+            survivors = ranked[:max(1, len(survivors) // eta)]
+        else:
+            survivors = ranked
+
+    history = pd.DataFrame(history)
+    best_params = {'n_estimators': max_resource, **candidates[survivors[0]]}
+    return best_params, history
+
+
+def tune_and_save(predictor, X, y, filepath='dropout_model.pkl', **search_kwargs):
+    """Cari konfigurasi terbaik lalu latih dan simpan artifact DropoutPredictor"""
+    best_params, history = successive_halving(X, y, **search_kwargs)
+    final = history[history['rung'] == history['rung'].max()].sort_values('mean_score', ascending=False).iloc[0]
+
+    predictor.train_model(X, y, params=best_params)
+    predictor.metadata['tuning'] = {
+        'method': 'successive_halving',
+        'cv_score': float(final['mean_score']),
+        'n_candidates': int(history['candidate'].nunique()),
+        'n_fits': int(len(history) * search_kwargs.get('cv', 5))
+    }
+    predictor.save_model(filepath)
+    return best_params, history
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tuning hyperparameter RandomForest dengan successive halving")
+    parser.add_argument('--data', default=None, help="URL, path data.csv, atau direktori (default: dataset Dicoding)")
+    parser.add_argument('--output', default='dropout_model.pkl', help="Path artifact model")
+    parser.add_argument('--candidates', type=int, default=27)
+    parser.add_argument('--min-trees', type=int, default=12)
+    parser.add_argument('--max-trees', type=int, default=100)
+    parser.add_argument('--eta', type=int, default=3)
+    parser.add_argument('--jobs', type=int, default=-1)
+    args = parser.parse_args()
+
+    predictor = DropoutPredictor()
+    X, y, _ = predictor.load_and_prepare_data(args.data)
+
+    best_params, history = tune_and_save(
+        predictor, X, y, args.output, n_candidates=args.candidates, min_resource=args.min_trees,
+        max_resource=args.max_trees, eta=args.eta, n_jobs=args.jobs
+    )
+    print(f"\n🏆 Konfigurasi terbaik: {best_params}")
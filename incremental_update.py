@@ -0,0 +1,132 @@
+# incremental_update.py
+# Update model per semester (tambah/pensiunkan pohon) dan laporan perbandingan dengan full refit
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import train_test_split
+
+from dataset_cache import load_dataset
+from model_inference import DropoutPredictor
+
+
+def encode_labeled(predictor, df):
+    """Encode data berlabel dengan encoder artifact yang sudah ada (bukan fit ulang)
+
+    Baris dengan nilai tidak valid atau Status yang tidak dikenal dibuang.
+    Mengembalikan (X DataFrame, y array).
+    """
+    X, invalid = predictor._prepare_features(df)
+    known = df['Status'].isin(predictor.target_encoder.classes_).to_numpy()
+    keep = ~invalid.any(axis=1) & known
+    if not keep.all():
+        print(f"⚠️ {int((~keep).sum())} baris dibuang (nilai tidak valid / Status tidak dikenal)")
+    X = pd.DataFrame(X[keep], columns=predictor.feature_names)
+    y = predictor.target_encoder.transform(df.loc[keep, 'Status'])
+    return X, y
+
+
+def compare_with_refit(predictor, X, y, n_windows=4, n_new_trees=25, retire_oldest=0, test_size=0.2,
+                       random_state=42):
+    """Simulasikan data per semester dan bandingkan update inkremental dengan full refit
+
+    Data latih dibagi menjadi n_windows potongan berurutan. Window pertama
+    melatih model awal; setiap window berikutnya ditambahkan lewat
+    update_model, sedangkan baseline di-refit pada seluruh data kumulatif.
+    Keduanya dinilai pada test set yang sama. `predictor` menyediakan
+    preprocessing (dari load_and_prepare_data) untuk semua model.
+    """
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, np.asarray(y), test_size=test_size, random_state=random_state, stratify=y)
+    windows = np.array_split(np.arange(len(X_train)), n_windows)
+
+    def fresh_predictor():
+        fresh = DropoutPredictor()
+        fresh.feature_names = predictor.feature_names
+        fresh.target_encoder = predictor.target_encoder
+        return fresh
+
+    rows = []
+    incremental = None
+    for k, idx in enumerate(windows):
+        X_window, y_window = X_train.iloc[idx], y_train[idx]
+        seen = np.concatenate(windows[:k + 1])
+
+        start = time.perf_counter()
+        if incremental is None:
+            incremental = fresh_predictor()
+            incremental.train_model(X_window, y_window, window='window-0')
+        else:
+            incremental.update_model(X_window, y_window, n_new_trees=n_new_trees,
+                                     retire_oldest=retire_oldest, window=f'window-{k}')
+        incremental_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        refit = fresh_predictor()
+        refit.train_model(X_train.iloc[seen], y_train[seen])
+        refit_seconds = time.perf_counter() - start
+
+        rows.append({
+            'window': k,
+            'rows_seen': len(seen),
+            'n_trees': len(incremental.model.estimators_),
+            'incremental_accuracy': accuracy_score(y_test, incremental.model.predict(X_test)),
+            'refit_accuracy': accuracy_score(y_test, refit.model.predict(X_test)),
+            'incremental_seconds': incremental_seconds,
+            'refit_seconds': refit_seconds
+        })
+
+    return pd.DataFrame(rows), incremental
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Update model inkremental per semester")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    update_parser = subparsers.add_parser('update', help="Tambah pohon dari data semester baru ke artifact")
+    update_parser.add_argument('data', help="CSV/URL/direktori data baru (dengan kolom Status)")
+    update_parser.add_argument('--model', default='dropout_model.pkl')
+    update_parser.add_argument('--output', default=None, help="Default: timpa --model")
+    update_parser.add_argument('--trees', type=int, default=25, help="Jumlah pohon baru")
+    update_parser.add_argument('--retire', type=int, default=0, help="Jumlah pohon tertua yang dibuang")
+    update_parser.add_argument('--window', default=None, help="Label data, mis. 2024-ganjil")
+
+    merge_parser = subparsers.add_parser('merge', help="Gabungkan forest dari artifact lain")
+    merge_parser.add_argument('other', help="Artifact yang dilatih terpisah")
+    merge_parser.add_argument('--model', default='dropout_model.pkl')
+    merge_parser.add_argument('--output', default=None)
+    merge_parser.add_argument('--retire', type=int, default=0)
+
+    report_parser = subparsers.add_parser('report', help="Bandingkan update inkremental dengan full refit")
+    report_parser.add_argument('--data', default=None)
+    report_parser.add_argument('--windows', type=int, default=4)
+    report_parser.add_argument('--trees', type=int, default=25)
+    report_parser.add_argument('--retire', type=int, default=0)
+
+    args = parser.parse_args()
+
+    if args.command == 'report':
+        predictor = DropoutPredictor()
+        X, y, _ = predictor.load_and_prepare_data(args.data)
+        report, model = compare_with_refit(predictor, X, y, n_windows=args.windows, n_new_trees=args.trees,
+                                           retire_oldest=args.retire)
+        print("\n📋 Incremental vs full refit")
+        print(report.to_string(index=False, float_format=lambda v: f'{v:.4f}'))
+        print(f"\nTotal: incremental {report['incremental_seconds'].sum():.1f} s, "
+              f"refit {report['refit_seconds'].sum():.1f} s")
+        print(f"Tree windows: {model.metadata['tree_windows']}")
+    else:
+        predictor = DropoutPredictor()
+        predictor.load_model(args.model)
+        if args.command == 'update':
+            X_new, y_new = encode_labeled(predictor, load_dataset(args.data))
+            predictor.update_model(X_new, y_new, n_new_trees=args.trees, retire_oldest=args.retire,
+                                   window=args.window)
+        else:
+            other = DropoutPredictor()
+            other.load_model(args.other)
+            predictor.merge_model(other, retire_oldest=args.retire)
+        predictor.save_model(args.output or args.model)
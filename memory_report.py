@@ -0,0 +1,161 @@
+# memory_report.py
+# Laporan memori resident vs shared per worker untuk artifact yang di-memory-map
+
+import argparse
+import os
+import tracemalloc
+from contextlib import contextmanager
+from multiprocessing import get_context
+
+
+def _read_kb_fields(path):
+    """Baca baris 'Nama:  123 kB' dari file /proc menjadi dict byte"""
+    fields = {}
+    with open(path) as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 3 and parts[-1] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[-2]) * 1024
+    return fields
+
+
+def process_memory(pid='self'):
+    """Memori proses (byte): rss, pss, shared, dan private
+
+    `pss` membagi halaman shared secara proporsional antar proses, sehingga
+    jumlah pss semua worker adalah biaya memori sesungguhnya di host.
+    """
+    try:
+        fields = _read_kb_fields(f'/proc/{pid}/smaps_rollup')
+    except FileNotFoundError:
+        # Kernels without smaps_rollup: statm only knows resident and shared pages
+        page_size = os.sysconf('SC_PAGE_SIZE')
+        with open(f'/proc/{pid}/statm') as f:
+            _, resident, shared = (int(value) * page_size for value in f.read().split()[:3])
+        return {'rss': resident, 'pss': None, 'shared': shared, 'private': resident - shared}
+
+    return {
+        'rss': fields.get('Rss', 0),
+        'pss': fields.get('Pss', 0),
+        'shared': fields.get('Shared_Clean', 0) + fields.get('Shared_Dirty', 0),
+        'private': fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0)
+    }
+
+
+def mapped_file_memory(filepath, pid='self'):
+    """Bagian file (mis. artifact model) yang resident di proses ini, dalam byte"""
+    target = os.path.realpath(filepath)
+    totals = {'size': 0, 'rss': 0, 'pss': 0, 'shared': 0, 'private': 0}
+    in_target = False
+
+    with open(f'/proc/{pid}/smaps') as f:
+        for line in f:
+            parts = line.split()
+            if not parts:
+                continue
+            if not parts[0].endswith(':'):
+                # Mapping header: "start-end perms offset dev inode [path]"
+                in_target = len(parts) >= 6 and parts[5] == target
+                continue
+            if in_target and len(parts) >= 3 and parts[-1] == 'kB':
+                name, value = parts[0].rstrip(':'), int(parts[1]) * 1024
+                if name == 'Size':
+                    totals['size'] += value
+                elif name == 'Rss':
+                    totals['rss'] += value
+                elif name == 'Pss':
+                    totals['pss'] += value
+                elif name.startswith('Shared_'):
+                    totals['shared'] += value
+                elif name.startswith('Private_'):
+                    totals['private'] += value
+
+    return totals
+
+
+def format_report(label, memory, mapped=None):
+    """Satu baris ringkasan memori dalam MB"""
+    mb = lambda value: '-' if value is None else f"{value / 2**20:.1f}"
+    line = (f"{label}: rss={mb(memory['rss'])} MB, pss={mb(memory['pss'])} MB, "
+            f"shared={mb(memory['shared'])} MB, private={mb(memory['private'])} MB")
+    if mapped is not None:
+        line += f" | artifact mapped rss={mb(mapped['rss'])} MB (shared={mb(mapped['shared'])} MB)"
+    return line
+
+
+class StageMemory:
+    """Peak dan sisa alokasi Python + NumPy (tracemalloc) per tahap pipeline
+
+    Dipakai sebagai context manager; setiap `stage(nama)` mencatat peak selama
+    tahap itu dan memori yang masih teralokasi di akhir tahap, dihitung sejak
+    tracker dimulai. Dengan enabled=False semua pemanggilan tidak berbiaya.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.stages = []
+        self._started = False
+
+    def __enter__(self):
+        if self.enabled and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started = True
+        return self
+
+    def __exit__(self, *exc):
+        if self._started:
+            tracemalloc.stop()
+            self._started = False
+
+    @contextmanager
+    def stage(self, name):
+        if not self.enabled:
+            yield
+            return
+        tracemalloc.reset_peak()
+        try:
+            yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            self.stages.append({'stage': name, 'peak_mb': peak / 2**20, 'final_mb': current / 2**20})
+
+    def format(self):
+        return '\n'.join(f"   {s['stage']:<10} peak={s['peak_mb']:8.1f} MB  final={s['final_mb']:8.1f} MB"
+                         for s in self.stages)
+
+
+def _worker_report(filepath, mmap_mode, keep_model, barrier):
+    """Load artifact, lakukan satu scoring, lalu laporkan memori worker"""
+    from model_inference import DropoutPredictor
+
+    predictor = DropoutPredictor()
+    predictor.load_model(filepath, mmap_mode=mmap_mode, keep_model=keep_model)
+    predictor.predict_single({})  # touch every tree so the pages are resident
+
+    # Wait until every worker has loaded so shared pages are counted across all of them
+    barrier.wait()
+    report = format_report(f"worker {os.getpid()}", process_memory(), mapped_file_memory(filepath))
+    barrier.wait()
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bandingkan memori worker saat memuat artifact model")
+    parser.add_argument('model', help="Path artifact dari DropoutPredictor.save_model")
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--no-mmap', action='store_true', help="Load ke memori privat (tanpa mmap)")
+    parser.add_argument('--drop-sklearn-model', action='store_true', help="Lepas pohon sklearn setelah load")
+    args = parser.parse_args()
+
+    context = get_context('spawn')
+    with context.Manager() as manager:
+        barrier = manager.Barrier(args.workers)
+        with context.Pool(args.workers) as pool:
+            reports = pool.starmap(_worker_report, [
+                (args.model, None if args.no_mmap else 'r', not args.drop_sklearn_model, barrier)
+            ] * args.workers)
+
+    print(f"📦 Artifact {args.model} ({os.path.getsize(args.model) / 2**20:.1f} MB), "
+          f"mmap={'off' if args.no_mmap else 'r'}")
+    for report in reports:
+        print(report)
@@ -0,0 +1,230 @@
+# metrics.py
+# Timer per tahap, counter, dan histogram latency dengan exporter format teks Prometheus
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+# Upper bounds (seconds) of the latency histograms; +Inf is implicit
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Rows per scoring call (micro-batches, bulk requests)
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096, 16384, 65536)
+
+HELP = {
+    'stage_duration_seconds': "Durasi satu tahap pipeline",
+    'request_duration_seconds': "Durasi total satu pemanggilan (predict_single, predict_batch, ...)",
+    'requests_total': "Jumlah pemanggilan per jenis request",
+    'request_errors_total': "Pemanggilan yang berakhir dengan exception",
+    'rows_total': "Jumlah baris yang diproses",
+    'http_request_duration_seconds': "Latency request HTTP scoring service",
+    'http_requests_total': "Request HTTP per endpoint dan status",
+    'batch_rows': "Jumlah baris per panggilan scoring",
+    'fast_mode_rows_total': "Baris fast mode per jalur (surrogate atau fallback ke forest)",
+    'drift_rows_total': "Baris yang masuk monitor drift",
+    'drift_psi': "Population Stability Index per fitur terhadap data training",
+    'drift_ks': "Statistik KS (per bin) per fitur terhadap data training",
+    'drift_alerts_total': "Berapa kali fitur masuk status drift alert"
+}
+
+# Shared no-op context: a disabled stage costs one attribute check and an empty with-block
+NOOP = nullcontext()
+
+
+class Histogram:
+    """Histogram bucket tetap (semantik `le` Prometheus) dengan sum dan count"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """(batas atas, jumlah kumulatif) termasuk +Inf"""
+        total, pairs = 0, []
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+
+class MetricsRegistry:
+    """Counter, gauge, histogram, dan breakdown per request untuk predictor dan aplikasi
+
+    - `stage(nama)`: context manager yang mengukur satu tahap; durasinya masuk
+      histogram stage_duration_seconds dan breakdown request yang sedang berjalan.
+    - `trace(request)`: membungkus satu request; breakdown tahapnya disimpan di
+      `recent` (N terakhir). Trace bersarang (mis. predict_single di dalam run
+      Streamlit) menulis tahapnya ke trace luar dengan prefix `request.`.
+    - Dengan enabled=False `stage`/`trace` mengembalikan NOOP tanpa mencatat apapun.
+    Aman dipakai dari beberapa thread; trace aktif disimpan per thread.
+    """
+
+    def __init__(self, enabled=True, namespace='dropout', recent=50):
+        self.enabled = enabled
+        self.namespace = namespace
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self.recent = deque(maxlen=recent)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def inc(self, name, value=1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self.gauges[key] = value
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def stage(self, name):
+        """Ukur satu tahap; tanpa biaya berarti bila registry nonaktif"""
+        if not self.enabled:
+            return NOOP
+        return self._timed_stage(name)
+
+    @contextmanager
+    def _timed_stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            self.observe('stage_duration_seconds', seconds, stage=name)
+            trace = getattr(self._local, 'trace', None)
+            if trace is not None:
+                stage = f'{self._local.prefix}{name}'
+                trace['stages'][stage] = trace['stages'].get(stage, 0.0) + seconds
+
+    def trace(self, request, **info):
+        """Bungkus satu request; `info` (mis. rows=...) ikut disimpan di breakdown"""
+        if not self.enabled:
+            return NOOP
+        return self._timed_trace(request, info)
+
+    @contextmanager
+    def _timed_trace(self, request, info):
+        outer = getattr(self._local, 'trace', None)
+        outer_prefix = getattr(self._local, 'prefix', '')
+        if outer is None:
+            trace = {'request': request, 'started_at': time.time(), **info, 'stages': {}}
+            self._local.trace, self._local.prefix = trace, ''
+        else:
+            trace = outer
+            self._local.prefix = f'{outer_prefix}{request}.'
+
+        start = time.perf_counter()
+        try:
+            yield trace
+        except BaseException as e:
+            self.inc('request_errors_total', request=request)
+            if outer is None:
+                trace['error'] = f'{type(e).__name__}: {e}'
+            raise
+        finally:
+            seconds = time.perf_counter() - start
+            self._local.prefix = outer_prefix
+            self.observe('request_duration_seconds', seconds, request=request)
+            self.inc('requests_total', request=request)
+            if 'rows' in info:
+                self.inc('rows_total', info['rows'], request=request)
+            if outer is None:
+                self._local.trace = None
+                trace['total_s'] = seconds
+                with self._lock:
+                    self.recent.append(trace)
+
+    def recent_breakdowns(self, n=None):
+        """Breakdown request terbaru (terbaru lebih dulu)"""
+        with self._lock:
+            traces = list(self.recent)
+        traces.reverse()
+        return traces[:n]
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.histograms.clear()
+            self.recent.clear()
+
+    def to_prometheus(self):
+        """Semua metric dalam format teks eksposisi Prometheus 0.0.4"""
+        with self._lock:
+            counters = sorted(self.counters.items())
+            gauges = sorted(self.gauges.items())
+            histograms = sorted((key, h.cumulative(), h.sum, h.count)
+                                for key, h in self.histograms.items())
+
+        lines, described = [], set()
+
+        def describe(name, kind):
+            if name not in described:
+                described.add(name)
+                full_name = f'{self.namespace}_{name}'
+                if name in HELP:
+                    lines.append(f'# HELP {full_name} {HELP[name]}')
+                lines.append(f'# TYPE {full_name} {kind}')
+
+        for (name, labels), value in counters:
+            describe(name, 'counter')
+            lines.append(f'{self.namespace}_{name}{_format_labels(labels)} {_format_value(value)}')
+
+        for (name, labels), value in gauges:
+            describe(name, 'gauge')
+            lines.append(f'{self.namespace}_{name}{_format_labels(labels)} {_format_value(value)}')
+
+        for (name, labels), cumulative, total, count in histograms:
+            describe(name, 'histogram')
+            full_name = f'{self.namespace}_{name}'
+            for bound, bucket_count in cumulative:
+                le = '+Inf' if bound == float('inf') else _format_value(bound)
+                lines.append(f'{full_name}_bucket{_format_labels(labels + (("le", le),))} {bucket_count}')
+            lines.append(f'{full_name}_sum{_format_labels(labels)} {_format_value(total)}')
+            lines.append(f'{full_name}_count{_format_labels(labels)} {count}')
+
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path):
+        """Tulis file teks (mis. untuk textfile collector node_exporter) secara atomik"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f'{path}.tmp-{os.getpid()}'
+        with open(tmp_path, 'w') as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+               for _, value in labels)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(labels, escaped)) + '}'
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
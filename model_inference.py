@@ -1,72 +1,245 @@
 # model_inference.py
 # Kode untuk inferensi model prediksi dropout
 
+import argparse
+import hashlib
+from datetime import datetime, timezone
 import pandas as pd
 import numpy as np
 import joblib
+import sklearn
 from sklearn.preprocessing import LabelEncoder, StandardScaler
 from sklearn.ensemble import RandomForestClassifier
 import warnings
+from forest_engine import CompiledForest
+from category_encoding import CategoryTable
+from dataset_cache import load_dataset
+from prediction_cache import PredictionCache
+from memory_report import StageMemory
+from metrics import NOOP, MetricsRegistry
+from drift_monitor import DriftMonitor, build_reference
 warnings.filterwarnings('ignore')
 
+# Versi format artifact yang ditulis oleh save_model (v3: engine boleh terkuantisasi, lihat compact)
+ARTIFACT_FORMAT_VERSION = 3
+
+def _downcast(series):
+    """Dtype terkecil yang aman: integer ke int8/16/32, float ke float32"""
+    if pd.api.types.is_integer_dtype(series) or pd.api.types.is_bool_dtype(series):
+        return pd.to_numeric(series, downcast='integer')
+    if pd.api.types.is_float_dtype(series):
+        return series.astype(np.float32)
+    return series
+
+def _top_k_indices(values, k):
+    """Indeks k nilai terbesar, urut menurun (seri: indeks kecil dulu), tanpa sort penuh"""
+    if k >= len(values):
+        return np.lexsort((np.arange(len(values)), -values))
+    if k <= 0:
+        return np.array([], dtype=np.intp)
+    # argpartition finds the k-th largest value in O(n); ties at that value are resolved by index
+    kth = values[np.argpartition(-values, k - 1)[k - 1]]
+    above = np.flatnonzero(values > kth)
+    ties = np.flatnonzero(values == kth)[:k - len(above)]
+    selected = np.concatenate([above, ties])
+    return selected[np.lexsort((selected, -values[selected]))]
+
 class DropoutPredictor:
-    def __init__(self):
+    HIGH_RISK_THRESHOLD = 0.7
+    MEDIUM_RISK_THRESHOLD = 0.4
+    
+    DEFAULT_MODEL_PARAMS = {
+        'n_estimators': 100,
+        'random_state': 42,
+        'max_depth': 10,
+        'min_samples_split': 5,
+        'min_samples_leaf': 2
+    }
+    
+    def __init__(self, unseen_category='most_frequent'):
         self.model = None
         self.scaler = None
         self.label_encoders = {}
+        self.category_tables = {}
+        self.unseen_category = unseen_category  # 'most_frequent', 'first', a category value, or None (row error)
         self.target_encoder = None
         self.feature_names = None
+        self.engine = None
+        self.metadata = {}
         self.is_trained = False
+        self.prediction_cache = None  # opt-in, see enable_prediction_cache
+        self.metrics = None  # opt-in, see enable_metrics
+        self.surrogate = None  # opt-in, see enable_fast_mode
+        self.drift_monitor = None  # opt-in, see enable_drift_monitor
+        self.preparation_memory = []
     
-    def load_and_prepare_data(self, url="https://raw.githubusercontent.com/dicodingacademy/dicoding_dataset/main/students_performance/data.csv"):
-        """Load dan persiapkan data untuk training"""
-        print("📥 Loading data...")
-        df = pd.read_csv(url, delimiter=';')
+    def enable_prediction_cache(self, max_size=1024, ttl=None):
+        """Aktifkan cache LRU untuk predict_single (ttl dalam detik, None = tanpa kedaluwarsa)"""
+        self.prediction_cache = PredictionCache(max_size=max_size, ttl=ttl)
+        return self.prediction_cache
+    
+    def disable_prediction_cache(self):
+        self.prediction_cache = None
+    
+    def _invalidate_prediction_cache(self):
+        if self.prediction_cache is not None:
+            self.prediction_cache.clear()
+    
+    def enable_fast_mode(self, surrogate):
+        """Score lewat surrogate hasil distillation.py; baris borderline tetap memakai forest"""
+        if surrogate.teacher_version != self.model_version:
+            raise ValueError(f"Surrogate dilatih untuk model {surrogate.teacher_version}, "
+                             f"bukan {self.model_version}")
+        self.surrogate = surrogate
+        self._invalidate_prediction_cache()
+    
+    def disable_fast_mode(self):
+        self.surrogate = None
+        self._invalidate_prediction_cache()
+    
+    def enable_metrics(self, registry=None):
+        """Catat durasi per tahap (encode, predict_proba, ...) ke MetricsRegistry"""
+        self.metrics = registry if registry is not None else MetricsRegistry()
+        if self.drift_monitor is not None:
+            self.drift_monitor.metrics = self.metrics
+        return self.metrics
+    
+    def disable_metrics(self):
+        self.metrics = None
+        if self.drift_monitor is not None:
+            self.drift_monitor.metrics = None
+    
+    def enable_drift_monitor(self, **options):
+        """Bandingkan traffic predict_single/predict_batch dengan histogram referensi training
         
-        # Preprocessing
-        df_processed = df.copy()
+        `options` diteruskan ke DriftMonitor (psi_threshold, ks_threshold,
+        min_rows, check_every, half_life_rows, on_alert).
+        """
+        reference = self.metadata.get('drift_reference')
+        if reference is None:
+            raise ValueError("Artifact belum punya histogram referensi drift; "
+                             "jalankan `python drift_monitor.py reference` atau training ulang.")
+        self.drift_monitor = DriftMonitor(reference, metrics=self.metrics, **options)
+        return self.drift_monitor
+    
+    def disable_drift_monitor(self):
+        self.drift_monitor = None
+    
+    def _rebind_drift_monitor(self):
+        """Monitor yang aktif mulai dari nol terhadap referensi model yang baru"""
+        if self.drift_monitor is None:
+            return
+        reference = self.metadata.get('drift_reference')
+        if reference is None:
+            print("⚠️ Model baru tanpa histogram referensi drift; monitor drift dinonaktifkan")
+            self.drift_monitor = None
+        else:
+            self.drift_monitor.reset(reference)
+    
+    def _stage(self, name):
+        return NOOP if self.metrics is None else self.metrics.stage(name)
+    
+    def _trace(self, request, **info):
+        return NOOP if self.metrics is None else self.metrics.trace(request, **info)
+    
+    def load_and_prepare_data(self, url=None, offline=None, report_memory=False):
+        """Load dan persiapkan data untuk training
         
-        # Encode categorical variables
-        categorical_cols = df_processed.select_dtypes(include=['object']).columns
+        `url` boleh berupa URL, file CSV, atau direktori lokal; data dibaca
+        lewat cache kolumnar lokal (lihat dataset_cache.load_dataset).
         
-        for col in categorical_cols:
-            if col != 'Status':
-                le = LabelEncoder()
-                df_processed[col] = le.fit_transform(df_processed[col])
-                self.label_encoders[col] = le
+        X berbagi kolom dengan df mentah (tanpa df.copy()); hanya kolom yang
+        di-encode atau di-downcast yang mendapat array baru. Fitur integer
+        memakai int8/int16/int32 dan fitur float memakai float32 (pohon sklearn
+        selalu membandingkan dalam float32, jadi model yang dihasilkan sama).
+        Dengan report_memory=True, peak dan sisa memori per tahap dicetak dan
+        disimpan di self.preparation_memory.
+        """
+        print("📥 Loading data...")
+        memory = StageMemory(enabled=report_memory)
         
-        # Encode target variable
-        self.target_encoder = LabelEncoder()
-        df_processed['Status'] = self.target_encoder.fit_transform(df_processed['Status'])
+        with self._trace('load_and_prepare_data'), memory:
+            with memory.stage('load'), self._stage('load'):
+                df = load_dataset(url, offline=offline)
+            
+            with memory.stage('encode'), self._stage('encode'):
+                # Lazy under copy-on-write: columns are shared with df until replaced
+                X = df.drop(columns='Status')
+                
+                # Encode categorical variables
+                categorical_cols = X.select_dtypes(include=['object']).columns
+                
+                for col in categorical_cols:
+                    le = LabelEncoder()
+                    X[col] = le.fit_transform(X[col])
+                    self.label_encoders[col] = le
+                    self.category_tables[col] = CategoryTable.from_label_encoder(
+                        le, X[col], fallback=self.unseen_category
+                    )
+                
+                # Encode target variable
+                self.target_encoder = LabelEncoder()
+                y = pd.Series(self.target_encoder.fit_transform(df['Status']), index=df.index, name='Status')
+            
+            with memory.stage('downcast'), self._stage('downcast'):
+                for col in X.columns:
+                    X[col] = _downcast(X[col])
+                y = _downcast(y)
         
-        # Separate features and target
-        X = df_processed.drop('Status', axis=1)
-        y = df_processed['Status']
+        if report_memory:
+            self.preparation_memory = memory.stages
+            print("🧮 Memory per stage (tracemalloc):")
+            print(memory.format())
         
         self.feature_names = X.columns.tolist()
         
         return X, y, df
     
-    def train_model(self, X, y):
-        """Training model"""
+    def train_model(self, X, y, params=None, window='initial'):
+        """Training model
+        
+        `params` menimpa DEFAULT_MODEL_PARAMS, mis. hasil hyperparameter_search.
+        `window` adalah label data (mis. semester) yang dicatat di metadata['tree_windows'].
+        """
         print("🤖 Training model...")
         
         # Initialize and train model
-        self.model = RandomForestClassifier(
-            n_estimators=100,
-            random_state=42,
-            max_depth=10,
-            min_samples_split=5,
-            min_samples_leaf=2
-        )
-        
-        self.model.fit(X, y)
+        params = {**self.DEFAULT_MODEL_PARAMS, **(params or {})}
+        self.model = RandomForestClassifier(**params)
         
-        # Initialize scaler (optional for RandomForest, but good to have)
-        self.scaler = StandardScaler()
-        self.scaler.fit(X)
+        with self._trace('train_model', rows=len(X)):
+            with self._stage('fit'):
+                self.model.fit(X, y)
+            
+            # Flat-array copy of the forest for low-latency scoring
+            with self._stage('compile'):
+                self.engine = CompiledForest.from_sklearn(self.model)
+            
+            # Initialize scaler (optional for RandomForest, but good to have)
+            with self._stage('scaler'):
+                self.scaler = StandardScaler()
+                self.scaler.fit(X)
+            
+            # Per-feature histograms of the training data, compared against live traffic
+            with self._stage('drift_reference'):
+                drift_reference = build_reference(X, self.feature_names)
         
         self.is_trained = True
+        self.metadata = {
+            'model_version': self._fingerprint(),
+            'trained_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'sklearn_version': sklearn.__version__,
+            'n_estimators': len(self.model.estimators_),
+            'params': params,
+            'n_training_rows': len(X),
+            'classes': self.target_encoder.classes_.tolist(),
+            'tree_windows': [self._tree_window(window, len(self.model.estimators_), len(X))],
+            'tree_seed_offset': 0,
+            'drift_reference': drift_reference
+        }
+        self.surrogate = None  # distilled from the previous model
+        self._rebind_drift_monitor()
+        self._invalidate_prediction_cache()
         
         print("✅ Model training completed!")
         
@@ -81,123 +254,600 @@ class DropoutPredictor:
         
         return self.model
     
-    def predict_single(self, student_data):
-        """Prediksi untuk satu mahasiswa"""
+    def update_model(self, X_new, y_new, n_new_trees=25, retire_oldest=0, window=None):
+        """Tambah pohon yang dilatih pada data baru tanpa refit seluruh histori
+        
+        Pohon baru memakai parameter training yang sama. `retire_oldest` pohon
+        tertua dibuang lebih dulu sehingga ukuran forest dapat dijaga tetap.
+        Asal setiap pohon dicatat di metadata['tree_windows'].
+        """
+        if self.model is None:
+            raise ValueError("update_model butuh model sklearn; load_model dengan keep_model=True.")
+        
+        params = {**self.metadata.get('params', self.DEFAULT_MODEL_PARAMS), 'n_estimators': n_new_trees}
+        # Shift the seed per update so a repeated window does not regrow identical trees; the
+        # offset is a counter in the metadata, so retiring or merging windows never reuses one
+        # (artifacts without it continue from their window count)
+        seed_offset = self.metadata.get('tree_seed_offset', len(self._current_tree_windows()) - 1) + 1
+        if params.get('random_state') is not None:
+            params['random_state'] += seed_offset
+        window = window or f'update-{seed_offset}'
+        
+        print(f"🤖 Training {n_new_trees} new trees on {len(X_new)} rows ({window})...")
+        addition = RandomForestClassifier(**params).fit(X_new, y_new)
+        self._append_trees(addition, self._tree_window(window, n_new_trees, len(X_new)), retire_oldest)
+        self.metadata['tree_seed_offset'] = seed_offset
+        
+        # Keep the scaler describing all rows seen so far
+        if self.scaler is not None:
+            self.scaler.partial_fit(X_new)
+        self.metadata['n_training_rows'] = (self.metadata.get('n_training_rows') or 0) + len(X_new)
+        
+        print(f"✅ Model updated: {len(self.model.estimators_)} trees (version {self.model_version})")
+        return self.model
+    
+    def merge_model(self, other, retire_oldest=0):
+        """Gabungkan pohon dari DropoutPredictor lain yang dilatih terpisah (fitur & kelas sama)"""
+        if self.model is None or other.model is None:
+            raise ValueError("merge_model butuh model sklearn di kedua predictor.")
+        if list(other.feature_names) != list(self.feature_names):
+            raise ValueError("Urutan fitur kedua model berbeda; tidak bisa digabung.")
+        for col, table in self.category_tables.items():
+            if list(other.category_tables[col].categories) != list(table.categories):
+                raise ValueError(f"Encoding kategori '{col}' berbeda; tidak bisa digabung.")
+        
+        self._append_trees(other.model, other._current_tree_windows(), retire_oldest)
+        self.metadata['n_training_rows'] = ((self.metadata.get('n_training_rows') or 0)
+                                            + (other.metadata.get('n_training_rows') or 0))
+        print(f"✅ Model merged: {len(self.model.estimators_)} trees (version {self.model_version})")
+        return self.model
+    
+    def _append_trees(self, forest, windows, retire_oldest):
+        """Sambungkan estimators_ `forest` ke model, buang pohon tertua, lalu compile ulang engine"""
+        if not np.array_equal(forest.classes_, self.model.classes_):
+            raise ValueError(
+                f"Data baru hanya berisi kelas {list(self.target_encoder.classes_[forest.classes_])}; "
+                f"semua kelas {list(self.target_encoder.classes_)} harus ada."
+            )
+        if isinstance(windows, dict):
+            windows = [windows]
+        
+        estimators = self.model.estimators_ + forest.estimators_
+        tree_windows = [dict(w) for w in self._current_tree_windows() + windows]
+        if retire_oldest >= len(estimators):
+            raise ValueError("retire_oldest akan membuang semua pohon.")
+        
+        # Trees are stored oldest first, so retiring trims windows from the front
+        estimators = estimators[retire_oldest:]
+        to_retire = retire_oldest
+        while to_retire:
+            retired = min(to_retire, tree_windows[0]['n_trees'])
+            tree_windows[0]['n_trees'] -= retired
+            to_retire -= retired
+            if tree_windows[0]['n_trees'] == 0:
+                tree_windows.pop(0)
+        
+        self.model.estimators_ = estimators
+        self.model.n_estimators = len(estimators)
+        self.engine = CompiledForest.from_sklearn(self.model)
+        # Importances computed for the previous forest no longer apply
+        self.metadata.pop('permutation_importance', None)
+        self.metadata.update({
+            'model_version': self._fingerprint(),
+            'updated_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'n_estimators': len(estimators),
+            'tree_windows': tree_windows
+        })
+        self.surrogate = None  # distilled from the previous forest
+        self._invalidate_prediction_cache()
+    
+    def _current_tree_windows(self):
+        """tree_windows dari metadata; artifact lama dianggap satu window 'initial'"""
+        return self.metadata.get('tree_windows') or [
+            self._tree_window('initial', len(self.model.estimators_), self.metadata.get('n_training_rows'))
+        ]
+    
+    @staticmethod
+    def _tree_window(window, n_trees, n_rows):
+        return {
+            'window': window,
+            'n_trees': n_trees,
+            'n_rows': n_rows,
+            'trained_at': datetime.now(timezone.utc).isoformat(timespec='seconds')
+        }
+    
+    def predict_single(self, student_data, explain=False, top_k=None):
+        """Prediksi untuk satu mahasiswa
+        
+        explain=True menambahkan 'explanation': kontribusi tiap fitur terhadap
+        probabilitas kelas yang dijelaskan (lihat _explain), diurutkan menurut
+        besarnya; top_k membatasi jumlah fitur.
+        """
         if not self.is_trained:
             raise ValueError("Model belum ditraining! Jalankan train_model() terlebih dahulu.")
         
-        # Convert to DataFrame if it's a dictionary
-        if isinstance(student_data, dict):
-            df_input = pd.DataFrame([student_data])
+        with self._trace('predict_single'):
+            return self._predict_single(student_data, explain, top_k)
+    
+    def _predict_single(self, student_data, explain, top_k):
+        # Dictionaries skip pandas entirely and go straight to the compiled forest
+        with self._stage('encode'):
+            if isinstance(student_data, dict):
+                features = self._encode_record(student_data)
+            else:
+                X, invalid = self._prepare_features(student_data.iloc[:1])
+                if invalid.any():
+                    raise ValueError(f"Invalid value for: {', '.join(np.array(self.feature_names)[invalid[0]])}")
+                features = X[0]
+        
+        # Counted before the cache lookup: a cached answer is still live traffic
+        if self.drift_monitor is not None:
+            with self._stage('drift'):
+                self.drift_monitor.update(features[np.newaxis])
+        
+        # Identical encoded inputs for the same model version reuse the earlier result
+        cache_key = None
+        if self.prediction_cache is not None:
+            with self._stage('cache_lookup'):
+                cache_key = PredictionCache.make_key(
+                    features, f'{self.model_version}:explain={top_k}' if explain else self.model_version)
+                cached = self.prediction_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        with self._stage('predict_proba'):
+            probability = self._predict_proba(features[np.newaxis])[0]
+        
+        with self._stage('decode'):
+            # Convert prediction back to original labels
+            predicted_status = self.target_encoder.classes_[self.engine.classes[probability.argmax()]]
+            
+            # Get probabilities for each class
+            prob_dict = {}
+            for i, class_name in enumerate(self.target_encoder.classes_):
+                prob_dict[class_name] = float(probability[i])
+            
+            result = {
+                'predicted_status': predicted_status,
+                'probabilities': prob_dict,
+                'dropout_probability': prob_dict.get('Dropout', 0),
+                'risk_level': self._get_risk_level(prob_dict.get('Dropout', 0))
+            }
+        if explain:
+            with self._stage('explain'):
+                class_index, base_value, contributions = self._explain(features[np.newaxis])
+                class_index, base_value, contributions = class_index[0], base_value[0], contributions[0]
+                order = np.argsort(-np.abs(contributions), kind='stable')[:top_k]
+                result['explanation'] = {
+                    'class': self.target_encoder.classes_[self.engine.classes[class_index]],
+                    'base_value': float(base_value),
+                    'contributions': {self.feature_names[i]: float(contributions[i]) for i in order}
+                }
+        if cache_key is not None:
+            self.prediction_cache.put(cache_key, result)
+        
+        return result
+    
+    def predict_batch(self, students_data, explain=False):
+        """Prediksi untuk multiple mahasiswa dalam satu proses vektor
+        
+        Mengembalikan DataFrame kolumnar: student_id, predicted_status,
+        prob_<kelas>, dropout_probability, risk_level, dan error (kosong jika sukses).
+        explain=True menambahkan explained_class, base_value dan contrib_<fitur>.
+        """
+        if not self.is_trained:
+            raise ValueError("Model belum ditraining! Jalankan train_model() terlebih dahulu.")
+        
+        with self._trace('predict_batch', rows=len(students_data)):
+            results = self._predict_frame(students_data, explain=explain)
+        
+        failed = results['error'].notna()
+        if failed.any():
+            print(f"⚠️ {failed.sum()} dari {len(results)} mahasiswa gagal diprediksi")
+            for idx, error in results.loc[failed, ['student_id', 'error']].head(5).itertuples(index=False):
+                print(f"Error predicting for student {idx}: {error}")
+        
+        return results
+    
+    def rank_cohort(self, students_data, k=50, offset=0, filters=None, scores=None):
+        """Top-k mahasiswa berisiko tertinggi (dropout_probability) dalam satu cohort
+        
+        Seluruh cohort di-score sekali lewat predict_batch, kecuali `scores`
+        (hasil predict_batch sebelumnya untuk students_data yang sama) diberikan.
+        `filters` adalah dict kolom → nilai atau list nilai, dari kolom data
+        (mis. Course, Gender) atau hasil scoring (mis. risk_level). Hanya
+        offset + k baris teratas yang diurutkan, sehingga halaman berikutnya
+        cukup memakai offset. Mengembalikan hasil scoring baris terpilih dengan
+        kolom rank (1 = paling berisiko) dan atribut `matched` (jumlah baris lolos filter).
+        """
+        if scores is None:
+            scores = self.predict_batch(students_data)
+        elif len(scores) != len(students_data):
+            raise ValueError("scores harus hasil predict_batch untuk students_data yang sama")
+        
+        # Rows that failed to score never rank
+        mask = scores['error'].isna().to_numpy(copy=True)
+        for column, value in (filters or {}).items():
+            if column in students_data.columns:
+                values = students_data[column]
+            elif column in scores.columns:
+                values = scores[column]
+            else:
+                raise ValueError(f"Kolom filter tidak dikenal: {column}")
+            if value is None or (isinstance(value, (list, tuple, set)) and not value):
+                continue
+            allowed = value if isinstance(value, (list, tuple, set)) else [value]
+            mask &= values.isin(allowed).to_numpy()
+        
+        candidates = np.flatnonzero(mask)
+        probabilities = scores['dropout_probability'].to_numpy()[candidates]
+        order = _top_k_indices(probabilities, offset + k)[offset:]
+        
+        ranked = scores.iloc[candidates[order]].reset_index(drop=True)
+        ranked.insert(0, 'rank', np.arange(offset + 1, offset + len(ranked) + 1))
+        ranked.attrs['matched'] = len(candidates)
+        return ranked
+    
+    def what_if(self, students_data, grid):
+        """Kurva respons per mahasiswa saat satu fitur diubah ke setiap nilai grid
+        
+        `grid` adalah dict fitur → list nilai mentah (mis. {'Tuition_fees_up_to_date': [0, 1]});
+        setiap fitur di-sweep terpisah, fitur lain tetap nilai asli mahasiswa.
+        Cohort di-encode sekali, lalu baris asli dan semua baris hasil
+        perturbasi disusun dalam satu array dan di-score dengan satu panggilan
+        model. Mengembalikan DataFrame panjang student_id, feature, value,
+        dropout_probability, delta (terhadap probabilitas asli), risk_level,
+        predicted_status; atribut `baseline` berisi probabilitas asli per
+        mahasiswa dan `skipped` jumlah baris tidak valid yang dilewati.
+        """
+        if not self.is_trained:
+            raise ValueError("Model belum ditraining! Jalankan train_model() terlebih dahulu.")
+        
+        unknown = [feature for feature in grid if feature not in self.feature_names]
+        if unknown:
+            raise ValueError(f"Fitur tidak dikenal: {', '.join(unknown)}")
+        points = [(feature, value, code) for feature, values in grid.items()
+                  for value, code in zip(values, self._encode_values(feature, values))]
+        
+        with self._trace('what_if', rows=len(students_data) * (len(points) + 1)):
+            X, invalid = self._prepare_features(students_data)
+            valid_rows = ~invalid.any(axis=1)
+            X = X[valid_rows]
+            n_students = len(X)
+            
+            with self._stage('stack'):
+                # Block 0 is the unchanged cohort, block k + 1 has grid point k written into its column
+                stacked = np.empty((len(points) + 1, n_students, X.shape[1]))
+                stacked[:] = X
+                for block, (feature, _, code) in zip(stacked[1:], points):
+                    block[:, self.feature_names.index(feature)] = code
+            
+            with self._stage('predict_proba'):
+                probabilities = self._predict_proba(stacked.reshape(-1, X.shape[1]))
+                probabilities = probabilities.reshape(len(points) + 1, n_students, len(self.target_encoder.classes_))
+            
+            with self._stage('decode'):
+                class_names = list(self.target_encoder.classes_)
+                if 'Dropout' in class_names:
+                    dropout_prob = probabilities[..., class_names.index('Dropout')]
+                else:
+                    dropout_prob = np.zeros(probabilities.shape[:2])
+                baseline, swept = dropout_prob[0], dropout_prob[1:].ravel()
+                predicted = self.target_encoder.inverse_transform(
+                    self.engine.classes[probabilities[1:].reshape(-1, len(class_names)).argmax(axis=1)])
+            
+            with self._stage('assemble'):
+                student_ids = students_data.index[valid_rows]
+                results = pd.DataFrame({
+                    'student_id': np.tile(student_ids, len(points)),
+                    'feature': np.repeat([feature for feature, _, _ in points], n_students),
+                    'value': np.repeat(np.array([value for _, value, _ in points], dtype=object), n_students),
+                    'dropout_probability': swept,
+                    'delta': swept - np.tile(baseline, len(points)),
+                    'risk_level': self._get_risk_levels(swept),
+                    'predicted_status': predicted
+                })
+                results.attrs['baseline'] = pd.Series(baseline, index=student_ids, name='dropout_probability')
+                results.attrs['skipped'] = int((~valid_rows).sum())
+        
+        return results
+    
+    def _encode_values(self, feature, values):
+        """Encode nilai grid satu fitur seperti kolom input biasa"""
+        values = pd.Series(list(values), dtype=object)
+        if feature in self.category_tables:
+            # A what-if value is chosen on purpose, so unseen categories are rejected instead of falling back
+            table = self.category_tables[feature]
+            codes = table.encode(values)
+            codes[~values.isin(table.categories).to_numpy()] = np.nan
         else:
-            df_input = student_data.copy()
-        
-        # Encode categorical variables
-        for col in self.label_encoders:
-            if col in df_input.columns:
-                # Handle unseen categories
-                try:
-                    df_input[col] = self.label_encoders[col].transform(df_input[col])
-                except ValueError:
-                    # If category not seen before, use the most frequent category
-                    df_input[col] = 0
-        
-        # Ensure all required features are present
-        for feature in self.feature_names:
-            if feature not in df_input.columns:
-                df_input[feature] = 0  # Default value
-        
-        # Reorder columns to match training data
-        df_input = df_input[self.feature_names]
-        
-        # Make prediction
-        prediction = self.model.predict(df_input)[0]
-        probability = self.model.predict_proba(df_input)[0]
-        
-        # Convert prediction back to original labels
-        predicted_status = self.target_encoder.inverse_transform([prediction])[0]
-        
-        # Get probabilities for each class
-        prob_dict = {}
-        for i, class_name in enumerate(self.target_encoder.classes_):
-            prob_dict[class_name] = probability[i]
+            codes = pd.to_numeric(values, errors='coerce').to_numpy(dtype=np.float64)
+        if not np.isfinite(codes).all():
+            raise ValueError(f"Nilai grid tidak valid untuk {feature}: {values[~np.isfinite(codes)].tolist()}")
+        return codes
+    
+    def _prepare_features(self, df_input):
+        """Encode dan susun kolom seluruh DataFrame sekaligus
         
-        return {
-            'predicted_status': predicted_status,
-            'probabilities': prob_dict,
-            'dropout_probability': prob_dict.get('Dropout', 0),
-            'risk_level': self._get_risk_level(prob_dict.get('Dropout', 0))
-        }
+        Mengembalikan matriks fitur float64 dan mask sel yang tidak valid: nilai
+        kosong (NaN), teks yang tidak bisa dibaca sebagai angka, dan ±inf. Baris
+        dengan sel tidak valid tidak di-impute; predict_batch mengembalikannya
+        dengan kolom error terisi.
+        """
+        # Ensure all required features are present and ordered like the training data
+        with self._stage('align'):
+            df_input = df_input.reindex(columns=self.feature_names, fill_value=0)
+        
+        with self._stage('encode'):
+            # Encode categorical variables; unseen categories fall back per row
+            for col, table in self.category_tables.items():
+                df_input[col] = table.encode(df_input[col])
+            
+            # Values that cannot be read as numbers become NaN and, like ±inf, mark their row as invalid;
+            # only non-numeric columns need the (slow, per column) coercion
+            for col in df_input.columns[~df_input.dtypes.map(pd.api.types.is_numeric_dtype).to_numpy(dtype=bool)]:
+                df_input[col] = pd.to_numeric(df_input[col], errors='coerce')
+            X = df_input.to_numpy(dtype=np.float64)
+            invalid = ~np.isfinite(X)
+        
+        return X, invalid
     
-    def predict_batch(self, students_data):
-        """Prediksi untuk multiple mahasiswa"""
-        results = []
-        for idx, student in students_data.iterrows():
+    def _encode_record(self, record):
+        """Encode satu record dictionary menjadi vektor fitur tanpa pandas"""
+        features = np.zeros(len(self.feature_names))
+        
+        for i, feature in enumerate(self.feature_names):
+            value = record.get(feature, 0)  # Default value
+            if feature in self.category_tables:
+                value = self.category_tables[feature].encode_value(value)
             try:
-                result = self.predict_single(student.to_dict())
-                result['student_id'] = idx
-                results.append(result)
-            except Exception as e:
-                print(f"Error predicting for student {idx}: {e}")
-                results.append({
-                    'student_id': idx,
-                    'predicted_status': 'Error',
-                    'probabilities': {},
-                    'dropout_probability': 0,
-                    'risk_level': 'Unknown'
-                })
+                features[i] = float(value)
+            except (TypeError, ValueError):
+                features[i] = np.nan
+            if not np.isfinite(features[i]):
+                raise ValueError(f"Invalid value for: {feature}")
+        
+        return features
+    
+    def _predict_proba(self, X):
+        """Probabilitas kelas dari matriks fitur yang sudah di-encode"""
+        if self.surrogate is None:
+            return self.engine.predict_proba(X)
+        proba, fallback = self.surrogate.score(X, self.engine)
+        if self.metrics is not None:
+            n_fallback = int(fallback.sum())
+            self.metrics.inc('fast_mode_rows_total', len(X) - n_fallback, path='surrogate')
+            self.metrics.inc('fast_mode_rows_total', n_fallback, path='fallback')
+        return proba
+    
+    def _explain(self, X):
+        """Atribusi jalur pohon (Saabas) untuk kelas yang dijelaskan per baris
+        
+        Kelas yang dijelaskan adalah Dropout (dasar level risiko), atau kelas
+        prediksi bila model tidak punya kelas Dropout. Dalam fast mode baris
+        yang di-score surrogate dijelaskan dengan pohon surrogate. Mengembalikan
+        (indeks kelas per baris, base value per baris, kontribusi baris x fitur)
+        dengan base value + kontribusi.sum(axis=1) == probabilitas yang dikembalikan
+        untuk kelas tersebut.
+        """
+        bias, contributions = self.engine.contributions(X)
+        base = np.tile(bias, (len(X), 1))
+        if self.surrogate is not None:
+            # Same routing decision as _predict_proba, so each row is explained by the model that scored it
+            surrogate_rows = ~self.surrogate.needs_fallback(self.surrogate.predict_proba(X))
+            if surrogate_rows.any():
+                base[surrogate_rows], contributions[surrogate_rows] = \
+                    self.surrogate.engine.contributions(X[surrogate_rows])
+        
+        class_names = list(self.target_encoder.classes_)
+        if 'Dropout' in class_names:
+            class_index = np.full(len(X), class_names.index('Dropout'))
+        else:
+            class_index = (base + contributions.sum(axis=1)).argmax(axis=1)
+        rows = np.arange(len(X))
+        return class_index, base[rows, class_index], contributions[rows, :, class_index]
+    
+    def _predict_frame(self, df_input, explain=False):
+        """Encode, align dan score seluruh DataFrame dengan satu panggilan model"""
+        X, invalid = self._prepare_features(df_input)
+        invalid_rows = invalid.any(axis=1)
+        valid_rows = ~invalid_rows
+        
+        if self.drift_monitor is not None:
+            with self._stage('drift'):
+                self.drift_monitor.update(X[valid_rows])
+        
+        class_names = self.target_encoder.classes_
+        probabilities = np.full((len(X), len(class_names)), np.nan)
+        if valid_rows.any():
+            with self._stage('predict_proba'):
+                probabilities[valid_rows] = self._predict_proba(X[valid_rows])
+        
+        with self._stage('decode'):
+            # RandomForest.predict is the argmax of predict_proba, so one model call is enough
+            predicted = np.full(len(X), 'Error', dtype=object)
+            if valid_rows.any():
+                best = probabilities[valid_rows].argmax(axis=1)
+                predicted[valid_rows] = self.target_encoder.inverse_transform(self.engine.classes[best])
+            
+            if 'Dropout' in class_names:
+                dropout_prob = probabilities[:, list(class_names).index('Dropout')]
+            else:
+                dropout_prob = np.zeros(len(X))
+            dropout_prob = np.where(valid_rows, dropout_prob, 0.0)
+            
+            risk_level = self._get_risk_levels(dropout_prob)
+            risk_level[invalid_rows] = 'Unknown'
+            
+            errors = np.full(len(X), None, dtype=object)
+            if invalid_rows.any():
+                feature_names = np.array(self.feature_names)
+                for row in np.flatnonzero(invalid_rows):
+                    errors[row] = f"Invalid value for: {', '.join(feature_names[invalid[row]])}"
+        
+        with self._stage('assemble'):
+            results = pd.DataFrame({
+                'student_id': df_input.index,
+                'predicted_status': predicted
+            })
+            for i, class_name in enumerate(class_names):
+                results[f'prob_{class_name}'] = probabilities[:, i]
+            results['dropout_probability'] = dropout_prob
+            results['risk_level'] = risk_level
+            results['error'] = errors
+        
+        if explain:
+            with self._stage('explain'):
+                explained = np.full(len(X), None, dtype=object)
+                base_value = np.full(len(X), np.nan)
+                contributions = np.full((len(X), len(self.feature_names)), np.nan)
+                if valid_rows.any():
+                    class_index, base_value[valid_rows], contributions[valid_rows] = self._explain(X[valid_rows])
+                    explained[valid_rows] = self.target_encoder.inverse_transform(self.engine.classes[class_index])
+                explanation = pd.DataFrame(contributions, columns=[f'contrib_{name}' for name in self.feature_names])
+                explanation.insert(0, 'base_value', base_value)
+                explanation.insert(0, 'explained_class', explained)
+                results = pd.concat([results, explanation], axis=1)
         
         return results
     
     def _get_risk_level(self, dropout_prob):
         """Tentukan level risiko berdasarkan probabilitas dropout"""
-        if dropout_prob >= 0.7:
+        if dropout_prob >= self.HIGH_RISK_THRESHOLD:
             return 'High Risk'
-        elif dropout_prob >= 0.4:
+        elif dropout_prob >= self.MEDIUM_RISK_THRESHOLD:
             return 'Medium Risk'
         else:
             return 'Low Risk'
     
-    def save_model(self, filepath='dropout_model.pkl'):
-        """Simpan model dan preprocessors"""
+    def _get_risk_levels(self, dropout_probs):
+        """Versi vektor dari _get_risk_level"""
+        return np.select(
+            [dropout_probs >= self.HIGH_RISK_THRESHOLD, dropout_probs >= self.MEDIUM_RISK_THRESHOLD],
+            ['High Risk', 'Medium Risk'],
+            default='Low Risk'
+        ).astype(object)
+    
+    def _fingerprint(self):
+        """Versi model: hash isi pohon dan urutan fitur"""
+        digest = hashlib.sha256()
+        digest.update('|'.join(self.feature_names).encode())
+        for array in (self.engine.feature, self.engine.threshold, self.engine.children_left,
+                      self.engine.children_right, self.engine.value):
+            digest.update(np.ascontiguousarray(array).tobytes())
+        return digest.hexdigest()[:12]
+    
+    @property
+    def model_version(self):
+        return self.metadata.get('model_version')
+    
+    def save_model(self, filepath='dropout_model.pkl', compact=False, value_bits=16):
+        """Simpan model, preprocessors, urutan fitur, dan metadata versi
+        
+        compact=True hanya menyimpan engine terkuantisasi (CompiledForest.quantize)
+        tanpa pohon sklearn: artifact jauh lebih kecil dan cepat dimuat, tetapi
+        hanya untuk scoring (update_model/merge_model butuh artifact penuh).
+        """
+        engine, model, metadata = self.engine, self.model, self.metadata
+        if compact:
+            if engine.value_scale is None:
+                engine = engine.quantize(value_bits)
+            model = None
+            metadata = {**metadata, 'compact': {
+                'value_bits': int(np.iinfo(engine.value.dtype).bits),
+                'max_probability_error': 0.5 / engine.value_scale,
+                'source_version': self.model_version
+            }}
+        
         model_data = {
-            'model': self.model,
+            'format_version': ARTIFACT_FORMAT_VERSION,
+            'metadata': metadata,
+            'model': model,
+            'engine': engine,
             'scaler': self.scaler,
             'label_encoders': self.label_encoders,
+            'category_tables': self.category_tables,
             'target_encoder': self.target_encoder,
             'feature_names': self.feature_names,
             'is_trained': self.is_trained
         }
         
         joblib.dump(model_data, filepath)
-        print(f"✅ Model saved to {filepath}")
+        print(f"✅ Model saved to {filepath} (version {self.model_version}{', compact' if compact else ''})")
     
-    def load_model(self, filepath='dropout_model.pkl'):
-        """Load model dan preprocessors"""
-        model_data = joblib.load(filepath)
+    def load_model(self, filepath='dropout_model.pkl', mmap_mode=None, keep_model=True):
+        """Load model dan preprocessors
+        
+        Dengan mmap_mode='r' array besar di artifact (node dan nilai daun
+        engine) di-memory-map sehingga semua worker di satu host berbagi satu
+        salinan page cache. Pohon sklearn selalu disalin ke memori privat oleh
+        sklearn; worker yang hanya melakukan scoring dapat memakai
+        keep_model=False agar salinan itu langsung dilepas.
+        Kategori yang tidak dikenal di-encode menurut `unseen_category`
+        predictor ini, bukan nilai yang dipakai saat training.
+        """
+        model_data = joblib.load(filepath, mmap_mode=mmap_mode)
+        
+        format_version = model_data.get('format_version', 1)
+        if format_version > ARTIFACT_FORMAT_VERSION:
+            raise ValueError(
+                f"Artifact {filepath} memakai format v{format_version}, "
+                f"kode ini hanya mendukung sampai v{ARTIFACT_FORMAT_VERSION}."
+            )
         
         self.model = model_data['model']
         self.scaler = model_data['scaler']
         self.label_encoders = model_data['label_encoders']
+        # Older artifacts only carry LabelEncoders; compile them with the legacy code-0 fallback
+        category_tables = model_data.get('category_tables') or {
+            col: CategoryTable.from_label_encoder(le, fallback='first')
+            for col, le in self.label_encoders.items()
+        }
+        # The fallback is a serving choice, so this predictor's unseen_category applies, not the trainer's
+        self.category_tables = {col: table.with_fallback(self.unseen_category)
+                                for col, table in category_tables.items()}
         self.target_encoder = model_data['target_encoder']
         self.feature_names = model_data['feature_names']
         self.is_trained = model_data['is_trained']
+        # Artifacts written before the engine was stored are compiled in-process
+        self.engine = model_data.get('engine')
+        if self.engine is None and self.is_trained:
+            self.engine = CompiledForest.from_sklearn(self.model)
+        self.metadata = model_data.get('metadata') or {}
+        if self.is_trained and 'model_version' not in self.metadata:
+            self.metadata['model_version'] = self._fingerprint()
+        if not keep_model:
+            self.model = None
+        self.surrogate = None  # distilled from the previous model
+        self._rebind_drift_monitor()
+        self._invalidate_prediction_cache()
         
-        print(f"✅ Model loaded from {filepath}")
+        print(f"✅ Model loaded from {filepath} (version {self.model_version})")
 
-# Contoh penggunaan
+# Training offline + contoh penggunaan
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Training model dropout dan simpan artifact untuk aplikasi Streamlit")
+    parser.add_argument('--data', default=None, help="URL, path data.csv, atau direktori (default: dataset Dicoding)")
+    parser.add_argument('--offline', action='store_true', help="Jangan akses jaringan, pakai cache/file lokal")
+    parser.add_argument('--output', default='dropout_model.pkl', help="Path artifact model")
+    parser.add_argument('--memory-report', action='store_true', help="Cetak peak memori per tahap persiapan data")
+    parser.add_argument('--metrics-file', default=None, help="Tulis durasi per tahap (format Prometheus) ke file ini")
+    args = parser.parse_args()
+    
     # Initialize predictor
     predictor = DropoutPredictor()
+    if args.metrics_file:
+        predictor.enable_metrics()
     
     # Load and prepare data
-    X, y, original_df = predictor.load_and_prepare_data()
+    X, y, original_df = predictor.load_and_prepare_data(args.data, offline=args.offline or None,
+                                                        report_memory=args.memory_report)
     
     # Train model
     model = predictor.train_model(X, y)
     
     # Save model
-    predictor.save_model('dropout_model.pkl')
+    predictor.save_model(args.output)
     
     # Example prediction for a single student
     print("\n🔮 Example Prediction:")
@@ -252,5 +902,12 @@ if __name__ == "__main__":
     for status, prob in result['probabilities'].items():
         print(f"  {status}: {prob:.3f}")
     
+    if args.metrics_file:
+        predictor.metrics.write_prometheus(args.metrics_file)
+        print(f"\n⏱️ Durasi per tahap ditulis ke {args.metrics_file}")
+        for trace in reversed(predictor.metrics.recent_breakdowns()):
+            stages = ', '.join(f"{stage}={seconds * 1000:.2f}" for stage, seconds in trace['stages'].items())
+            print(f"   {trace['request']:<22} {trace['total_s'] * 1000:9.2f} ms  ({stages})")
+    
     print("\n✅ Inference code ready!")
     print("Gunakan class DropoutPredictor untuk prediksi di aplikasi Streamlit.")
\ No newline at end of file
@@ -0,0 +1,84 @@
+# prediction_cache.py
+# Cache LRU + TTL untuk hasil prediksi, dikunci dengan hash vektor fitur ter-encode
+
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+
+class PredictionCache:
+    """Cache LRU berukuran tetap dengan TTL opsional
+
+    Kunci adalah blake2b dari bytes vektor fitur (sudah di-align dan
+    di-encode) ditambah versi model, sehingga input yang sama dengan model
+    lain tidak pernah berbagi entri. Aman dipakai dari beberapa thread
+    (Streamlit menjalankan setiap sesi di thread sendiri).
+    """
+
+    def __init__(self, max_size=1024, ttl=None):
+        if max_size < 1:
+            raise ValueError("max_size minimal 1")
+        self.max_size = max_size
+        self.ttl = ttl  # seconds; None = entries never expire
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def make_key(features, model_version):
+        digest = hashlib.blake2b(features.tobytes(), digest_size=16)
+        digest.update(str(model_version).encode())
+        return digest.digest()
+
+    def get(self, key):
+        """Hasil tersimpan (salinan) atau None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        # Callers get their own copy, so mutating a result cannot corrupt the cache
+        return copy.deepcopy(value)
+
+    def put(self, key, value):
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
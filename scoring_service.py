@@ -0,0 +1,506 @@
+# scoring_service.py
+# Layanan HTTP asyncio untuk prediksi dropout dengan micro-batching request
+
+import argparse
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+import numpy as np
+import pandas as pd
+
+from distillation import Surrogate
+from metrics import SIZE_BUCKETS, MetricsRegistry
+from model_inference import DropoutPredictor
+
+MAX_BODY_BYTES = 16 * 2**20
+# Route → allowed method; stats and metric labels use these only, so client input cannot add new series
+ROUTES = {'/healthz': 'GET', '/readyz': 'GET', '/stats': 'GET', '/metrics': 'GET', '/drift': 'GET',
+          '/predict': 'POST', '/predict/batch': 'POST'}
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+               413: 'Payload Too Large', 422: 'Unprocessable Entity', 500: 'Internal Server Error',
+               503: 'Service Unavailable'}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class ServiceStats:
+    """Counter dan latency terbaru (jendela geser) untuk endpoint /stats
+
+    record_batch dipanggil dari thread executor sementara snapshot berjalan
+    di event loop, jadi semua akses ke counter dan deque memakai satu lock.
+    """
+
+    def __init__(self, window=10_000):
+        self.started_at = time.time()
+        self.requests = {}
+        self.rows_scored = 0
+        self.row_errors = 0
+        self.batches = 0
+        self.batch_rows = deque(maxlen=window)
+        self.latencies = {}
+        self.window = window
+        self._lock = threading.Lock()
+
+    def record_request(self, endpoint, seconds):
+        with self._lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+            self.latencies.setdefault(endpoint, deque(maxlen=self.window)).append(seconds)
+
+    def record_batch(self, n_rows, n_errors):
+        with self._lock:
+            self.batches += 1
+            self.batch_rows.append(n_rows)
+            self.rows_scored += n_rows
+            self.row_errors += n_errors
+
+    def snapshot(self):
+        # Copy under the lock, summarize outside it so scoring threads are not held up
+        with self._lock:
+            latencies = {endpoint: list(values) for endpoint, values in self.latencies.items()}
+            requests, batch_rows = dict(self.requests), list(self.batch_rows)
+            rows_scored, row_errors, batches = self.rows_scored, self.row_errors, self.batches
+        uptime = time.time() - self.started_at
+        latency = {}
+        for endpoint, values in latencies.items():
+            values = np.array(values) * 1000
+            latency[endpoint] = {
+                'p50_ms': float(np.percentile(values, 50)),
+                'p90_ms': float(np.percentile(values, 90)),
+                'p99_ms': float(np.percentile(values, 99)),
+                'max_ms': float(values.max())
+            }
+        return {
+            'uptime_s': uptime,
+            'requests': requests,
+            'rows_scored': rows_scored,
+            'row_errors': row_errors,
+            'batches': batches,
+            'mean_batch_rows': float(np.mean(batch_rows)) if batch_rows else 0.0,
+            'max_batch_rows': int(max(batch_rows)) if batch_rows else 0,
+            'rows_per_second': rows_scored / uptime if uptime > 0 else 0.0,
+            'latency': latency
+        }
+
+
+def _result_records(predictor, results):
+    """Ubah DataFrame predict_batch menjadi list dict seperti output predict_single"""
+    classes = list(predictor.target_encoder.classes_)
+    probabilities = results[[f'prob_{cls}' for cls in classes]].to_numpy().tolist()
+    records = []
+    for status, probs, dropout_prob, risk, error in zip(
+            results['predicted_status'].tolist(), probabilities, results['dropout_probability'].tolist(),
+            results['risk_level'].tolist(), results['error'].tolist()):
+        if pd.notna(error):
+            records.append({'error': error})
+            continue
+        records.append({
+            'predicted_status': status,
+            'probabilities': dict(zip(classes, probs)),
+            'dropout_probability': dropout_prob,
+            'risk_level': risk
+        })
+    return records
+
+
+class MicroBatcher:
+    """Kumpulkan request tunggal yang datang bersamaan menjadi satu panggilan predict_batch
+
+    Batch ditutup saat berisi max_batch_size record atau max_wait_ms setelah
+    record pertama masuk. Scoring berjalan di thread executor sehingga event
+    loop tetap menerima request selama batch sebelumnya dihitung.
+    """
+
+    def __init__(self, predictor, stats, max_batch_size=256, max_wait_ms=5.0):
+        self.predictor = predictor
+        self.stats = stats
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.queue = asyncio.Queue()
+        self.task = None
+
+    def start(self):
+        self.task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    async def submit(self, record):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((record, future))
+        return await future
+
+    async def _collect(self):
+        batch = [await self.queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        # Whatever else is already waiting joins the batch without further delay
+        while len(batch) < self.max_batch_size and not self.queue.empty():
+            batch.append(self.queue.get_nowait())
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            records = [record for record, _ in batch]
+            try:
+                results = await loop.run_in_executor(None, score_records, self.predictor, records, self.stats)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+
+def score_records(predictor, records, stats=None):
+    """Score list dict mahasiswa dengan satu panggilan vektor
+
+    Setiap record disusun menurut feature_names: fitur yang tidak dikirim
+    bernilai 0 seperti di predict_single, berapapun isi record lain dalam
+    batch yang sama.
+    """
+    # from_records alone would take the union of keys, giving NaN (an invalid row)
+    # for features a record left out but another request in the batch sent
+    frame = pd.DataFrame.from_records([[record.get(feature, 0) for feature in predictor.feature_names]
+                                       for record in records], columns=predictor.feature_names)
+    results = predictor.predict_batch(frame)
+    records = _result_records(predictor, results)
+    if stats is not None:
+        stats.record_batch(len(records), sum('error' in record for record in records))
+    if predictor.metrics is not None:
+        predictor.metrics.observe('batch_rows', len(records), buckets=SIZE_BUCKETS)
+    return records
+
+
+class ScoringService:
+    """Server HTTP/1.1 (stdlib asyncio) di atas DropoutPredictor
+
+    Endpoint:
+    - POST /predict        satu mahasiswa (JSON object), di-micro-batch
+    - POST /predict/batch  {"students": [...]} atau list, satu panggilan vektor
+    - GET  /healthz        proses hidup
+    - GET  /readyz         model sudah dimuat (503 sebelum itu)
+    - GET  /stats          counter, ukuran batch, dan latency percentile
+    - GET  /metrics        histogram per tahap predictor dan HTTP (format teks Prometheus)
+    - GET  /drift          skor drift PSI/KS per fitur (jika monitor drift aktif)
+    """
+
+    def __init__(self, model_path='dropout_model.pkl', predictor=None, max_batch_size=256,
+                 max_wait_ms=5.0, max_bulk_rows=100_000, surrogate_path=None, drift=False):
+        self.model_path = model_path
+        self.surrogate_path = surrogate_path
+        self.drift = drift
+        self.predictor = predictor
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.max_bulk_rows = max_bulk_rows
+        self.stats = ServiceStats()
+        self.metrics = MetricsRegistry()
+        self.batcher = None
+        self.server = None
+        self.ready = False
+
+    async def start(self, host='127.0.0.1', port=8000):
+        """Buka socket lalu muat model; selama loading /healthz 200 dan /readyz 503"""
+        self.server = await asyncio.start_server(self._handle_connection, host, port)
+        await self.load()
+        return self.server
+
+    async def load(self):
+        if self.predictor is None:
+            predictor = DropoutPredictor()
+            await asyncio.get_running_loop().run_in_executor(
+                None, lambda: predictor.load_model(self.model_path, mmap_mode='r', keep_model=False))
+            self.predictor = predictor
+        if self.surrogate_path:
+            self.predictor.enable_fast_mode(Surrogate.load(self.surrogate_path))
+        self.predictor.enable_metrics(self.metrics)
+        if self.drift:
+            self.predictor.enable_drift_monitor()
+        self.batcher = MicroBatcher(self.predictor, self.stats, self.max_batch_size, self.max_wait_ms)
+        self.batcher.start()
+        self.ready = True
+
+    async def stop(self):
+        self.ready = False
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.batcher is not None:
+            await self.batcher.stop()
+
+    @property
+    def port(self):
+        return self.server.sockets[0].getsockname()[1]
+
+    async def dispatch(self, method, path, body=b''):
+        """Proses satu request tanpa socket; mengembalikan (status, payload)"""
+        start = time.perf_counter()
+        route = urlsplit(path).path
+        try:
+            status, payload = await self._route(method, route, body)
+        except HTTPError as e:
+            status, payload = e.status, {'error': str(e)}
+        seconds = time.perf_counter() - start
+        if route not in ROUTES:
+            endpoint = 'not_found'
+        elif method != ROUTES[route]:
+            endpoint = 'other'
+        else:
+            endpoint = f'{method} {route}'
+        self.stats.record_request(endpoint, seconds)
+        self.metrics.observe('http_request_duration_seconds', seconds, endpoint=endpoint)
+        self.metrics.inc('http_requests_total', endpoint=endpoint, status=status)
+        return status, payload
+
+    async def _route(self, method, path, body):
+        if path not in ROUTES:
+            raise HTTPError(404, f"Endpoint tidak dikenal: {path}")
+        if method != ROUTES[path]:
+            raise HTTPError(405, f"Gunakan {ROUTES[path]}")
+        if path == '/healthz':
+            return 200, {'status': 'ok'}
+        if path == '/readyz':
+            if not self.ready:
+                return 503, {'status': 'loading'}
+            return 200, {'status': 'ready', 'model_version': self.predictor.model_version}
+        if path == '/stats':
+            return 200, {**self.stats.snapshot(), 'max_batch_size': self.max_batch_size,
+                         'max_wait_ms': self.max_wait_ms}
+        if path == '/metrics':
+            return 200, self.metrics.to_prometheus()
+        if path == '/drift':
+            if not self.ready or self.predictor.drift_monitor is None:
+                raise HTTPError(404, "Monitor drift tidak aktif (jalankan dengan --drift)")
+            report = self.predictor.drift_monitor.check()
+            return 200, {'rows': report.attrs['rows'], 'features': report.to_dict('records')}
+        if not self.ready:
+            raise HTTPError(503, "Model belum siap")
+
+        try:
+            data = json.loads(body or b'null')
+        except json.JSONDecodeError as e:
+            raise HTTPError(400, f"JSON tidak valid: {e}")
+
+        if path == '/predict':
+            if not isinstance(data, dict):
+                raise HTTPError(400, "Body harus berupa object JSON satu mahasiswa")
+            result = await self.batcher.submit(data)
+            return (422 if 'error' in result else 200), result
+
+        students = data.get('students') if isinstance(data, dict) else data
+        if not isinstance(students, list) or not all(isinstance(s, dict) for s in students):
+            raise HTTPError(400, 'Body harus berupa list object atau {"students": [...]}')
+        if len(students) > self.max_bulk_rows:
+            raise HTTPError(413, f"Maksimal {self.max_bulk_rows} mahasiswa per request")
+        if not students:
+            return 200, {'results': []}
+        results = await asyncio.get_running_loop().run_in_executor(
+            None, score_records, self.predictor, students, self.stats)
+        return 200, {'results': results}
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self._write_response(writer, 400, {'error': "Request line tidak valid"}, False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    length = int(headers.get('content-length', 0))
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    # The body cannot be framed, so the connection cannot be reused
+                    await self._write_response(writer, 400, {'error': "Content-Length tidak valid"}, False)
+                    break
+                if length > MAX_BODY_BYTES:
+                    await self._write_response(writer, 413, {'error': "Body terlalu besar"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                keep_alive = (headers.get('connection', '').lower() != 'close'
+                              and version.upper() == 'HTTP/1.1')
+                status, payload = await self.dispatch(method.upper(), target, body)
+                await self._write_response(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except Exception as e:
+            print(f"❌ Error saat memproses request: {e!r}")
+            try:
+                await self._write_response(writer, 500, {'error': "Kesalahan server"}, False)
+            except ConnectionError:
+                pass
+        finally:
+            writer.close()
+
+    async def _write_response(self, writer, status, payload, keep_alive):
+        if isinstance(payload, str):
+            body, content_type = payload.encode(), 'text/plain; version=0.0.4; charset=utf-8'
+        else:
+            body, content_type = json.dumps(payload).encode(), 'application/json'
+        head = (f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+
+class ScoringClient:
+    """Client HTTP asyncio minimal (satu koneksi keep-alive) untuk tes lokal dan load test"""
+
+    def __init__(self, host='127.0.0.1', port=8000):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def request(self, method, path, payload=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        body = json.dumps(payload).encode() if payload is not None else b''
+        head = (f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n")
+        self.writer.write(head.encode('latin-1') + body)
+        await self.writer.drain()
+
+        status = int((await self.reader.readline()).split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        data = await self.reader.readexactly(int(headers.get('content-length', 0)))
+        if headers.get('connection') == 'close':
+            await self.close()
+        if not data:
+            return status, None
+        if not headers.get('content-type', '').startswith('application/json'):
+            return status, data.decode()
+        return status, json.loads(data)
+
+    async def predict(self, student):
+        return await self.request('POST', '/predict', student)
+
+    async def predict_batch(self, students):
+        return await self.request('POST', '/predict/batch', {'students': students})
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+
+async def load_test(host, port, students, concurrency=64, requests=5_000):
+    """Kirim request /predict paralel dari `concurrency` client; kembalikan ringkasan latency"""
+    latencies = []
+    counter = iter(range(requests))
+
+    async def worker():
+        client = ScoringClient(host, port)
+        try:
+            for i in counter:
+                start = time.perf_counter()
+                await client.predict(students[i % len(students)])
+                latencies.append(time.perf_counter() - start)
+        finally:
+            await client.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies = np.array(latencies) * 1000
+    return {
+        'requests': len(latencies),
+        'seconds': elapsed,
+        'requests_per_second': len(latencies) / elapsed,
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p99_ms': float(np.percentile(latencies, 99))
+    }
+
+
+async def _serve(args):
+    service = ScoringService(args.model, max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms,
+                             surrogate_path=args.surrogate, drift=args.drift)
+    server = await service.start(args.host, args.port)
+    print(f"🚀 Scoring service di http://{args.host}:{service.port} "
+          f"(batch ≤ {args.max_batch_size}, jendela {args.max_wait_ms} ms)")
+    async with server:
+        await server.serve_forever()
+
+
+async def _load_test(args):
+    students = pd.read_csv(args.data, delimiter=';').drop(columns='Status', errors='ignore')
+    students = students.head(1_000).to_dict('records')
+    summary = await load_test(args.host, args.port, students, args.concurrency, args.requests)
+    print(f"✅ {summary['requests']:,} request dalam {summary['seconds']:.1f} s "
+          f"({summary['requests_per_second']:,.0f} req/s), p50 {summary['p50_ms']:.2f} ms, "
+          f"p99 {summary['p99_ms']:.2f} ms")
+    status, stats = await ScoringClient(args.host, args.port).request('GET', '/stats')
+    print(f"   rata-rata batch {stats['mean_batch_rows']:.1f} baris, {stats['batches']:,} batch")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Layanan HTTP prediksi dropout dengan micro-batching")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = subparsers.add_parser('serve', help="Jalankan server")
+    serve_parser.add_argument('--model', default='dropout_model.pkl')
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=8000)
+    serve_parser.add_argument('--max-batch-size', type=int, default=256)
+    serve_parser.add_argument('--max-wait-ms', type=float, default=5.0, help="Jendela pengumpulan batch")
+    serve_parser.add_argument('--surrogate', default=None, help="Surrogate dari distillation.py (fast mode)")
+    serve_parser.add_argument('--drift', action='store_true', help="Pantau drift fitur terhadap data training")
+
+    load_parser = subparsers.add_parser('loadtest', help="Load test /predict terhadap server yang berjalan")
+    load_parser.add_argument('data', help="CSV mahasiswa (delimiter ';')")
+    load_parser.add_argument('--host', default='127.0.0.1')
+    load_parser.add_argument('--port', type=int, default=8000)
+    load_parser.add_argument('--concurrency', type=int, default=64)
+    load_parser.add_argument('--requests', type=int, default=5_000)
+
+    args = parser.parse_args()
+    asyncio.run(_serve(args) if args.command == 'serve' else _load_test(args))
@@ -6,11 +6,17 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
-from sklearn.preprocessing import LabelEncoder
-from sklearn.ensemble import RandomForestClassifier
+import os
+from model_inference import DropoutPredictor
+from dataset_cache import load_dataset
+from aggregate_cube import load_or_build
+from metrics import MetricsRegistry
 import warnings
 warnings.filterwarnings('ignore')
 
+# Path artifact model hasil training offline
+MODEL_PATH = os.environ.get('DROPOUT_MODEL_PATH', 'dropout_model.pkl')
+
 # Page config
 st.set_page_config(
     page_title="Prediksi Dropout Mahasiswa",
@@ -57,38 +63,53 @@ st.markdown("""
 # Load and prepare data
 @st.cache_data
 def load_data():
-    url = "https://raw.githubusercontent.com/dicodingacademy/dicoding_dataset/main/students_performance/data.csv"
-    df = pd.read_csv(url, delimiter=';')
+    # Served from the local columnar cache; see dataset_cache.load_dataset
+    df = load_dataset()
     return df
 
-@st.cache_data
-def preprocess_data(df):
-    df_processed = df.copy()
-    label_encoders = {}
-    
-    # Encode categorical variables
-    categorical_cols = df_processed.select_dtypes(include=['object']).columns
-    
-    for col in categorical_cols:
-        if col != 'Status':
-            le = LabelEncoder()
-            df_processed[col] = le.fit_transform(df_processed[col])
-            label_encoders[col] = le
-    
-    # Encode target
-    target_encoder = LabelEncoder()
-    df_processed['Status'] = target_encoder.fit_transform(df_processed['Status'])
-    
-    X = df_processed.drop('Status', axis=1)
-    y = df_processed['Status']
-    
-    return X, y, label_encoders, target_encoder, df_processed
+@st.cache_resource
+def load_cube():
+    # Counts per Status x Gender x Course x ...; built once per dataset version and kept on disk
+    return load_or_build(load_data())
+
+@st.cache_resource
+def load_metrics():
+    # Stage timings are off unless DROPOUT_METRICS=1 or the sidebar debug checkbox is ticked
+    return MetricsRegistry(enabled=os.environ.get('DROPOUT_METRICS') == '1', recent=50)
+
+@st.cache_resource
+def load_predictor(model_path):
+    # Artifact is built offline with `python model_inference.py`
+    predictor = DropoutPredictor()
+    predictor.load_model(model_path)
+    # Every form rerun re-submits the same inputs; identical vectors are served from the cache
+    predictor.enable_prediction_cache(max_size=512, ttl=3600)
+    predictor.enable_metrics(load_metrics())
+    return predictor
 
 @st.cache_resource
-def train_model(X, y):
-    model = RandomForestClassifier(n_estimators=100, random_state=42, max_depth=10)
-    model.fit(X, y)
-    return model
+def score_cohort(_predictor, dataset_version, model_version):
+    # One vectorized pass per dataset and model version; filters and paging reuse the scores
+    return _predictor.predict_batch(load_data())
+
+@st.cache_data(max_entries=8)
+def sweep_cohort(_predictor, dataset_version, model_version, filters, grid):
+    # filters and grid are tuples so they hash; the whole cohort is swept in one stacked scoring call
+    df = load_data()
+    scores = score_cohort(_predictor, dataset_version, model_version)
+    ranked = _predictor.rank_cohort(df, k=len(df), filters=dict(filters), scores=scores)
+    return _predictor.what_if(df.loc[ranked['student_id']], dict(grid))
+
+def what_if_grid(values, n_points):
+    # Few distinct values (flags, categories) are swept as-is, otherwise evenly over the observed range
+    distinct = np.sort(values.dropna().unique())
+    if len(distinct) <= n_points:
+        return tuple(distinct.tolist())
+    points = np.linspace(distinct[0], distinct[-1], n_points)
+    # Integer features (counts, codes) only take whole values; rounding can merge points, so dedupe
+    if pd.api.types.is_integer_dtype(values) or np.array_equal(distinct, np.round(distinct)):
+        return tuple(np.unique(np.round(points)).astype(np.int64).tolist())
+    return tuple(np.unique(np.round(points, 2)).tolist())
 
 def get_risk_level(dropout_prob):
     if dropout_prob >= 0.7:
@@ -99,30 +120,93 @@ def get_risk_level(dropout_prob):
         return "Low Risk", "🟢"
 
 def main():
+    metrics = load_metrics()
+    # The debug checkbox is drawn at the end of the sidebar, so read its state before timing starts
+    metrics.enabled = st.session_state.get('debug_timing', metrics.enabled)
+    
+    with metrics.trace('streamlit_run'):
+        run_app(metrics)
+    
+    show_debug_panel(metrics)
+    if os.environ.get('DROPOUT_METRICS_FILE') and metrics.enabled:
+        metrics.write_prometheus(os.environ['DROPOUT_METRICS_FILE'])
+
+def run_app(metrics):
     st.markdown('<h1 class="main-header">🎓 Prediksi Dropout Mahasiswa</h1>', unsafe_allow_html=True)
     st.markdown('<center><h3>Jaya Jaya Institut</h3></center>', unsafe_allow_html=True)
     
-    # Load data and train model
-    with st.spinner('Loading data dan training model...'):
-        df = load_data()
-        X, y, label_encoders, target_encoder, df_processed = preprocess_data(df)
-        model = train_model(X, y)
+    # Load prebuilt model artifact
+    if not os.path.exists(MODEL_PATH):
+        st.error(
+            f"Artifact model `{MODEL_PATH}` tidak ditemukan. "
+            "Jalankan `python model_inference.py --output dropout_model.pkl` terlebih dahulu."
+        )
+        st.stop()
+    with metrics.stage('load_model'):
+        predictor = load_predictor(MODEL_PATH)
     
     # Sidebar for navigation
     st.sidebar.title("📊 Menu")
     page = st.sidebar.radio(
         "Pilih Halaman:",
-        ["🔮 Prediksi Individual", "📈 Dashboard Overview", "📊 Data Analysis"]
+        ["🔮 Prediksi Individual", "🚨 Early Warning", "🧪 What-If", "📈 Dashboard Overview", "📊 Data Analysis"]
+    )
+    st.sidebar.caption(
+        f"Model v{predictor.model_version} • dilatih {predictor.metadata.get('trained_at', '-')}"
+    )
+    cache_stats = predictor.prediction_cache.stats()
+    st.sidebar.caption(
+        f"Cache prediksi: {cache_stats['hits']} hit / {cache_stats['misses']} miss "
+        f"({cache_stats['size']}/{cache_stats['max_size']})"
     )
     
     if page == "🔮 Prediksi Individual":
-        show_prediction_page(df, model, X.columns, label_encoders, target_encoder)
+        with metrics.stage('render_prediction'):
+            show_prediction_page(predictor)
+    elif page == "🚨 Early Warning":
+        with st.spinner('Scoring cohort...'), metrics.stage('score_cohort'):
+            df = load_data()
+            scores = score_cohort(predictor, df.attrs.get('dataset_version'), predictor.model_version)
+        with metrics.stage('render_early_warning'):
+            show_early_warning(predictor, df, scores)
+    elif page == "🧪 What-If":
+        with st.spinner('Loading data...'), metrics.stage('load_data'):
+            df = load_data()
+        with metrics.stage('render_what_if'):
+            show_what_if(predictor, df)
     elif page == "📈 Dashboard Overview":
-        show_dashboard(df)
+        with st.spinner('Loading data...'), metrics.stage('load_cube'):
+            cube = load_cube()
+        with metrics.stage('render_dashboard'):
+            show_dashboard(cube)
     elif page == "📊 Data Analysis":
-        show_analysis(df, model, X.columns)
+        with st.spinner('Loading data...'), metrics.stage('load_data'):
+            df = load_data()
+        permutation_importance = predictor.metadata.get('permutation_importance')
+        if permutation_importance and permutation_importance['model_version'] != predictor.model_version:
+            permutation_importance = None
+        with metrics.stage('render_analysis'):
+            show_analysis(df, predictor.model, predictor.feature_names, permutation_importance)
+
+def show_debug_panel(metrics):
+    # Per-stage timings of the last runs; shared by all sessions of this server process
+    st.sidebar.markdown("---")
+    st.sidebar.checkbox("🛠️ Debug timing", value=metrics.enabled, key='debug_timing')
+    if not metrics.enabled:
+        return
+    
+    n_recent = st.sidebar.slider("Breakdown terakhir:", min_value=1, max_value=metrics.recent.maxlen, value=10)
+    rows = []
+    for trace in metrics.recent_breakdowns(n_recent):
+        row = {'request': trace['request'], 'total_ms': trace['total_s'] * 1000}
+        row.update({stage: seconds * 1000 for stage, seconds in trace['stages'].items()})
+        rows.append(row)
+    if rows:
+        st.sidebar.dataframe(pd.DataFrame(rows).round(2), hide_index=True)
+    st.sidebar.download_button("⬇️ Metrics (Prometheus)", metrics.to_prometheus(),
+                               file_name='dropout_metrics.prom', mime='text/plain')
 
-def show_prediction_page(df, model, feature_names, label_encoders, target_encoder):
+def show_prediction_page(predictor):
     st.header("🔮 Prediksi Dropout Individual")
     
     st.write("Masukkan data mahasiswa untuk memprediksi risiko dropout:")
@@ -227,43 +311,29 @@ def show_prediction_page(df, model, feature_names, label_encoders, target_encode
         submitted = st.form_submit_button("🔮 Prediksi Dropout", use_container_width=True)
         
         if submitted:
-            # Prepare input data
-            input_data = pd.DataFrame({
-                'Age_at_enrollment': [age],
-                'Admission_grade': [admission_grade],
-                'Previous_qualification_grade': [prev_qualification_grade],
-                'Curricular_units_1st_sem_grade': [sem1_grade],
-                'Curricular_units_2nd_sem_grade': [sem2_grade],
-                'Curricular_units_1st_sem_approved': [sem1_approved],
-                'Curricular_units_2nd_sem_approved': [sem2_approved],
-                'Gender': [gender],
-                'Marital_status': [marital_status],
-                'Tuition_fees_up_to_date': [tuition_up_to_date],
-                'Scholarship_holder': [scholarship],
-                'Debtor': [debtor],
-                'Displaced': [displaced],
-                'International': [international]
-            })
-            
-            # Add missing features with default values
-            for feature in feature_names:
-                if feature not in input_data.columns:
-                    input_data[feature] = 0
-            
-            # Reorder columns to match training data
-            input_data = input_data[feature_names]
+            # Prepare input data; features not in the form use the predictor defaults
+            input_data = {
+                'Age_at_enrollment': age,
+                'Admission_grade': admission_grade,
+                'Previous_qualification_grade': prev_qualification_grade,
+                'Curricular_units_1st_sem_grade': sem1_grade,
+                'Curricular_units_2nd_sem_grade': sem2_grade,
+                'Curricular_units_1st_sem_approved': sem1_approved,
+                'Curricular_units_2nd_sem_approved': sem2_approved,
+                'Gender': gender,
+                'Marital_status': marital_status,
+                'Tuition_fees_up_to_date': tuition_up_to_date,
+                'Scholarship_holder': scholarship,
+                'Debtor': debtor,
+                'Displaced': displaced,
+                'International': international
+            }
             
             # Make prediction
-            prediction = model.predict(input_data)[0]
-            probabilities = model.predict_proba(input_data)[0]
-            
-            # Convert back to original labels
-            predicted_status = target_encoder.inverse_transform([prediction])[0]
-            
-            # Get dropout probability
-            class_names = target_encoder.classes_
-            prob_dict = dict(zip(class_names, probabilities))
-            dropout_prob = prob_dict.get('Dropout', 0)
+            result = predictor.predict_single(input_data, explain=True, top_k=10)
+            predicted_status = result['predicted_status']
+            prob_dict = result['probabilities']
+            dropout_prob = result['dropout_probability']
             
             risk_level, risk_icon = get_risk_level(dropout_prob)
             
@@ -347,33 +417,215 @@ def show_prediction_page(df, model, feature_names, label_encoders, target_encode
             )
             
             st.plotly_chart(fig, use_container_width=True)
+            
+            # Per-feature contributions from the tree paths this student followed
+            explanation = result['explanation']
+            st.subheader("🔍 Faktor Penentu Prediksi")
+            contrib_df = pd.DataFrame({
+                'Feature': list(explanation['contributions'].keys()),
+                'Kontribusi': list(explanation['contributions'].values())
+            })
+            contrib_df['Arah'] = np.where(contrib_df['Kontribusi'] > 0,
+                                          f"Menaikkan {explanation['class']}", f"Menurunkan {explanation['class']}")
+            
+            fig = px.bar(
+                contrib_df,
+                x='Kontribusi',
+                y='Feature',
+                color='Arah',
+                orientation='h',
+                title=f"Top 10 kontribusi fitur terhadap probabilitas {explanation['class']} "
+                      f"(rata-rata dasar {explanation['base_value']:.1%})",
+                color_discrete_map={f"Menaikkan {explanation['class']}": '#F44336',
+                                    f"Menurunkan {explanation['class']}": '#4CAF50'}
+            )
+            fig.update_layout(xaxis_tickformat='+.1%', yaxis={'categoryorder': 'array',
+                                                               'categoryarray': contrib_df['Feature'][::-1].tolist()})
+            st.plotly_chart(fig, use_container_width=True)
 
-def show_dashboard(df):
+def show_early_warning(predictor, df, scores):
+    st.header("🚨 Early Warning: Mahasiswa Paling Berisiko")
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        courses = st.multiselect("Course:", options=sorted(df['Course'].unique().tolist()))
+    with col2:
+        risk_levels = st.multiselect("Level Risiko:", options=['High Risk', 'Medium Risk', 'Low Risk'],
+                                     default=['High Risk', 'Medium Risk'])
+    with col3:
+        statuses = []
+        if 'Status' in df.columns:
+            status_options = sorted(df['Status'].unique().tolist())
+            statuses = st.multiselect("Status saat ini:", options=status_options,
+                                      default=[status for status in ['Enrolled'] if status in status_options])
+    
+    filters = {'Course': courses, 'risk_level': risk_levels}
+    if 'Status' in df.columns:
+        filters['Status'] = statuses
+    
+    # k=0 only applies the filters, which gives the page count without ranking anything
+    matched = predictor.rank_cohort(df, k=0, filters=filters, scores=scores).attrs['matched']
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Mahasiswa Sesuai Filter", f"{matched:,}")
+    with col2:
+        page_size = st.selectbox("Baris per halaman:", [25, 50, 100], index=0)
+    with col3:
+        n_pages = max(1, -(-matched // page_size))
+        page_number = st.number_input(f"Halaman (dari {n_pages}):", min_value=1, max_value=n_pages, value=1)
+    
+    ranked = predictor.rank_cohort(df, k=page_size, offset=(page_number - 1) * page_size,
+                                   filters=filters, scores=scores)
+    if ranked.empty:
+        st.info("Tidak ada mahasiswa yang sesuai filter.")
+        return
+    
+    detail_columns = [col for col in ['Course', 'Gender', 'Age_at_enrollment', 'Admission_grade',
+                                      'Curricular_units_1st_sem_approved', 'Curricular_units_2nd_sem_approved',
+                                      'Tuition_fees_up_to_date', 'Debtor', 'Scholarship_holder']
+                      if col in df.columns]
+    table = pd.concat([
+        ranked[['rank', 'student_id', 'predicted_status', 'dropout_probability', 'risk_level']],
+        df.loc[ranked['student_id'], detail_columns].reset_index(drop=True)
+    ], axis=1)
+    
+    st.dataframe(
+        table,
+        hide_index=True,
+        use_container_width=True,
+        column_config={'dropout_probability': st.column_config.ProgressColumn(
+            "Probabilitas Dropout", format="%.2f", min_value=0.0, max_value=1.0)}
+    )
+    st.download_button("⬇️ Unduh halaman ini (CSV)", table.to_csv(index=False),
+                       file_name=f'early_warning_halaman_{page_number}.csv', mime='text/csv')
+
+def show_what_if(predictor, df):
+    st.header("🧪 What-If: Sensitivitas Risiko Cohort")
+    st.markdown("Bagaimana probabilitas dropout setiap mahasiswa berubah bila satu fitur diubah, "
+                "mis. uang kuliah dilunasi atau nilai semester 2 naik.")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        courses = st.multiselect("Course:", options=sorted(df['Course'].unique().tolist()), key='what_if_course')
+    with col2:
+        statuses = []
+        if 'Status' in df.columns:
+            status_options = sorted(df['Status'].unique().tolist())
+            statuses = st.multiselect("Status saat ini:", options=status_options, key='what_if_status',
+                                      default=[status for status in ['Enrolled'] if status in status_options])
+    
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        default_features = [feature for feature in ['Tuition_fees_up_to_date', 'Curricular_units_2nd_sem_grade']
+                            if feature in predictor.feature_names]
+        features = st.multiselect("Fitur yang diubah:", options=predictor.feature_names, default=default_features)
+    with col2:
+        n_points = st.slider("Titik grid:", min_value=5, max_value=30, value=20)
+    if not features:
+        st.info("Pilih minimal satu fitur.")
+        return
+    
+    filters = (('Course', tuple(courses)),)
+    if 'Status' in df.columns:
+        filters += (('Status', tuple(statuses)),)
+    grid = tuple((feature, what_if_grid(df[feature], n_points)) for feature in features)
+    with st.spinner('Menghitung skenario...'):
+        sweep = sweep_cohort(predictor, df.attrs.get('dataset_version'), predictor.model_version, filters, grid)
+    baseline = sweep.attrs['baseline']
+    if baseline.empty:
+        st.info("Tidak ada mahasiswa yang sesuai filter.")
+        return
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("Mahasiswa", f"{len(baseline):,}")
+    with col2:
+        st.metric("Skenario Di-score", f"{len(sweep):,}")
+    n_curves = st.slider("Kurva per mahasiswa (paling berisiko):", min_value=0, max_value=100, value=20)
+    
+    for tab, feature in zip(st.tabs(features), features):
+        with tab:
+            # Rows are students (most at risk first), columns are grid values
+            # pivot_table tolerates a grid value listed twice (each student has one score per value)
+            curves = sweep[sweep['feature'] == feature].pivot_table(
+                index='student_id', columns='value', values='dropout_probability', aggfunc='first'
+            ).loc[baseline.index]
+            fig = go.Figure()
+            for student_id, curve in curves.head(n_curves).iterrows():
+                fig.add_trace(go.Scatter(x=curve.index, y=curve.values, mode='lines', opacity=0.35,
+                                         line={'width': 1}, name=f"#{student_id}", showlegend=False))
+            fig.add_trace(go.Scatter(x=curves.columns, y=curves.mean().values, mode='lines+markers',
+                                     line={'width': 4, 'color': 'black'}, name="Rata-rata cohort"))
+            fig.add_hline(y=DropoutPredictor.HIGH_RISK_THRESHOLD, line_dash='dash', line_color='red')
+            fig.add_hline(y=DropoutPredictor.MEDIUM_RISK_THRESHOLD, line_dash='dash', line_color='orange')
+            fig.update_layout(title=f"Probabilitas Dropout vs {feature}", xaxis_title=feature,
+                              yaxis_title="Probabilitas Dropout", yaxis_range=[0, 1])
+            st.plotly_chart(fig, use_container_width=True)
+            
+            best_value = curves.idxmin(axis=1)
+            best = pd.DataFrame({
+                'student_id': curves.index,
+                'dropout_probability': baseline.values,
+                f'{feature} terbaik': best_value.values,
+                'probabilitas_terbaik': curves.min(axis=1).values
+            })
+            best['penurunan'] = best['dropout_probability'] - best['probabilitas_terbaik']
+            best['level_risiko_terbaik'] = predictor._get_risk_levels(best['probabilitas_terbaik'].to_numpy())
+            best = pd.concat([best, df.loc[curves.index, [feature]].reset_index(drop=True)
+                              .rename(columns={feature: f'{feature} saat ini'})], axis=1)
+            st.markdown("**Mahasiswa dengan penurunan risiko terbesar**")
+            st.dataframe(best.sort_values('penurunan', ascending=False).head(25), hide_index=True,
+                         use_container_width=True)
+    
+    st.download_button("⬇️ Unduh semua kurva (CSV)", sweep.to_csv(index=False),
+                       file_name='what_if_kurva.csv', mime='text/csv')
+
+def dashboard_stats(cube):
+    # Aggregations behind the dashboard KPIs and charts, read from the precomputed cube
+    status_counts = cube.counts('Status').sort_values(ascending=False)
+    total_students = cube.total()
+    dropout_count = int(status_counts.get('Dropout', 0))
+    graduate_count = int(status_counts.get('Graduate', 0))
+    
+    return {
+        'total_students': total_students,
+        'dropout_count': dropout_count,
+        'graduate_count': graduate_count,
+        'dropout_rate': (dropout_count / total_students) * 100 if total_students else 0.0,
+        'status_counts': status_counts,
+        'gender_status': cube.crosstab('Gender', 'Status')
+    }
+
+def show_dashboard(cube):
     st.header("📈 Dashboard Overview")
     
+    courses = st.multiselect("Filter Course:", cube.values('Course'))
+    cube = cube.filter(Course=courses)
+    if cube.total() == 0:
+        st.warning("Tidak ada mahasiswa untuk filter ini.")
+        return
+    
+    stats = dashboard_stats(cube)
+    
     # Key metrics
     col1, col2, col3, col4 = st.columns(4)
     
-    total_students = len(df)
-    dropout_count = len(df[df['Status'] == 'Dropout'])
-    graduate_count = len(df[df['Status'] == 'Graduate'])
-    dropout_rate = (dropout_count / total_students) * 100
-    
     with col1:
-        st.metric("👥 Total Mahasiswa", f"{total_students:,}")
+        st.metric("👥 Total Mahasiswa", f"{stats['total_students']:,}")
     with col2:
-        st.metric("🎓 Lulusan", f"{graduate_count:,}")
+        st.metric("🎓 Lulusan", f"{stats['graduate_count']:,}")
     with col3:
-        st.metric("❌ Dropout", f"{dropout_count:,}")
+        st.metric("❌ Dropout", f"{stats['dropout_count']:,}")
     with col4:
-        st.metric("📉 Tingkat Dropout", f"{dropout_rate:.1f}%")
+        st.metric("📉 Tingkat Dropout", f"{stats['dropout_rate']:.1f}%")
     
     # Charts
     col1, col2 = st.columns(2)
     
     with col1:
         # Status distribution
-        status_counts = df['Status'].value_counts()
+        status_counts = stats['status_counts']
         fig = px.pie(
             values=status_counts.values,
             names=status_counts.index,
@@ -383,7 +635,7 @@ def show_dashboard(df):
     
     with col2:
         # Gender vs Status
-        gender_status = pd.crosstab(df['Gender'], df['Status'])
+        gender_status = stats['gender_status']
         fig = px.bar(
             gender_status,
             title="Status berdasarkan Gender",
@@ -391,9 +643,63 @@ def show_dashboard(df):
         )
         st.plotly_chart(fig, use_container_width=True)
 
-def show_analysis(df, model, feature_names):
+def histogram_by_status(df, feature, bins=20):
+    # Bin counts per Status with shared edges; only these counts are sent to the browser
+    values = df[feature].to_numpy(dtype=np.float64)
+    finite = np.isfinite(values)
+    low, high = values[finite].min(), values[finite].max()
+    if pd.api.types.is_integer_dtype(df[feature]) and high - low + 1 <= bins:
+        # Small integer ranges get one bar per value
+        edges = np.arange(low - 0.5, high + 1.5)
+    else:
+        edges = np.histogram_bin_edges(values[finite], bins=bins)
+    
+    # One pass: bin index per row, then counts per (Status, bin) with bincount
+    codes, statuses = pd.factorize(df['Status'])
+    n_bins = len(edges) - 1
+    bin_index = np.clip(np.searchsorted(edges, values, side='right') - 1, 0, n_bins - 1)
+    keep = finite & (codes >= 0)
+    counts = np.bincount(codes[keep] * n_bins + bin_index[keep],
+                         minlength=len(statuses) * n_bins).reshape(len(statuses), n_bins)
+    
+    frames = []
+    for status, status_counts in zip(statuses, counts):
+        frames.append(pd.DataFrame({
+            'bin_start': edges[:-1],
+            'bin_end': edges[1:],
+            'bin_center': (edges[:-1] + edges[1:]) / 2,
+            'Status': status,
+            'count': status_counts
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+@st.cache_data(max_entries=64)
+def cached_histogram(_df, feature, bins, dataset_version):
+    # Keyed on (feature, bins, dataset_version); the frame itself is not hashed
+    return histogram_by_status(_df, feature, bins)
+
+def show_analysis(df, model, feature_names, permutation_importance=None):
     st.header("📊 Analisis Data")
     
+    # Permutation importance precomputed by permutation_importance.py and stored in the artifact
+    if permutation_importance:
+        st.subheader("🔀 Permutation Importance")
+        importance = pd.DataFrame({
+            'Feature': permutation_importance['features'],
+            'Importance': permutation_importance['importance_mean'],
+            'Std': permutation_importance['importance_std']
+        }).head(15)
+        fig = px.bar(
+            importance,
+            x='Importance',
+            y='Feature',
+            error_x='Std',
+            orientation='h',
+            title=f"Top 15 Permutation Importance (penurunan accuracy, {permutation_importance['n_rows']:,} baris)"
+        )
+        fig.update_layout(yaxis={'categoryorder':'total ascending'})
+        st.plotly_chart(fig, use_container_width=True)
+    
     # Feature importance
     if hasattr(model, 'feature_importances_'):
         st.subheader("🎯 Feature Importance")
@@ -422,14 +728,21 @@ def show_analysis(df, model, feature_names):
                 'Curricular_units_2nd_sem_grade', 'Tuition_fees_up_to_date']
     )
     
+    bins = st.slider("Jumlah bin:", min_value=5, max_value=100, value=20)
+    
     if selected_feature in df.columns:
-        fig = px.histogram(
-            df,
-            x=selected_feature,
+        histogram = cached_histogram(df, selected_feature, bins, df.attrs.get('dataset_version'))
+        fig = px.bar(
+            histogram,
+            x='bin_center',
+            y='count',
             color='Status',
-            title=f"Distribusi {selected_feature} berdasarkan Status",
-            nbins=20
+            hover_data=['bin_start', 'bin_end'],
+            labels={'bin_center': selected_feature},
+            title=f"Distribusi {selected_feature} berdasarkan Status"
         )
+        fig.update_traces(width=float(histogram['bin_end'].iloc[0] - histogram['bin_start'].iloc[0]))
+        fig.update_layout(bargap=0)
         st.plotly_chart(fig, use_container_width=True)
 
 if __name__ == "__main__":
@@ -0,0 +1,280 @@
+# synthetic_data.py
+# Generator data mahasiswa sintetis untuk load testing (distribusi dipelajari dari data.csv)
+
+import argparse
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from dataset_cache import load_dataset
+
+# Columns with at most this many distinct values are sampled from their exact support
+MAX_DISCRETE_VALUES = 256
+N_QUANTILES = 512
+# Discrete columns are sampled through a lookup table of this many equal-probability slots
+TABLE_SIZE = 2 ** 16
+
+
+class StudentProfile:
+    """Distribusi marginal per kolom, dikondisikan pada Status
+
+    Kolom diskrit disimpan sebagai (nilai, probabilitas); kolom kontinu
+    sebagai tabel quantile yang di-sample lewat inverse CDF lalu dibulatkan
+    ke jumlah desimal yang ada di data asli. Kolom diasumsikan independen
+    dalam tiap Status.
+    """
+
+    def __init__(self, columns, statuses, status_probs, distributions, dtypes, decimals):
+        self.columns = columns
+        self.statuses = statuses
+        self.status_probs = status_probs
+        self.distributions = distributions  # {status: {column: dist}}
+        self.dtypes = dtypes
+        self.decimals = decimals
+
+    @classmethod
+    def fit(cls, df, target='Status'):
+        """Pelajari profil dari DataFrame mentah (mis. data.csv)"""
+        columns = [col for col in df.columns if col != target]
+        status_counts = df[target].value_counts().sort_index()
+        statuses = status_counts.index.tolist()
+        status_probs = (status_counts / status_counts.sum()).tolist()
+
+        dtypes = {col: str(df[col].dtype) for col in columns}
+        decimals = {col: _decimals(df[col]) for col in columns}
+
+        distributions = {}
+        for status, group in df.groupby(target):
+            distributions[status] = {}
+            for col in columns:
+                values = group[col].to_numpy()
+                if pd.api.types.is_numeric_dtype(group[col]):
+                    uniques, counts = np.unique(values, return_counts=True)
+                else:
+                    # np.unique cannot order text mixed with NaN; missing text stays a sampled value
+                    frequencies = group[col].value_counts(dropna=False).sort_index()
+                    uniques, counts = frequencies.index.to_numpy(dtype=object), frequencies.to_numpy()
+                if len(uniques) <= MAX_DISCRETE_VALUES or not pd.api.types.is_numeric_dtype(group[col]):
+                    distributions[status][col] = {
+                        'kind': 'discrete',
+                        'values': uniques.tolist(),
+                        'probs': (counts / counts.sum()).tolist()
+                    }
+                else:
+                    levels = np.linspace(0, 1, N_QUANTILES)
+                    distributions[status][col] = {
+                        'kind': 'quantile',
+                        'quantiles': np.quantile(values, levels).tolist()
+                    }
+
+        return cls(columns, statuses, status_probs, distributions, dtypes, decimals)
+
+    def to_json(self, path):
+        with open(path, 'w') as f:
+            json.dump({
+                'columns': self.columns,
+                'statuses': self.statuses,
+                'status_probs': self.status_probs,
+                'distributions': self.distributions,
+                'dtypes': self.dtypes,
+                'decimals': self.decimals
+            }, f)
+
+    @classmethod
+    def from_json(cls, path):
+        with open(path) as f:
+            return cls(**json.load(f))
+
+    def fingerprint(self):
+        return hashlib.sha256(json.dumps(self.distributions, sort_keys=True).encode()).hexdigest()[:16]
+
+    def _compile(self):
+        """Siapkan tabel sampling (lookup diskrit / grid quantile) sekali per generator"""
+        compiled = {}
+        levels = np.linspace(0, 1, N_QUANTILES)
+        slots = (np.arange(TABLE_SIZE) + 0.5) / TABLE_SIZE
+        for status in self.statuses:
+            compiled[status] = {}
+            for col in self.columns:
+                dist = self.distributions[status][col]
+                if dist['kind'] == 'discrete':
+                    cdf = np.cumsum(dist['probs'])
+                    cdf[-1] = 1.0
+                    # Indexing a table is much cheaper than searchsorted per sample;
+                    # probabilities are kept to within 1 / TABLE_SIZE
+                    # Text values stay objects so a missing value is sampled as NaN, not the string 'nan'
+                    numeric = pd.api.types.is_numeric_dtype(pd.api.types.pandas_dtype(self.dtypes[col]))
+                    values = np.asarray(dist['values'], dtype=None if numeric else object)
+                    table = values[np.searchsorted(cdf, slots, side='right')]
+                    compiled[status][col] = ('discrete', table, None)
+                else:
+                    compiled[status][col] = ('quantile', levels, np.asarray(dist['quantiles']))
+        return compiled
+
+    def generate(self, n_rows, seed=0, chunk_rows=1_000_000):
+        """Yield DataFrame per chunk; deterministik untuk (seed, chunk_rows) yang sama"""
+        compiled = self._compile()
+        status_cdf = np.cumsum(self.status_probs)
+        status_cdf[-1] = 1.0
+        statuses = np.asarray(self.statuses, dtype=object)
+        n_chunks = -(-n_rows // chunk_rows)
+
+        # One independent stream per chunk, so chunks could also be produced in parallel
+        for chunk_id, seed_seq in enumerate(np.random.SeedSequence(seed).spawn(n_chunks)):
+            rng = np.random.default_rng(seed_seq)
+            size = min(chunk_rows, n_rows - chunk_id * chunk_rows)
+            status_idx = np.searchsorted(status_cdf, rng.random(size), side='right')
+            groups = [np.flatnonzero(status_idx == s) for s in range(len(self.statuses))]
+
+            data = {}
+            for col in self.columns:
+                numeric = pd.api.types.is_numeric_dtype(pd.api.types.pandas_dtype(self.dtypes[col]))
+                out = np.empty(size, dtype=np.float64 if numeric else object)
+                for status, rows in zip(self.statuses, groups):
+                    kind, a, b = compiled[status][col]
+                    if kind == 'discrete':
+                        out[rows] = a[rng.integers(0, TABLE_SIZE, len(rows), dtype=np.uint16)]
+                    else:
+                        out[rows] = np.interp(rng.random(len(rows)), a, b)
+                if self.decimals[col] is not None:
+                    out = np.round(out, self.decimals[col])
+                data[col] = out.astype(self.dtypes[col]) if numeric else out
+            data['Status'] = statuses[status_idx]
+
+            yield pd.DataFrame(data)
+
+
+def _decimals(series):
+    """Jumlah desimal maksimum di kolom float (None untuk kolom integer)"""
+    if not pd.api.types.is_float_dtype(series):
+        return None
+    for decimals in range(7):
+        if np.allclose(series, np.round(series, decimals)):
+            return decimals
+    return None
+
+
+def write_csv(chunks, path, delimiter=';'):
+    for i, chunk in enumerate(chunks):
+        chunk.to_csv(path, sep=delimiter, index=False, mode='w' if i == 0 else 'a', header=i == 0)
+
+
+def write_parquet(chunks, path):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Output Parquet membutuhkan pyarrow: pip install pyarrow") from e
+    writer = None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def write_columnar(chunks, directory, profile, n_rows, seed):
+    """Tulis kolom .npy dengan layout cache dataset_cache
+
+    Hasilnya bisa langsung dibaca dengan `load_dataset(directory)` dan
+    kolomnya bisa di-memory-map.
+    """
+    version = f'synthetic-{profile.fingerprint()}-{seed}-{n_rows}'
+    version_dir = os.path.join(directory, version)
+    os.makedirs(version_dir, exist_ok=True)
+
+    columns, arrays = [], []
+    for i, col in enumerate(profile.columns + ['Status']):
+        entry = {'name': col, 'file': f'{i:03d}.npy'}
+        if col == 'Status':
+            entry['categories'] = list(profile.statuses)
+        elif not pd.api.types.is_numeric_dtype(pd.api.types.pandas_dtype(profile.dtypes[col])):
+            # Text columns are stored as codes, as in the dataset cache; missing text becomes code -1
+            entry['categories'] = sorted({value for status in profile.statuses
+                                          for value in profile.distributions[status][col]['values']
+                                          if not pd.isna(value)})
+        dtype = np.int32 if 'categories' in entry else profile.dtypes[col]
+        columns.append(entry)
+        arrays.append(np.lib.format.open_memmap(os.path.join(version_dir, entry['file']), mode='w+',
+                                                dtype=dtype, shape=(n_rows,)))
+
+    start = 0
+    for chunk in chunks:
+        stop = start + len(chunk)
+        for array, entry in zip(arrays, columns):
+            values = chunk[entry['name']]
+            if 'categories' in entry:
+                values = pd.Categorical(values, categories=entry['categories']).codes
+            array[start:stop] = values
+        start = stop
+    for array in arrays:
+        array.flush()
+
+    manifest = {
+        'source': f'synthetic:{profile.fingerprint()}',
+        'sha256': hashlib.sha256(version.encode()).hexdigest(),
+        'n_rows': n_rows,
+        'version_dir': version,
+        'columns': columns,
+        'cached_at': time.time()
+    }
+    with open(os.path.join(directory, 'current.json'), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+
+def generate_to(profile, n_rows, output, seed=0, chunk_rows=1_000_000, output_format=None):
+    """Generate n_rows ke CSV, Parquet, atau direktori kolumnar"""
+    if output_format is None:
+        if output.endswith(('.parquet', '.pq')):
+            output_format = 'parquet'
+        elif output.endswith('.csv'):
+            output_format = 'csv'
+        else:
+            output_format = 'columnar'
+
+    chunks = profile.generate(n_rows, seed=seed, chunk_rows=chunk_rows)
+    if output_format == 'csv':
+        write_csv(chunks, output)
+    elif output_format == 'parquet':
+        write_parquet(chunks, output)
+    else:
+        write_columnar(chunks, output, profile, n_rows, seed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generator data mahasiswa sintetis")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    fit_parser = subparsers.add_parser('fit', help="Pelajari profil distribusi dari data.csv")
+    fit_parser.add_argument('--data', default=None, help="URL, file CSV, atau direktori (default: dataset Dicoding)")
+    fit_parser.add_argument('--output', default='student_profile.json')
+
+    gen_parser = subparsers.add_parser('generate', help="Generate dataset sintetis")
+    gen_parser.add_argument('output', help="File .csv / .parquet, atau direktori kolumnar")
+    gen_parser.add_argument('--profile', default='student_profile.json')
+    gen_parser.add_argument('--rows', type=int, default=1_000_000)
+    gen_parser.add_argument('--seed', type=int, default=0)
+    gen_parser.add_argument('--chunk-rows', type=int, default=1_000_000)
+    gen_parser.add_argument('--format', choices=['csv', 'parquet', 'columnar'], default=None)
+
+    args = parser.parse_args()
+
+    if args.command == 'fit':
+        profile = StudentProfile.fit(load_dataset(args.data))
+        profile.to_json(args.output)
+        print(f"✅ Profil {len(profile.columns)} kolom x {len(profile.statuses)} status disimpan ke {args.output}")
+    else:
+        profile = StudentProfile.from_json(args.profile)
+        start = time.perf_counter()
+        generate_to(profile, args.rows, args.output, seed=args.seed, chunk_rows=args.chunk_rows,
+                    output_format=args.format)
+        elapsed = time.perf_counter() - start
+        print(f"✅ {args.rows:,} baris ke {args.output} dalam {elapsed:.1f} s ({args.rows / elapsed:,.0f} rows/s)")
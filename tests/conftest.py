@@ -0,0 +1,49 @@
+# conftest.py
+# Fixture bersama: data mahasiswa sintetis dan predictor kecil yang dilatih sekali per sesi
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark import synthetic_students  # noqa: E402
+from model_inference import DropoutPredictor  # noqa: E402
+
+
+@pytest.fixture(scope='session', autouse=True)
+def dataset_cache_dir(tmp_path_factory):
+    # Never read or write the user's dataset cache from tests
+    cache_dir = tmp_path_factory.mktemp('cache')
+    previous = os.environ.get('DROPOUT_DATA_CACHE')
+    os.environ['DROPOUT_DATA_CACHE'] = str(cache_dir)
+    yield cache_dir
+    if previous is None:
+        os.environ.pop('DROPOUT_DATA_CACHE', None)
+    else:
+        os.environ['DROPOUT_DATA_CACHE'] = previous
+
+
+@pytest.fixture(scope='session')
+def students():
+    return synthetic_students(800, seed=0)
+
+
+@pytest.fixture(scope='session')
+def predictor(tmp_path_factory, students):
+    path = tmp_path_factory.mktemp('data') / 'train.csv'
+    students.to_csv(path, sep=';', index=False)
+    predictor = DropoutPredictor()
+    X, y, _ = predictor.load_and_prepare_data(str(path), offline=True)
+    predictor.train_model(X, y, params={'n_estimators': 20})
+    return predictor
+
+
+@pytest.fixture(scope='session')
+def features(predictor, students):
+    """Matriks fitur ter-encode (urutan feature_names) untuk data lain dari distribusi yang sama"""
+    X, invalid = predictor._prepare_features(synthetic_students(300, seed=1).drop(columns='Status'))
+    assert not invalid.any()
+    return X
+
@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from aggregate_cube import AggregateCube
+
+
+def _with_missing_dimensions(students):
+    df = students.copy()
+    df['Status'] = df['Status'].astype(object)
+    df.loc[df.index[::7], 'Status'] = np.nan
+    df.loc[df.index[::11], 'Gender'] = np.nan
+    return df
+
+
+def test_cube_counts_rows_with_missing_dimensions(students):
+    df = _with_missing_dimensions(students)
+    cube = AggregateCube.build(df)
+
+    assert cube.total() == len(df) == cube.n_rows
+    assert cube.counts('Status').sum() == len(df)
+    assert cube.counts('Status').to_dict() == df['Status'].value_counts(dropna=False).to_dict()
+    assert cube.mean('Admission_grade') == pytest.approx(df['Admission_grade'].mean())
+    assert 'Dropout' in cube.values('Status') and len(cube.values('Status')) == df['Status'].nunique()
+
+
+def test_cube_update_matches_full_build(students):
+    df = _with_missing_dimensions(students)
+    cube = AggregateCube.build(df.iloc[:500]).update(df.iloc[500:])
+    full = AggregateCube.build(df)
+
+    assert cube.total() == full.total() == len(df)
+    pd.testing.assert_series_equal(cube.counts(['Status', 'Gender']).sort_index(),
+                                   full.counts(['Status', 'Gender']).sort_index())
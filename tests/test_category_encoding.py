@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from benchmark import synthetic_students
+from category_encoding import CategoryTable
+from model_inference import DropoutPredictor
+
+CAMPUSES = ['North', 'South', 'South', 'East']  # 'South' is the most frequent
+
+
+@pytest.fixture(scope='module')
+def artifact(tmp_path_factory):
+    students = synthetic_students(400, seed=3)
+    students.insert(0, 'Campus', np.resize(CAMPUSES, len(students)))
+    path = tmp_path_factory.mktemp('campus')
+    students.to_csv(path / 'train.csv', sep=';', index=False)
+    predictor = DropoutPredictor()
+    X, y, _ = predictor.load_and_prepare_data(str(path / 'train.csv'), offline=True)
+    predictor.train_model(X, y, params={'n_estimators': 10})
+    predictor.save_model(str(path / 'model.pkl'))
+    return str(path / 'model.pkl'), students.drop(columns='Status').head(5)
+
+
+def _load(path, unseen_category):
+    predictor = DropoutPredictor(unseen_category=unseen_category)
+    predictor.load_model(path)
+    return predictor
+
+
+def test_table_fallback_strategies():
+    table = CategoryTable(np.array(['East', 'North', 'South']), counts=np.array([1, 1, 2]))
+    assert table.with_fallback('most_frequent').encode_value('West') == 2
+    assert table.with_fallback('first').encode_value('West') == 0
+    assert table.with_fallback('North').encode_value('West') == 1
+    assert np.isnan(table.with_fallback(None).encode_value('West'))
+    np.testing.assert_array_equal(table.with_fallback('first').encode(['South', 'West']), [2, 0])
+    with pytest.raises(ValueError):
+        table.with_fallback('West')
+
+
+@pytest.mark.parametrize('unseen_category, substitute', [('most_frequent', 'South'), ('North', 'North')])
+def test_loaded_model_scores_unseen_category_as_fallback(artifact, unseen_category, substitute):
+    path, batch = artifact
+    predictor = _load(path, unseen_category)
+    unseen = batch.assign(Campus='West')
+    results = predictor.predict_batch(unseen)
+    expected = predictor.predict_batch(batch.assign(Campus=substitute))
+
+    assert results['error'].isna().all()
+    np.testing.assert_array_equal(results['dropout_probability'], expected['dropout_probability'])
+    single = predictor.predict_single(unseen.iloc[0].to_dict())
+    assert single['dropout_probability'] == pytest.approx(expected['dropout_probability'].iloc[0], abs=1e-12)
+
+
+def test_loaded_model_rejects_unseen_category_when_fallback_is_none(artifact):
+    path, batch = artifact
+    predictor = _load(path, None)
+    unseen = batch.assign(Campus=['West', 'North', 'West', 'South', 'East'])
+    results = predictor.predict_batch(unseen)
+
+    assert results['error'].notna().tolist() == [True, False, True, False, False]
+    assert 'Campus' in results.loc[0, 'error']
+    assert results.loc[0, 'predicted_status'] == 'Error'
+    with pytest.raises(ValueError, match='Campus'):
+        predictor.predict_single(unseen.iloc[0].to_dict())
+    assert predictor.predict_single(unseen.iloc[1].to_dict())['predicted_status'] != 'Error'
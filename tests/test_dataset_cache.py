@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+from dataset_cache import DatasetCache, load_dataset
+
+
+def test_cache_round_trip_keeps_missing_text(tmp_path):
+    csv = tmp_path / 'data.csv'
+    csv.write_text("Course;Status;Grade\n33;Dropout;12.5\n171;;\n33;Graduate;14.0\n171;Enrolled;13.1\n")
+    cache_dir = tmp_path / 'cache'
+
+    first = load_dataset(str(csv), cache_dir=str(cache_dir))
+    cached = load_dataset(str(csv), cache_dir=str(cache_dir))
+
+    assert first.attrs['dataset_version'] == cached.attrs['dataset_version']
+    for col in first.columns:
+        np.testing.assert_array_equal(pd.isna(first[col]).to_numpy(), pd.isna(cached[col]).to_numpy())
+        present = first[col].notna().to_numpy()
+        assert first[col][present].tolist() == cached[col][present].tolist()
+    assert pd.isna(cached.loc[1, 'Status'])
+
+
+def test_store_and_load_all_categories(tmp_path):
+    cache = DatasetCache(str(tmp_path))
+    cache.store('source.csv', "Course;Status\n33;Graduate\n171;\n33;Dropout\n".encode())
+    loaded = cache.load('source.csv')
+    assert loaded['Status'][[0, 2]].tolist() == ['Graduate', 'Dropout']
+    assert pd.isna(loaded['Status'][1])
+
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from benchmark import synthetic_students
+from distillation import distill
+
+
+@pytest.fixture(scope='module')
+def surrogate(predictor):
+    X, invalid = predictor._prepare_features(synthetic_students(3000, seed=2).drop(columns='Status'))
+    return distill(predictor, X[~invalid.any(axis=1)], max_depth=6, target_fidelity=0.99)
+
+
+@pytest.fixture
+def fast_predictor(predictor, surrogate):
+    predictor.enable_fast_mode(surrogate)
+    yield predictor
+    predictor.disable_fast_mode()
+
+
+def test_non_fallback_rows_agree_with_forest(predictor, surrogate, features):
+    forest = predictor.engine.predict_proba(features)
+    proba, fallback = surrogate.score(features, predictor.engine)
+    np.testing.assert_array_equal(proba[fallback], forest[fallback])
+
+    dropout = surrogate.dropout_index
+    agreement = np.mean(predictor._get_risk_levels(proba[:, dropout]) == predictor._get_risk_levels(forest[:, dropout]))
+    assert agreement >= 0.97
+
+
+def test_single_row_path_matches_engine(surrogate, features):
+    for x in features[:50]:
+        np.testing.assert_array_equal(surrogate.predict_proba(x[np.newaxis]), surrogate.engine.predict_proba(x))
+
+
+def test_fast_mode_explanations_add_up_to_returned_probability(fast_predictor, students):
+    batch = students.head(200).drop(columns='Status')
+    results = fast_predictor.predict_batch(batch, explain=True)
+    contributions = results.filter(like='contrib_').to_numpy()
+    np.testing.assert_allclose(results['base_value'] + contributions.sum(axis=1), results['dropout_probability'],
+                               atol=1e-9)
+
+    X, _ = fast_predictor._prepare_features(batch)
+    assert not fast_predictor.surrogate.needs_fallback(fast_predictor.surrogate.predict_proba(X)).all()
+
+    for record in batch.head(20).to_dict('records'):
+        result = fast_predictor.predict_single(record, explain=True)
+        explanation = result['explanation']
+        assert explanation['base_value'] + sum(explanation['contributions'].values()) == \
+            pytest.approx(result['dropout_probability'], abs=1e-9)
@@ -0,0 +1,117 @@
+import copy
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from forest_engine import CompiledForest
+
+
+def _frame(predictor, X):
+    return pd.DataFrame(X, columns=predictor.feature_names)
+
+
+def test_engine_matches_sklearn_exactly(predictor, features):
+    np.testing.assert_array_equal(predictor.engine.predict_proba(features),
+                                  predictor.model.predict_proba(_frame(predictor, features)))
+    # The engine numbers nodes globally; tree t starts at roots[t]
+    np.testing.assert_array_equal(predictor.engine.apply(features) - predictor.engine.roots,
+                                  predictor.model.apply(_frame(predictor, features)))
+
+
+def test_engine_matches_sklearn_on_large_blocks(predictor, features):
+    X = np.tile(features, (40, 1))
+    np.testing.assert_array_equal(predictor.engine.predict_proba(X),
+                                  predictor.model.predict_proba(_frame(predictor, X)))
+
+
+@pytest.mark.parametrize('bits', [None, 16])
+def test_mmap_loaded_engine_maps_children(predictor, features, tmp_path, bits):
+    joblib = pytest.importorskip('joblib')
+    engine = predictor.engine if bits is None else predictor.engine.quantize(bits)
+    joblib.dump(engine, tmp_path / 'engine.pkl')
+    loaded = joblib.load(tmp_path / 'engine.pkl', mmap_mode='r')
+    # Read-only means the array is the mapping itself, not a per-process copy
+    assert not loaded.children.flags.writeable
+    assert loaded.children.dtype == engine.children.dtype
+    X = np.tile(features, (40, 1))
+    np.testing.assert_array_equal(loaded.predict_proba(X), engine.predict_proba(X))
+    np.testing.assert_array_equal(loaded.apply(features), engine.apply(features))
+
+
+@pytest.mark.parametrize('bits', [8, 16])
+def test_quantized_engine_routes_identically_within_bound(predictor, features, bits):
+    engine = predictor.engine
+    quantized = engine.quantize(bits)
+    X = np.tile(features, (40, 1))
+    np.testing.assert_array_equal(quantized.apply(features), engine.apply(features))
+    error = np.abs(quantized.predict_proba(X) - engine.predict_proba(X)).max()
+    assert error <= 0.5 / (2 ** bits - 1) + 1e-12
+    assert quantized.nbytes < engine.nbytes
+
+
+@pytest.mark.parametrize('n_rows', [5, 12_000])
+def test_contributions_add_up_to_engine_probability(predictor, features, n_rows):
+    X = np.resize(features, (n_rows, features.shape[1]))
+    bias, contributions = predictor.engine.contributions(X)
+    np.testing.assert_allclose(bias + contributions.sum(axis=1), predictor.engine.predict_proba(X), atol=1e-12)
+
+
+def test_single_decision_tree_compiles(predictor, features):
+    tree = predictor.model.estimators_[0]
+    engine = CompiledForest.from_sklearn(tree)
+    np.testing.assert_allclose(engine.predict_proba(features), tree.predict_proba(features))
+
+
+def test_predict_batch_matches_predict_single(predictor, students):
+    batch = students.head(20).drop(columns='Status')
+    results = predictor.predict_batch(batch)
+    for (_, student), (_, row) in zip(batch.iterrows(), results.iterrows()):
+        single = predictor.predict_single(student.to_dict())
+        assert row['predicted_status'] == single['predicted_status']
+        assert row['dropout_probability'] == pytest.approx(single['dropout_probability'], abs=1e-12)
+        assert row['risk_level'] == single['risk_level']
+
+
+@pytest.mark.parametrize('value', [np.nan, np.inf, -np.inf, 'abc'])
+def test_non_finite_values_mark_row_invalid(predictor, students, value):
+    batch = students.head(3).drop(columns='Status').astype({'Admission_grade': object})
+    batch.loc[1, 'Admission_grade'] = value
+    results = predictor.predict_batch(batch)
+
+    assert results['error'].notna().tolist() == [False, True, False]
+    assert results.loc[1, 'predicted_status'] == 'Error'
+    assert results.loc[1, 'risk_level'] == 'Unknown'
+    assert 'Admission_grade' in results.loc[1, 'error']
+    with pytest.raises(ValueError, match='Admission_grade'):
+        predictor.predict_single(batch.loc[1].to_dict())
+
+
+def test_update_seeds_stay_unique_after_retiring_windows(predictor, features):
+    updated = copy.deepcopy(predictor)
+    X = _frame(predictor, features)
+    y = predictor.model.predict(X)
+    seeds = []
+    for _ in range(3):
+        # Retiring as many trees as are added keeps the window count (the old seed source) constant
+        updated.update_model(X, y, n_new_trees=5, retire_oldest=5)
+        seeds.append([tree.random_state for tree in updated.model.estimators_[-5:]])
+
+    assert updated.metadata['tree_seed_offset'] == 3
+    assert len({tuple(batch) for batch in seeds}) == 3
+    labels = [window['window'] for window in updated.metadata['tree_windows']]
+    assert len(labels) == len(set(labels))
+
+
+def test_explanations_add_up_to_returned_probability(predictor, students):
+    batch = students.head(50).drop(columns='Status')
+    results = predictor.predict_batch(batch, explain=True)
+    contributions = results.filter(like='contrib_').to_numpy()
+    np.testing.assert_allclose(results['base_value'] + contributions.sum(axis=1), results['dropout_probability'],
+                               atol=1e-12)
+
+    for record in batch.head(10).to_dict('records'):
+        result = predictor.predict_single(record, explain=True)
+        explanation = result['explanation']
+        assert explanation['base_value'] + sum(explanation['contributions'].values()) == \
+            pytest.approx(result['dropout_probability'], abs=1e-12)
@@ -0,0 +1,44 @@
+import tempfile
+
+import numpy as np
+from sklearn.metrics import accuracy_score
+
+from benchmark import synthetic_students
+from incremental_update import encode_labeled
+from permutation_importance import _share, permutation_importance
+
+
+def _reference_importance(engine, X, y, n_repeats, random_state):
+    """Permutasi kolom pada array biasa (float64, tanpa memmap) dengan seed yang sama"""
+    X = np.array(X, dtype=np.float64)
+    baseline = accuracy_score(y, engine.predict(X))
+    seeds = np.random.SeedSequence(random_state).spawn(X.shape[1])
+    drops = np.zeros((X.shape[1], n_repeats))
+    for feature, seed in enumerate(seeds):
+        rng = np.random.default_rng(seed)
+        original = X[:, feature].copy()
+        for repeat in range(n_repeats):
+            X[:, feature] = rng.permutation(original)
+            drops[feature, repeat] = baseline - accuracy_score(y, engine.predict(X))
+        X[:, feature] = original
+    return drops
+
+
+def test_importances_match_plain_array_baseline(predictor):
+    X, y = encode_labeled(predictor, synthetic_students(600, seed=4))
+    importance = permutation_importance(predictor, X, y, n_repeats=3, n_jobs=2, random_state=7, verbose=False)
+
+    drops = _reference_importance(predictor.engine, X, np.asarray(y), 3, random_state=7)
+    expected = dict(zip(predictor.feature_names, drops.mean(axis=1)))
+    assert importance['importance_mean'].tolist() == [expected[f] for f in importance['feature']]
+    assert importance['importance_mean'].iloc[0] > 0
+
+
+def test_shared_matrix_is_read_by_the_engine_without_copies(predictor):
+    X, _ = encode_labeled(predictor, synthetic_students(50, seed=4))
+    with tempfile.TemporaryDirectory() as folder:
+        shared = _share(X, folder)
+        # The engine casts to float32 and ravels row blocks; both must be views of the mapping
+        assert np.shares_memory(np.asarray(shared, dtype=np.float32).ravel(), shared)
+        np.testing.assert_array_equal(shared, np.asarray(X, dtype=np.float32))
+        del shared
@@ -0,0 +1,139 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+from scoring_service import ScoringService, ServiceStats
+
+
+def _run(predictor, scenario, **options):
+    async def main():
+        service = ScoringService(predictor=predictor, **options)
+        await service.load()
+        try:
+            return service, await scenario(service)
+        finally:
+            await service.stop()
+            predictor.disable_metrics()
+    return asyncio.run(main())
+
+
+def test_micro_batches_return_results_in_request_order(predictor, students):
+    records = students.head(60).drop(columns='Status').to_dict('records')
+    records[7]['Admission_grade'] = 'abc'
+
+    async def scenario(service):
+        return await asyncio.gather(*(service.dispatch('POST', '/predict', json.dumps(record).encode())
+                                      for record in records))
+
+    service, responses = _run(predictor, scenario, max_batch_size=16, max_wait_ms=50)
+    assert service.stats.batches < len(records)
+    for i, (record, (status, payload)) in enumerate(zip(records, responses)):
+        if i == 7:
+            assert status == 422 and 'Admission_grade' in payload['error']
+            continue
+        expected = predictor.predict_single(record)
+        assert status == 200
+        assert payload['predicted_status'] == expected['predicted_status']
+        assert payload['dropout_probability'] == pytest.approx(expected['dropout_probability'], abs=1e-12)
+
+
+def test_partial_record_scores_the_same_alone_or_batched(predictor, students):
+    full = students.drop(columns='Status').iloc[0].to_dict()
+    partial = {key: value for key, value in students.drop(columns='Status').iloc[1].to_dict().items()
+               if key not in ('Marital_status', 'Application_mode', 'Admission_grade')}
+
+    async def scenario(service):
+        return await asyncio.gather(*(service.dispatch('POST', '/predict', json.dumps(record).encode())
+                                      for record in (full, partial)))
+
+    service, [(_, full_payload), (status, payload)] = _run(predictor, scenario, max_batch_size=16, max_wait_ms=50)
+    assert service.stats.batches == 1
+    expected = predictor.predict_single(partial)
+    assert status == 200
+    assert payload['predicted_status'] == expected['predicted_status']
+    assert payload['dropout_probability'] == pytest.approx(expected['dropout_probability'], abs=1e-12)
+    assert full_payload['dropout_probability'] == pytest.approx(
+        predictor.predict_single(full)['dropout_probability'], abs=1e-12)
+
+def test_query_strings_do_not_add_label_series(predictor, students):
+    record = json.dumps(students.drop(columns='Status').iloc[0].to_dict()).encode()
+
+    async def scenario(service):
+        for i in range(25):
+            await service.dispatch('POST', f'/predict?x={i}', record)
+            await service.dispatch('GET', f'/stats?page={i}')
+            await service.dispatch('GET', f'/unknown/{i}?q={i}')
+            await service.dispatch(f'METHOD{i}', '/healthz')
+        return await service.dispatch('GET', '/metrics?format=text')
+
+    service, (status, text) = _run(predictor, scenario)
+    assert status == 200
+    expected = {'POST /predict', 'GET /stats', 'not_found', 'other', 'GET /metrics'}
+    assert set(service.stats.requests) == expected
+    assert set(service.stats.latencies) == expected
+    endpoints = {dict(labels)['endpoint'] for (name, labels) in service.metrics.counters
+                 if name == 'http_requests_total'}
+    assert endpoints == expected
+    assert '?' not in text
+
+
+def test_stats_snapshot_while_batches_are_recorded():
+    stats = ServiceStats(window=100)
+
+    def record():
+        for _ in range(20_000):
+            stats.record_batch(2, 1)
+
+    threads = [threading.Thread(target=record) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    while any(thread.is_alive() for thread in threads):
+        snapshot = stats.snapshot()
+        assert snapshot['rows_scored'] == 2 * snapshot['batches'] == 2 * snapshot['row_errors']
+    for thread in threads:
+        thread.join()
+    assert stats.snapshot()['batches'] == 80_000
+
+
+def test_unsupported_method_is_rejected(predictor):
+    async def scenario(service):
+        return [await service.dispatch(method, path) for method, path in
+                (('PUT', '/healthz'), ('GET', '/predict'), ('POST', '/stats'), ('GET', '/healthz'))]
+
+    service, responses = _run(predictor, scenario)
+    assert [status for status, _ in responses] == [405, 405, 405, 200]
+    assert set(service.stats.requests) == {'other', 'GET /healthz'}
+
+
+async def _raw_request(service, data):
+    reader, writer = await asyncio.open_connection('127.0.0.1', service.port)
+    writer.write(data)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    return response
+
+
+def test_malformed_requests_get_a_response(predictor, monkeypatch):
+    async def main():
+        service = ScoringService(predictor=predictor)
+        await service.start(port=0)
+        try:
+            bad_length = await _raw_request(service, b'POST /predict HTTP/1.1\r\nContent-Length: abc\r\n\r\n{}')
+            negative = await _raw_request(service, b'POST /predict HTTP/1.1\r\nContent-Length: -5\r\n\r\n')
+
+            async def broken(*args):
+                raise RuntimeError("boom")
+            monkeypatch.setattr(service, 'dispatch', broken)
+            crashed = await _raw_request(service, b'GET /healthz HTTP/1.1\r\n\r\n')
+        finally:
+            await service.stop()
+            predictor.disable_metrics()
+        return bad_length, negative, crashed
+
+    bad_length, negative, crashed = asyncio.run(main())
+    assert bad_length.startswith(b'HTTP/1.1 400') and b'Content-Length' in bad_length
+    assert negative.startswith(b'HTTP/1.1 400')
+    assert crashed.startswith(b'HTTP/1.1 500') and b'boom' not in crashed
@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('streamlit')
+from streamlit_app import what_if_grid  # noqa: E402
+
+
+def test_what_if_grid_uses_whole_values_for_integer_features(students):
+    grid = what_if_grid(students['Curricular_units_2nd_sem_approved'], 20)
+    assert all(isinstance(value, int) for value in grid)
+    assert list(grid) == sorted(set(grid))
+    assert grid[0] == students['Curricular_units_2nd_sem_approved'].min()
+    assert grid[-1] == students['Curricular_units_2nd_sem_approved'].max()
+
+
+def test_what_if_grid_treats_integral_floats_as_integers():
+    values = pd.Series([0.0, 3.0, np.nan, 7.0] + list(range(30)), dtype=np.float64)
+    grid = what_if_grid(values, 25)
+    assert all(isinstance(value, int) for value in grid)
+    assert len(grid) == len(set(grid))
+
+
+def test_what_if_grid_dedupes_rounded_points():
+    # 30 points over a 0.1-wide range collapse to a handful of 2-decimal values
+    values = pd.Series(np.linspace(12.0, 12.1, 200))
+    grid = what_if_grid(values, 30)
+    assert len(grid) == len(set(grid)) < 30
+    assert all(isinstance(value, float) for value in grid)
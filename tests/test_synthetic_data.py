@@ -0,0 +1,20 @@
+import numpy as np
+import pandas as pd
+
+from dataset_cache import load_dataset
+from synthetic_data import StudentProfile, generate_to
+
+
+def test_synthetic_columnar_keeps_missing_text(tmp_path):
+    df = pd.DataFrame({
+        'Age': np.arange(40) % 7 + 18,
+        'Campus': ['North', None, 'South', 'North'] * 10,
+        'Status': ['Dropout', 'Graduate'] * 20
+    })
+    profile = StudentProfile.fit(df)
+    generate_to(profile, 500, str(tmp_path / 'synthetic'), seed=0)
+
+    loaded = load_dataset(str(tmp_path / 'synthetic'))
+    campus = loaded['Campus']
+    assert campus.isna().any()
+    assert set(campus.dropna()) == {'North', 'South'}